@@ -15,6 +15,8 @@ from bot.config.loader import load_config
 from bot.core.errors import ConfigError  # 本番禁止のときは起動を止めるために使う
 from bot.core.logging import setup_logging
 from bot.core.retry import retryable
+from bot.core.signals import run_until_signal
+from bot.data.buffered_repo import BufferedRepo
 from bot.data.repo import Repo
 from bot.exchanges.base import ExchangeGateway
 from bot.exchanges.bitget import BitgetGateway
@@ -259,10 +261,10 @@ async def _run_private_ws(ex: BitgetGateway, oms: OmsEngine, *, symbols: list[st
         logger.warning("reconcile inflight open orders failed: {}", e)
 
 
-@retryable(tries=999999, wait_initial=1.0, wait_max=30.0)
 async def _run_public_ws_for_paper(data_ex: BitgetGateway, paper_ex: PaperExchange, symbols: list[str]) -> None:
     """これは何をする関数？
     → Paperモード用に Public WS を購読し、BBO/トレードを PaperExchange に転送します。
+      （断線時の再接続は BitgetGateway.subscribe_public 側で行う）
     """
 
     async def _public_trade_cb(msg: dict) -> None:
@@ -402,7 +404,8 @@ async def _main_async(
 
     # DB (optional)
     disable_db = str(getattr(cfg, "db_url", "") or "").lower() in {"", "disabled", "none"}
-    repo = None if disable_db else Repo(db_url=cfg.db_url)
+    # OMS のトレード/注文イベントは書き戻しバッファ経由でまとめて保存（発注経路を DB 書き込みで待たせない）
+    repo = None if disable_db else BufferedRepo(Repo(db_url=cfg.db_url))
     if repo is not None:
         await repo.create_all()
 
@@ -442,171 +445,178 @@ async def _main_async(
         from datetime import datetime, timezone
 
         repo_ops = None if disable_db else Repo(db_url=cfg.db_url)
-        if repo_ops is not None:
-            await repo_ops.create_all()
-        oms_ops = OmsEngine(ex=data_ex, repo=repo_ops, cfg=None)
-        flip_min = float(os.environ.get("RISK__FUNDING_FLIP_MIN_ABS", "0") or 0)
-        flip_n = int(os.environ.get("RISK__FUNDING_FLIP_CONSECUTIVE", "1") or 1)
-        rm_ops = RiskManager(
-            loss_cut_daily_jpy=cfg.risk.loss_cut_daily_jpy,
-            ws_disconnect_threshold_sec=30.0,
-            hedge_delay_p95_threshold_sec=2.0,
-            api_error_max_in_60s=10,
-            flatten_all=lambda: asyncio.sleep(0),
-            funding_flip_min_abs=flip_min,
-            funding_flip_consecutive=flip_n,
-        )
-        taker_bps = float(os.environ.get("STRATEGY__TAKER_FEE_BPS_ROUNDTRIP", "6.0") or 6.0)
-        slip_bps = float(os.environ.get("STRATEGY__ESTIMATED_SLIPPAGE_BPS", "5.0") or 5.0)
-        strat_ops = FundingBasisStrategy(
-            oms=oms_ops,
-            risk_config=cfg.risk,
-            strategy_config=cfg.strategy,
-            period_seconds=8.0 * 3600.0,
-            taker_fee_bps_roundtrip=taker_bps,
-            estimated_slippage_bps=slip_bps,
-            risk_manager=rm_ops,
-            primary_gateway=data_ex,
-        )
-
-        # 理由文字列の文字化けを簡易補正（戦略側の固定文の既知パターン）
-        def _normalize_reason(reason: str | None) -> str | None:
-            if not reason:
-                return reason
-            mapping = {
-                "�ΏۊO�V���{��": "対象外シンボル",
-                "�\\�z�s���̂��߈�U����": "予測消失のためクローズ",
-                "Funding�������]�ŃN���[�Y": "Fundingがマイナスのためクローズ",
-                "APR��臒l����": "APRが閾値未満",
-                "�f���^�����ɂ��ăw�b�W": "デルタ乖離のためヘッジ",
-                "�z�[���h�p��": "ホールド継続",
-                "���X�N�Ǘ��ŐV�K��~": "リスク管理で新規停止",
-                "Funding�\\�z���擾�ł��Ȃ�": "Funding予測値を取得できない",
-                "����Funding�͐V�K�ΏۊO": "負のFundingは新規対象外",
-                "���ڏ���ɂ�茚�ĕs��": "余力制限により不可",
-                "���Ҏ��v���R�X�g����": "期待収益がコスト未満",
-                "Funding�@��ɂ��V�K����": "Funding条件により新規実行",
-            }
-            return mapping.get(reason, reason)
-
-        rows: list[dict] = []
-        for sym in syms:
-            fi = await data_ex.get_funding_info(sym)
-            bid, ask = await data_ex.get_bbo(sym)
-            # Private auth check
-            auth_ok = True
-            auth_err: str | None = None
-            try:
-                oo = await data_ex.get_open_orders(sym)
-                open_n = len(oo)
-            except Exception as e:
-                auth_ok = False
-                auth_err = str(e)
-                open_n = 0
-            logger.info(
-                "ops.check symbol={} funding={} next={} bbo=({}, {}) open={}",
-                sym,
-                getattr(fi, "predicted_rate", None),
-                getattr(fi, "next_funding_time", None),
-                bid,
-                ask,
-                open_n,
+        try:
+            if repo_ops is not None:
+                await repo_ops.create_all()
+            oms_ops = OmsEngine(ex=data_ex, repo=repo_ops, cfg=None)
+            flip_min = float(os.environ.get("RISK__FUNDING_FLIP_MIN_ABS", "0") or 0)
+            flip_n = int(os.environ.get("RISK__FUNDING_FLIP_CONSECUTIVE", "1") or 1)
+            rm_ops = RiskManager(
+                loss_cut_daily_jpy=cfg.risk.loss_cut_daily_jpy,
+                ws_disconnect_threshold_sec=30.0,
+                hedge_delay_p95_threshold_sec=2.0,
+                api_error_max_in_60s=10,
+                flatten_all=lambda: asyncio.sleep(0),
+                funding_flip_min_abs=flip_min,
+                funding_flip_consecutive=flip_n,
             )
-            # Decision preview
-            try:
-                d = strat_ops.evaluate(
-                    funding=fi,
-                    spot_price=await data_ex.get_ticker(f"{sym}_SPOT"),
-                    perp_price=await data_ex.get_ticker(sym),
-                )
-                action = getattr(getattr(d, "action", None), "name", str(getattr(d, "action", "")))
-                reason = _normalize_reason(getattr(d, "reason", None))
-                apr = getattr(d, "predicted_apr", None)
-            except Exception as e:
-                action, reason, apr = ("ERR", str(e), None)
-            logger.info(
-                "ops.health sym={} auth={} decision={} apr={} reason={}",
-                sym,
-                "OK" if auth_ok else "NG",
-                action,
-                apr,
-                reason,
+            taker_bps = float(os.environ.get("STRATEGY__TAKER_FEE_BPS_ROUNDTRIP", "6.0") or 6.0)
+            slip_bps = float(os.environ.get("STRATEGY__ESTIMATED_SLIPPAGE_BPS", "5.0") or 5.0)
+            strat_ops = FundingBasisStrategy(
+                oms=oms_ops,
+                risk_config=cfg.risk,
+                strategy_config=cfg.strategy,
+                period_seconds=8.0 * 3600.0,
+                taker_fee_bps_roundtrip=taker_bps,
+                estimated_slippage_bps=slip_bps,
+                risk_manager=rm_ops,
+                primary_gateway=data_ex,
             )
-            # 何をする？→ Bitgetゲートウェイを取得（スケール準備・価格状態を参照するため）
-            gw = _get_bitget_gateway(data_ex) or data_ex
-            # 数量刻みと最小制約の内訳（ops-checkの“丸めの根拠”を可視化）
-            qty_step_spot = qty_step_perp = qty_common = None
-            min_qty_spot = min_qty_perp = min_notional_spot = min_notional_perp = None
-            try:
-                if gw is not None:
-                    qs, qp = _qty_steps_for_symbol(gw, sym)
-                    qty_step_spot, qty_step_perp = qs, qp
-                    qty_common = _qty_common_step(gw, sym)
-                    mqs, mqp, mns, mnp = _min_limits_for_symbol(gw, sym)
-                    min_qty_spot, min_qty_perp, min_notional_spot, min_notional_perp = mqs, mqp, mns, mnp
-            except Exception:
-                pass
-            rows.append(
-                {
-                    "ts": datetime.now(timezone.utc).isoformat(),
-                    "symbol": sym,
-                    "funding_predicted": getattr(fi, "predicted_rate", None),
-                    "next_funding_time": str(getattr(fi, "next_funding_time", None)),
-                    "bbo_bid": bid,
-                    "bbo_ask": ask,
-                    # 何をする？→ BBOが“ふつう”かどうかを判定して、ops-checkに書き出す
-                    "bbo_valid": _is_bbo_valid(bid, ask),
-                    # 何をする？→ 価格スケールの準備状況（True/False）をops-checkに書き出す
-                    "price_scale_ready": bool(_scale_ready_for_symbol(gw, sym)) if gw else False,
-                    # 何をする？→ 価格ガードの現在状態（READY/FROZEN/NO_ANCHOR/UNKNOWN）をops-checkに書き出す
-                    "price_state": _price_state_for_symbol(gw, sym) if gw else "UNKNOWN",
-                    # 何をする？→ 市場データREADY判定（Strategyの内部判定を優先。無ければフォールバック）
-                    "md_ready": bool(_market_data_ready_for_ops(strat_ops, sym, bid, ask)[0]),
-                    "md_reason": str(_market_data_ready_for_ops(strat_ops, sym, bid, ask)[1]),
-                    # 何をする？→ OMSのクールダウン現在地を可視化（残り時間ms含む）
-                    "cooldown_active": bool(_cooldown_info_for_symbol(oms_ops, sym)[0]),
-                    "cooldown_left_ms": int(_cooldown_info_for_symbol(oms_ops, sym)[1]),
-                    # 追加: 数量刻み(spot/perp)・共通刻み・最小数量/名目額
-                    "qty_step_spot": qty_step_spot,
-                    "qty_step_perp": qty_step_perp,
-                    "qty_common_step": qty_common,
-                    "min_qty_spot": min_qty_spot,
-                    "min_qty_perp": min_qty_perp,
-                    "min_notional_spot": min_notional_spot,
-                    "min_notional_perp": min_notional_perp,
-                    "auth": bool(auth_ok),
-                    "auth_message": str(getattr(oms_ops, "auth_message", "")),  # 認証理由の可視化（最小追加）
-                    "open_orders": int(open_n),
-                    "decision": action,
-                    "predicted_apr": float(apr) if apr is not None else None,
-                    "reason": reason,
-                    "auth_error": auth_err,
-                    "taker_fee_bps_roundtrip": taker_bps,
-                    "estimated_slippage_bps": slip_bps,
-                    "min_expected_apr": getattr(cfg.strategy, "min_expected_apr", None),
+
+            # 理由文字列の文字化けを簡易補正（戦略側の固定文の既知パターン）
+            def _normalize_reason(reason: str | None) -> str | None:
+                if not reason:
+                    return reason
+                mapping = {
+                    "�ΏۊO�V���{��": "対象外シンボル",
+                    "�\\�z�s���̂��߈�U����": "予測消失のためクローズ",
+                    "Funding�������]�ŃN���[�Y": "Fundingがマイナスのためクローズ",
+                    "APR��臒l����": "APRが閾値未満",
+                    "�f���^�����ɂ��ăw�b�W": "デルタ乖離のためヘッジ",
+                    "�z�[���h�p��": "ホールド継続",
+                    "���X�N�Ǘ��ŐV�K��~": "リスク管理で新規停止",
+                    "Funding�\\�z���擾�ł��Ȃ�": "Funding予測値を取得できない",
+                    "����Funding�͐V�K�ΏۊO": "負のFundingは新規対象外",
+                    "���ڏ���ɂ�茚�ĕs��": "余力制限により不可",
+                    "���Ҏ��v���R�X�g����": "期待収益がコスト未満",
+                    "Funding�@��ɂ��V�K����": "Funding条件により新規実行",
                 }
-            )
-        await data_ex.close()
-        # Optional export
-        if ops_out_csv:
-            try:
-                fieldnames = list(rows[0].keys()) if rows else []
-                with open(ops_out_csv, "w", newline="", encoding="utf-8") as f:
-                    w = csv.DictWriter(f, fieldnames=fieldnames)
-                    if fieldnames:
-                        w.writeheader()
-                    for r in rows:
-                        w.writerow(r)
-                logger.info("ops.export csv={} rows={}", ops_out_csv, len(rows))
-            except Exception as e:
-                logger.warning("ops.export csv failed: {}", e)
-        if ops_out_json:
-            try:
-                with open(ops_out_json, "w", encoding="utf-8") as f:
-                    json.dump(rows, f, ensure_ascii=False, indent=2)
-                logger.info("ops.export json={} rows={}", ops_out_json, len(rows))
-            except Exception as e:
-                logger.warning("ops.export json failed: {}", e)
+                return mapping.get(reason, reason)
+
+            rows: list[dict] = []
+            for sym in syms:
+                fi = await data_ex.get_funding_info(sym)
+                bid, ask = await data_ex.get_bbo(sym)
+                # Private auth check
+                auth_ok = True
+                auth_err: str | None = None
+                try:
+                    oo = await data_ex.get_open_orders(sym)
+                    open_n = len(oo)
+                except Exception as e:
+                    auth_ok = False
+                    auth_err = str(e)
+                    open_n = 0
+                logger.info(
+                    "ops.check symbol={} funding={} next={} bbo=({}, {}) open={}",
+                    sym,
+                    getattr(fi, "predicted_rate", None),
+                    getattr(fi, "next_funding_time", None),
+                    bid,
+                    ask,
+                    open_n,
+                )
+                # Decision preview
+                try:
+                    d = strat_ops.evaluate(
+                        funding=fi,
+                        spot_price=await data_ex.get_ticker(f"{sym}_SPOT"),
+                        perp_price=await data_ex.get_ticker(sym),
+                    )
+                    action = getattr(getattr(d, "action", None), "name", str(getattr(d, "action", "")))
+                    reason = _normalize_reason(getattr(d, "reason", None))
+                    apr = getattr(d, "predicted_apr", None)
+                except Exception as e:
+                    action, reason, apr = ("ERR", str(e), None)
+                logger.info(
+                    "ops.health sym={} auth={} decision={} apr={} reason={}",
+                    sym,
+                    "OK" if auth_ok else "NG",
+                    action,
+                    apr,
+                    reason,
+                )
+                # 何をする？→ Bitgetゲートウェイを取得（スケール準備・価格状態を参照するため）
+                gw = _get_bitget_gateway(data_ex) or data_ex
+                # 数量刻みと最小制約の内訳（ops-checkの“丸めの根拠”を可視化）
+                qty_step_spot = qty_step_perp = qty_common = None
+                min_qty_spot = min_qty_perp = min_notional_spot = min_notional_perp = None
+                try:
+                    if gw is not None:
+                        qs, qp = _qty_steps_for_symbol(gw, sym)
+                        qty_step_spot, qty_step_perp = qs, qp
+                        qty_common = _qty_common_step(gw, sym)
+                        mqs, mqp, mns, mnp = _min_limits_for_symbol(gw, sym)
+                        min_qty_spot, min_qty_perp, min_notional_spot, min_notional_perp = mqs, mqp, mns, mnp
+                except Exception:
+                    pass
+                rows.append(
+                    {
+                        "ts": datetime.now(timezone.utc).isoformat(),
+                        "symbol": sym,
+                        "funding_predicted": getattr(fi, "predicted_rate", None),
+                        "next_funding_time": str(getattr(fi, "next_funding_time", None)),
+                        "bbo_bid": bid,
+                        "bbo_ask": ask,
+                        # 何をする？→ BBOが“ふつう”かどうかを判定して、ops-checkに書き出す
+                        "bbo_valid": _is_bbo_valid(bid, ask),
+                        # 何をする？→ 価格スケールの準備状況（True/False）をops-checkに書き出す
+                        "price_scale_ready": bool(_scale_ready_for_symbol(gw, sym)) if gw else False,
+                        # 何をする？→ 価格ガードの現在状態（READY/FROZEN/NO_ANCHOR/UNKNOWN）をops-checkに書き出す
+                        "price_state": _price_state_for_symbol(gw, sym) if gw else "UNKNOWN",
+                        # 何をする？→ 市場データREADY判定（Strategyの内部判定を優先。無ければフォールバック）
+                        "md_ready": bool(_market_data_ready_for_ops(strat_ops, sym, bid, ask)[0]),
+                        "md_reason": str(_market_data_ready_for_ops(strat_ops, sym, bid, ask)[1]),
+                        # 何をする？→ OMSのクールダウン現在地を可視化（残り時間ms含む）
+                        "cooldown_active": bool(_cooldown_info_for_symbol(oms_ops, sym)[0]),
+                        "cooldown_left_ms": int(_cooldown_info_for_symbol(oms_ops, sym)[1]),
+                        # 追加: 数量刻み(spot/perp)・共通刻み・最小数量/名目額
+                        "qty_step_spot": qty_step_spot,
+                        "qty_step_perp": qty_step_perp,
+                        "qty_common_step": qty_common,
+                        "min_qty_spot": min_qty_spot,
+                        "min_qty_perp": min_qty_perp,
+                        "min_notional_spot": min_notional_spot,
+                        "min_notional_perp": min_notional_perp,
+                        "auth": bool(auth_ok),
+                        "auth_message": str(getattr(oms_ops, "auth_message", "")),  # 認証理由の可視化（最小追加）
+                        "open_orders": int(open_n),
+                        "decision": action,
+                        "predicted_apr": float(apr) if apr is not None else None,
+                        "reason": reason,
+                        "auth_error": auth_err,
+                        "taker_fee_bps_roundtrip": taker_bps,
+                        "estimated_slippage_bps": slip_bps,
+                        "min_expected_apr": getattr(cfg.strategy, "min_expected_apr", None),
+                    }
+                )
+            await data_ex.close()
+            # Optional export
+            if ops_out_csv:
+                try:
+                    fieldnames = list(rows[0].keys()) if rows else []
+                    with open(ops_out_csv, "w", newline="", encoding="utf-8") as f:
+                        w = csv.DictWriter(f, fieldnames=fieldnames)
+                        if fieldnames:
+                            w.writeheader()
+                        for r in rows:
+                            w.writerow(r)
+                    logger.info("ops.export csv={} rows={}", ops_out_csv, len(rows))
+                except Exception as e:
+                    logger.warning("ops.export csv failed: {}", e)
+            if ops_out_json:
+                try:
+                    with open(ops_out_json, "w", encoding="utf-8") as f:
+                        json.dump(rows, f, ensure_ascii=False, indent=2)
+                    logger.info("ops.export json={} rows={}", ops_out_json, len(rows))
+                except Exception as e:
+                    logger.warning("ops.export json failed: {}", e)
+        finally:
+            # 何をする行？→ 途中で例外になっても、ops-check 用と本番用の Repo の接続を必ず閉じる
+            if repo_ops is not None:
+                await repo_ops.dispose()
+            if repo is not None:
+                await repo.dispose()
         return
 
     # 発注先（dry-run は PaperExchange、live は共有BitgetGateway）
@@ -756,6 +766,8 @@ async def _main_async(
                 await oms.drain_and_flatten(cfg.strategy.symbols, strategy, timeout_s=20)  # 安全ドレインを実施
             except Exception:
                 pass
+        if repo is not None:
+            await repo.dispose()  # 溜まった行を保存してから接続を閉じる（ドレインの記録が終わってから）
 
 
 def _precheck_api_key_from_opscheck(path: str = "ops-check.json") -> bool:
@@ -869,21 +881,19 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    try:
-        asyncio.run(
-            _main_async(
-                env=args.env,
-                cfg_path=args.config,
-                dry_run=bool(args.dry_run),
-                flatten_on_exit=bool(args.flatten_on_exit),
-                ops_check=bool(getattr(args, "ops_check", False)),
-                log_level=str(getattr(args, "log_level", "INFO")),
-                ops_out_csv=getattr(args, "ops_out_csv", None),
-                ops_out_json=getattr(args, "ops_out_json", None),
-            )
+    # SIGTERM/SIGINT で _main_async をキャンセルし、finally のクローズ/フラット化まで走らせる
+    run_until_signal(
+        _main_async(
+            env=args.env,
+            cfg_path=args.config,
+            dry_run=bool(args.dry_run),
+            flatten_on_exit=bool(args.flatten_on_exit),
+            ops_check=bool(getattr(args, "ops_check", False)),
+            log_level=str(getattr(args, "log_level", "INFO")),
+            ops_out_csv=getattr(args, "ops_out_csv", None),
+            ops_out_json=getattr(args, "ops_out_json", None),
         )
-    except KeyboardInterrupt:
-        pass
+    )
 
 
 if __name__ == "__main__":
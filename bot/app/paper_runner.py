@@ -14,7 +14,8 @@ from loguru import logger
 
 from bot.config.loader import load_config
 from bot.core.logging import setup_logging
-from bot.core.retry import retryable
+from bot.core.signals import run_until_signal
+from bot.data.buffered_repo import BufferedRepo
 from bot.data.repo import Repo
 from bot.exchanges.bitget import BitgetGateway
 from bot.monitor.metrics import MetricsLogger
@@ -42,7 +43,6 @@ def _price_guard_reason(symbol: str, *, spot_price: float, perp_price: float) ->
     return _check("spot", spot_price) or _check("perp", perp_price)
 
 
-@retryable(tries=999999, wait_initial=1.0, wait_max=30.0)
 async def _run_public_ws(
     data_ex: BitgetGateway,
     paper_ex: PaperExchange,
@@ -52,6 +52,7 @@ async def _run_public_ws(
 
     - channel: books1 → orderbook（BBO）
     - channel: trade  → 約定価格（last）
+    - 断線時の再接続は BitgetGateway.subscribe_public 側で行う
     """
 
     async def _public_trade_cb(msg: dict) -> None:
@@ -72,8 +73,8 @@ async def _run(config_path: str | None) -> None:
     setup_logging(level=log_level)
     cfg = load_config(config_path)
 
-    # DB 接続
-    repo = Repo(db_url=cfg.db_url)
+    # DB 接続（OMS のトレード/注文イベントは書き戻しバッファ経由でまとめて保存）
+    repo = BufferedRepo(Repo(db_url=cfg.db_url))
     await repo.create_all()
 
     # データソース（Bitget REST データのみを利用。実発注は行わない）
@@ -194,6 +195,7 @@ async def _run(config_path: str | None) -> None:
                 await close_coro()
             except Exception as e:  # noqa: BLE001
                 logger.warning("data_ex.close() failed: {}", e)
+        await repo.dispose()  # 溜まった行を保存してから、使い回していたDB接続を閉じる
 
 
 def main() -> None:
@@ -202,10 +204,8 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Paper runner for funding/basis strategy")
     parser.add_argument("--config", type=str, default=None, help="path to config/app.yaml (optional)")
     args = parser.parse_args()
-    try:
-        asyncio.run(_run(args.config))
-    except KeyboardInterrupt:
-        pass
+    # SIGTERM/SIGINT で _run をキャンセルし、finally の ccxt クローズまで走らせる
+    run_until_signal(_run(args.config))
 
 
 if __name__ == "__main__":
@@ -2,18 +2,34 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 
 from bot.config.loader import load_config, redact_secrets
 
+try:  # 何をする行？→ orjson は任意依存。あれば C 実装で整形し、無ければ標準 json にフォールバック
+    import orjson
+except ImportError:  # pragma: no cover - orjson 未導入環境
+    orjson = None  # type: ignore[assignment]
+
+
+def _render_config(path: str | None) -> bytes:
+    """マスク済み設定の JSON（UTF-8 バイト列）を作る"""
+
+    safe = redact_secrets(load_config(path))
+    if orjson is not None:
+        return orjson.dumps(safe, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(safe, indent=2, ensure_ascii=False).encode("utf-8")
+
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", type=str, default=None, help="YAML設定ファイルのパス（省略可）")
     args = parser.parse_args()
 
-    cfg = load_config(args.config)
-    safe = redact_secrets(cfg)
-    print(json.dumps(safe, indent=2, ensure_ascii=False))
+    out = sys.stdout.buffer
+    out.write(_render_config(args.config))
+    out.write(b"\n")
+    out.flush()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import overload
+
+import numpy as np
+from numpy.typing import NDArray
+
+# 何をする行？→ 約定列をまとめて渡すときの配列型（pandas 依存で numpy は常に入っている）
+FloatArray = NDArray[np.float64]
 
 
 @dataclass(frozen=True)
@@ -17,32 +24,90 @@ class CostModel:
     maker_fee_bps: float = 2.0
     min_slippage_bps: float = 1.0
     depth_qty_base: float = 1.0  # 例：BTCで1枚相当
+    # 何をする行？→ bps/1e4 を毎回割らずに済むよう、生成時に倍率へ変換して保持（比較・表示には含めない）
+    _taker_rate: float = field(init=False, repr=False, compare=False)
+    _maker_rate: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """frozen なので object.__setattr__ で派生値（手数料倍率）を一度だけ計算して格納する"""
+
+        object.__setattr__(self, "_taker_rate", float(self.taker_fee_bps) / 1e4)
+        object.__setattr__(self, "_maker_rate", float(self.maker_fee_bps) / 1e4)
+
 
+@overload
+def taker_fee(notional: float, *, model: CostModel) -> float: ...
+@overload
+def taker_fee(notional: FloatArray, *, model: CostModel) -> FloatArray: ...
 
-def taker_fee(notional: float, *, model: CostModel) -> float:
+
+def taker_fee(notional: float | FloatArray, *, model: CostModel) -> float | FloatArray:
     """これは何をする関数？
     → テイカー手数料（USDT想定）を返します：notional × bps / 1e4
+      - ndarray を渡すと全約定分を1回の乗算でまとめて返す（スカラー入力はスカラーのまま）
     """
 
-    return float(notional) * (model.taker_fee_bps / 1e4)
+    if isinstance(notional, np.ndarray):
+        return np.asarray(notional, dtype=np.float64) * model._taker_rate
+    return float(notional) * model._taker_rate
+
 
+@overload
+def maker_fee(notional: float, *, model: CostModel) -> float: ...
+@overload
+def maker_fee(notional: FloatArray, *, model: CostModel) -> FloatArray: ...
 
-def maker_fee(notional: float, *, model: CostModel) -> float:
+
+def maker_fee(notional: float | FloatArray, *, model: CostModel) -> float | FloatArray:
     """これは何をする関数？
     → メイカー手数料（USDT想定）を返します：notional × bps / 1e4
+      - ndarray を渡すと全約定分を1回の乗算でまとめて返す（スカラー入力はスカラーのまま）
     """
 
-    return float(notional) * (model.maker_fee_bps / 1e4)
+    if isinstance(notional, np.ndarray):
+        return np.asarray(notional, dtype=np.float64) * model._maker_rate
+    return float(notional) * model._maker_rate
+
 
+@overload
+def estimate_slippage_bps(qty_base: float, *, model: CostModel) -> float: ...
+@overload
+def estimate_slippage_bps(qty_base: FloatArray, *, model: CostModel) -> FloatArray: ...
 
-def estimate_slippage_bps(qty_base: float, *, model: CostModel) -> float:
+
+def estimate_slippage_bps(qty_base: float | FloatArray, *, model: CostModel) -> float | FloatArray:
     """これは何をする関数？
     → 約定サイズ（ベース数量）と仮想的な板厚（depth_qty_base）から、スリッページの概算bpsを返します。
       - qty_base が depth_qty_base と同程度→ 数bps 程度
       - 比例で増やすが、最低 model.min_slippage_bps は下回らない
+      - ndarray を渡すと同じ式をベクトル演算で一括評価する
     """
 
-    if model.depth_qty_base <= 0:
-        return model.min_slippage_bps
-    ratio = max(0.0, float(qty_base)) / float(model.depth_qty_base)
-    return max(model.min_slippage_bps, model.min_slippage_bps * (1.0 + ratio))
+    if isinstance(qty_base, np.ndarray):
+        return _estimate_slippage_bps_array(qty_base, model=model)
+    return _slip_py(float(qty_base), float(model.depth_qty_base), float(model.min_slippage_bps))
+
+
+def _slip_py(q: float, depth: float, min_bps: float) -> float:
+    """estimate_slippage_bps の数値カーネル（属性参照を含まない生の float だけで計算する）
+
+    1約定ずつ Python から呼ぶ経路なので JIT はしない（numba のディスパッチの方が式より重い）。
+    """
+
+    if depth <= 0:
+        return min_bps
+    r = q / depth if q > 0 else 0.0
+    slip = min_bps * (1.0 + r)
+    return slip if slip > min_bps else min_bps
+
+
+def _estimate_slippage_bps_array(qty_base: FloatArray, *, model: CostModel) -> FloatArray:
+    """estimate_slippage_bps の配列版（スカラー版と同じ式を np.maximum で一括評価）"""
+
+    qty = np.asarray(qty_base, dtype=np.float64)
+    min_bps = float(model.min_slippage_bps)
+    depth = float(model.depth_qty_base)
+    if depth <= 0:
+        return np.full(qty.shape, min_bps, dtype=np.float64)
+    ratio = np.maximum(0.0, qty) / depth
+    return np.maximum(min_bps, min_bps * (1.0 + ratio))
@@ -2,15 +2,28 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import bisect
+import copy
+import functools
 import os
-from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Mapping
 
+import numpy as np
 import pandas as pd
 from loguru import logger
+from sqlalchemy.engine import make_url
+
+try:  # 何をする行？→ pyarrow は任意依存。あれば C++ 実装のマルチスレッド CSV/Parquet リーダで読み込む
+    import pyarrow as pa
+    import pyarrow.compute as pa_pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_ds
+    import pyarrow.parquet as pa_pq
+except ImportError:  # pragma: no cover - pyarrow 未導入環境では pandas で読む
+    pa = None
 
 from bot.config.loader import load_config
 from bot.config.models import RiskConfig, StrategyFundingConfig
@@ -25,8 +38,43 @@ from bot.strategy.funding_basis.engine import FundingBasisStrategy
 
 # ===== 価格フィード =====
 
+_PRICE_COLUMNS = ("ts", "symbol", "bid", "ask", "last")
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NS_PER_US = 1_000
+_NS_PER_DAY = 86_400 * 1_000_000_000
+_NS_MAX = int(np.iinfo(np.int64).max)
+# 何をする行？→ 1日分のティックを Python オブジェクトへ展開するときの区切り行数（ピークメモリを一定に抑える）
+_ITER_CHUNK = 1 << 16
+
+
+def _day_bounds(date_utc: str) -> tuple[datetime, datetime]:
+    """これは何をする関数？
+    → UTC日（YYYY-MM-DD）を半開区間 [その日0時, 翌日0時) の tz-aware datetime 2つに変換します。
+    """
+    try:
+        # 何をする行？→ 通常の YYYY-MM-DD は標準ライブラリで直接解釈する（pandas を経由しない）
+        d = date.fromisoformat(date_utc)
+    except ValueError:
+        d = pd.to_datetime(date_utc).date()  # それ以外の表記（例: 2025/01/01）は従来どおり pandas に任せる
+    # pandas 2.x の Timestamp.combine は tz 引数を受けないため、標準の datetime を用いる
+    start = datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def _datetime_to_ns(dt: datetime) -> int:
+    """これは何をする関数？→ tz付き datetime を UTC エポックからの int64 ナノ秒へ変換します（float を経由しない）。"""
+
+    return (dt - _EPOCH) // timedelta(microseconds=1) * _NS_PER_US
+
+
+def _ns_to_datetime(ns: int) -> datetime:
+    """これは何をする関数？→ UTC エポックナノ秒を tz付き datetime（μs 精度）へ戻します。pandas.Timestamp を経由しない。"""
+
+    return _EPOCH + timedelta(microseconds=ns // _NS_PER_US)
+
+
+@dataclass(slots=True, frozen=True)
 class PriceTick:
     """これは何を表す型？
     → 単一ティック（時刻・銘柄・BBO/last）を表現します。
@@ -42,49 +90,157 @@ class PriceTick:
 class CsvPriceFeed:
     """CSV/Parquetから価格データを読み、時系列順にティックを返すフィード"""
 
-    def __init__(self, *, path: str) -> None:
+    def __init__(self, *, path: str, cache: bool = False) -> None:
         """これは何をする関数？
         → path のCSV/Parquetを読み込み、必要な列を揃えます。
            必須列: ts, symbol, bid, ask, last（ bid/ask/last は None 可 ）
            ts は ISO8601 か epoch(ms/秒) を許容。
+           cache=True のときは整形済みの列を CSV の隣の "<名前>.cache.parquet" に保存し、次回以降はそちらを読みます。
+           ts がタイムスタンプ型の Parquet は全体を読まず、日ごとに必要な行だけを読みます（_open_dataset）。
         """
 
         self._path = Path(path)
-        self._df = self._load(self._path)
+        # 日ごとに読む Parquet データセット（ts 列名と一緒に持つ。None なら全体をメモリに載せる）
+        self._dataset: tuple[Any, str] | None = self._open_dataset(self._path)
+        if self._dataset is not None:
+            df = self._normalize(pd.DataFrame({k: [] for k in _PRICE_COLUMNS}))  # 全体用の列配列は空で持つ
+        else:
+            df = self._load_cached(self._path) if cache else self._load(self._path)
+        # 何をする行？→ ソート済みの各列を NumPy 配列（SoA）として一度だけ取り出し、以後は DataFrame を持たない
+        self._ts_ns: np.ndarray = df["ts"].to_numpy(dtype="datetime64[ns]").view("int64")
+        self._sym_codes: np.ndarray = df["symbol"].cat.codes.to_numpy()
+        self._sym_names: list[str] = list(df["symbol"].cat.categories)  # コード→銘柄名
+        self._bid: np.ndarray = df["bid"].to_numpy(dtype=np.float64)
+        self._ask: np.ndarray = df["ask"].to_numpy(dtype=np.float64)
+        self._last: np.ndarray = df["last"].to_numpy(dtype=np.float64)
+        # 日付 → 行範囲 [lo, hi) のキャッシュ（同じ日を複数の Runner/パラメータで回すときに二分探索を繰り返さない）
+        self._day_slices: dict[str, tuple[int, int]] = {}
+
+    @staticmethod
+    def _read_raw(p: Path) -> pd.DataFrame:
+        """これは何をする関数？
+        → ファイルを DataFrame に読み込みます（列名の大小文字は問わない）。
+           pyarrow があれば Parquet は必要列だけを射影して読み、CSV は BBO 列を float64 固定で並列パースします。
+        """
+
+        is_parquet = p.suffix.lower() in {".parquet", ".pq"}
+        if pa is None:
+            return pd.read_parquet(p) if is_parquet else pd.read_csv(p)
+        if is_parquet:
+            pf = pa_pq.ParquetFile(p)
+            names = [n for n in pf.schema_arrow.names if n.lower() in _PRICE_COLUMNS]
+            return pf.read(columns=names).to_pandas()
+        convert = pa_csv.ConvertOptions(column_types={k: pa.float64() for k in ("bid", "ask", "last")})
+        return pa_csv.read_csv(p, convert_options=convert).to_pandas()
+
+    @staticmethod
+    def _parse_ts_ns(ser: pd.Series) -> np.ndarray:
+        """これは何をする関数？
+        → ts 列（epoch ms/秒 または 日時文字列）を UTC の int64 ns 配列にします。
+           整数 epoch は datetime64 への型変換だけで済ませ、文字列は ISO8601 固定書式で解釈します（dateutil の推測を避ける）。
+        """
+
+        if pd.api.types.is_integer_dtype(ser):
+            # 13桁→ms、10桁→秒
+            unit = "ms" if ser.max() > 1e12 else "s"
+            return ser.to_numpy().astype(f"datetime64[{unit}]").astype("datetime64[ns]").view("int64")
+        if pd.api.types.is_numeric_dtype(ser):
+            # 欠損や小数を含む epoch は従来どおり pandas に任せる
+            ser = pd.to_datetime(ser, unit="ms" if ser.max() > 1e12 else "s", utc=True)
+        elif pd.api.types.is_datetime64_any_dtype(ser):
+            ser = pd.to_datetime(ser, utc=True)
+        else:
+            try:
+                # cache=True で同一時刻文字列（銘柄違いの同時刻行）の解釈を使い回す
+                ser = pd.to_datetime(ser, utc=True, format="ISO8601", cache=True)
+            except ValueError:
+                ser = pd.to_datetime(ser, utc=True)  # ISO8601 以外の表記は従来の推測解釈へフォールバック
+        # utc=True で既に UTC なので tz_convert は不要
+        return ser.to_numpy(dtype="datetime64[ns]").view("int64")
+
+    def _load_cached(self, p: Path) -> pd.DataFrame:
+        """これは何をする関数？
+        → 整形済み Parquet キャッシュが元ファイルより新しければそれを読み、なければ _load して保存します。
+           Parquet 入力・pyarrow 未導入時・保存できない場所ではキャッシュを使わず _load と同じ結果を返します。
+        """
+
+        if pa is None or p.suffix.lower() in {".parquet", ".pq"}:
+            return self._load(p)
+        cache = p.with_name(p.name + ".cache.parquet")
+        try:
+            if cache.stat().st_mtime_ns >= p.stat().st_mtime_ns:
+                return pd.read_parquet(cache)
+        except (OSError, ValueError, pa.ArrowException):
+            pass  # キャッシュなし/壊れている → 読み直して作り直す
+        df = self._load(p)
+        try:
+            df.to_parquet(cache, compression="lz4", index=False)
+        except OSError:
+            pass  # 書き込めない場所ならキャッシュなしで続行
+        return df
+
+    @staticmethod
+    def _open_dataset(p: Path) -> tuple[Any, str] | None:
+        """これは何をする関数？
+        → ts 列がタイムスタンプ型の Parquet なら pyarrow.dataset を開き、(データセット, ts 列名) を返します。
+           日付の範囲条件を Parquet の統計情報に押し下げて読めるのはこの場合だけなので、それ以外は None（全体読み込み）です。
+        """
+
+        if pa is None or p.suffix.lower() not in {".parquet", ".pq"}:
+            return None
+        dataset = pa_ds.dataset(p, format="parquet")
+        cols = {n.lower(): n for n in dataset.schema.names}
+        for k in _PRICE_COLUMNS:
+            if k not in cols:
+                raise ValueError(f"missing column: {k}")
+        if not pa.types.is_timestamp(dataset.schema.field(cols["ts"]).type):
+            return None
+        return dataset, cols["ts"]
+
+    def _read_day(self, date_utc: str) -> pd.DataFrame:
+        """これは何をする関数？
+        → データセットから指定UTC日の行だけを、必要列の射影と ts の範囲条件付きで読み、標準列に整形します。
+        """
+
+        assert self._dataset is not None
+        dataset, ts_col = self._dataset
+        ts_type = dataset.schema.field(ts_col).type
+        day_start, day_end = _day_bounds(date_utc)
+        # 何をする行？→ 境界を列と同じ型（単位・tz有無）のスカラーにする（tz なし列は UTC として扱う _parse_ts_ns と揃える）
+        lo, hi = (
+            pa.scalar(_datetime_to_ns(t), type=pa.timestamp("ns", tz=ts_type.tz)).cast(ts_type)
+            for t in (day_start, day_end)
+        )
+        names = [n for n in dataset.schema.names if n.lower() in _PRICE_COLUMNS]
+        field = pa_pc.field(ts_col)
+        return self._normalize(dataset.to_table(columns=names, filter=(field >= lo) & (field < hi)).to_pandas())
 
     def _load(self, p: Path) -> pd.DataFrame:
         """これは何をする関数？→ CSV/Parquet を読み込み、標準列に整形します。"""
 
-        if p.suffix.lower() in {".parquet", ".pq"}:
-            df = pd.read_parquet(p)
-        else:
-            df = pd.read_csv(p)
+        return self._normalize(self._read_raw(p))
+
+    def _normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """これは何をする関数？→ 読み込んだ生の列を、ts(UTC)/symbol(カテゴリ)/bid/ask/last の (ts, symbol) 順に整形します。"""
+
         cols = {c.lower(): c for c in df.columns}
-        need = ["ts", "symbol", "bid", "ask", "last"]
-        for k in need:
+        for k in _PRICE_COLUMNS:
             if k not in cols:
                 raise ValueError(f"missing column: {k}")
-        # ts 正規化
-        ts_col = cols["ts"]
-        ser = df[ts_col]
-        if pd.api.types.is_numeric_dtype(ser):
-            # 13桁→ms、10桁→秒
-            if ser.max() > 1e12:
-                ser = pd.to_datetime(ser, unit="ms", utc=True)
-            else:
-                ser = pd.to_datetime(ser, unit="s", utc=True)
-        else:
-            ser = pd.to_datetime(ser, utc=True)
-        df["_ts"] = ser.dt.tz_convert("UTC")
+        ts_ns = self._parse_ts_ns(df[cols["ts"]])
+        # 何をする行？→ symbol はカテゴリ化し、(ts, symbol) の並べ替えを整数キー（ns, カテゴリコード）の安定 lexsort で行う
+        #   カテゴリは辞書順に並ぶため、コード順＝文字列順になり sort_values(["ts","symbol"]) と同じ順序になる
+        sym = pd.Categorical(df[cols["symbol"]].astype(str))
+        order = np.lexsort((sym.codes, ts_ns))
         out = pd.DataFrame(
             {
-                "ts": df["_ts"],
-                "symbol": df[cols["symbol"]].astype(str),
-                "bid": pd.to_numeric(df[cols["bid"]], errors="coerce"),
-                "ask": pd.to_numeric(df[cols["ask"]], errors="coerce"),
-                "last": pd.to_numeric(df[cols["last"]], errors="coerce"),
+                "ts": pd.DatetimeIndex(ts_ns[order].view("datetime64[ns]")).tz_localize("UTC"),
+                "symbol": sym.take(order),
+                "bid": pd.to_numeric(df[cols["bid"]], errors="coerce").to_numpy(dtype=np.float64)[order],
+                "ask": pd.to_numeric(df[cols["ask"]], errors="coerce").to_numpy(dtype=np.float64)[order],
+                "last": pd.to_numeric(df[cols["last"]], errors="coerce").to_numpy(dtype=np.float64)[order],
             }
-        ).sort_values(["ts", "symbol"], kind="mergesort")
+        )
         return out
 
     def iter_ticks(self, *, date_utc: str) -> Iterable[PriceTick]:
@@ -92,19 +248,64 @@ class CsvPriceFeed:
         → 指定UTC日（YYYY-MM-DD）に属するティックを、時刻順に返します。
         """
 
-        d = pd.to_datetime(date_utc).date()
-        # pandas 2.x の Timestamp.combine は tz 引数を受けないため、標準の datetime を用いる
-        start = datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
-        end = start + timedelta(days=1)
-        df = self._df[(self._df["ts"] >= pd.Timestamp(start)) & (self._df["ts"] < pd.Timestamp(end))]
-        for row in df.itertuples(index=False):
-            yield PriceTick(ts=row.ts.to_pydatetime(), symbol=row.symbol, bid=row.bid, ask=row.ask, last=row.last)
+        for _ts_ns, ts, symbol, bid, ask, last in self._iter_day(date_utc):
+            yield PriceTick(ts=ts, symbol=symbol, bid=bid, ask=ask, last=last)
+
+    def _day_slice(self, date_utc: str) -> tuple[int, int]:
+        """これは何をする関数？
+        → 指定UTC日に属する行の範囲 [lo, hi) を返します。_ts_ns は _load で時刻順に並べてあることが前提です。
+        """
+
+        rng = self._day_slices.get(date_utc)
+        if rng is None:
+            start_ns = _datetime_to_ns(_day_bounds(date_utc)[0])
+            lo, hi = np.searchsorted(self._ts_ns, [start_ns, start_ns + _NS_PER_DAY], side="left")
+            rng = self._day_slices[date_utc] = (int(lo), int(hi))
+        return rng
+
+    def _iter_day(self, date_utc: str) -> Iterator[tuple[int, datetime, str, float, float, float]]:
+        """これは何をする関数？
+        → iter_ticks と同じティックを、PriceTick を作らずに素のタプル (ts_ns, ts, symbol, bid, ask, last) で返します。
+           ts_ns は ts と同じ時刻の int64 ns（マイクロ秒精度）で、時刻比較を整数で行う用です。
+           日境界は _day_slice の [lo, hi) で、列配列のスライス（マスク/コピーなし）だけを走査します。
+           Parquet データセットの場合は _read_day でその日の行だけを読んでから同じように走査します。
+        """
+
+        if self._dataset is not None:
+            # 何をする行？→ Parquet データセットはその日の行だけを読み、同じ形の列配列にして走査する
+            df = self._read_day(date_utc)
+            ts_arr = df["ts"].to_numpy(dtype="datetime64[ns]").view("int64")
+            code_arr = df["symbol"].cat.codes.to_numpy()
+            names = list(df["symbol"].cat.categories)
+            bid_arr = df["bid"].to_numpy(dtype=np.float64)
+            ask_arr = df["ask"].to_numpy(dtype=np.float64)
+            last_arr = df["last"].to_numpy(dtype=np.float64)
+            lo, hi = 0, len(df)
+        else:
+            ts_arr, code_arr, names = self._ts_ns, self._sym_codes, self._sym_names
+            bid_arr, ask_arr, last_arr = self._bid, self._ask, self._last
+            lo, hi = self._day_slice(date_utc)
+        # 何をする行？→ 区間の列を tolist() でまとめて Python の int/float/str に変換し、行ごとの pandas 経由を避ける
+        #   1日分を一度に展開すると Python オブジェクトのリストが行数×5本ぶん膨らむので、_ITER_CHUNK 行ずつ区切る
+        for start in range(lo, hi, _ITER_CHUNK):
+            stop = min(start + _ITER_CHUNK, hi)
+            #   ts は PriceTick.ts（datetime）と同じマイクロ秒に揃える
+            rows = zip(
+                (ts_arr[start:stop] // _NS_PER_US * _NS_PER_US).tolist(),
+                code_arr[start:stop].tolist(),
+                bid_arr[start:stop].tolist(),
+                ask_arr[start:stop].tolist(),
+                last_arr[start:stop].tolist(),
+                strict=True,
+            )
+            for ts_ns, code, bid, ask, last in rows:
+                yield ts_ns, _ns_to_datetime(ts_ns), names[code], bid, ask, last
 
 
 # ===== Funding スケジュール =====
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FundingRateEvent:
     """これは何を表す型？
     → Funding発生時刻とレート（期間当たり、符号付）を表現します。
@@ -124,9 +325,49 @@ class FundingSchedule:
            rate は「その期間の実現レート」（符号付）で、MVPでは predicted=next_rate として扱います。
         """
 
-        self._path = Path(path)
-        self._events: list[FundingRateEvent] = self._load(self._path)
-        self._applied_idx: dict[str, int] = {}  # 銘柄ごとに「どこまで適用済みか」を持つ
+        self._path: Path | None = Path(path)
+        self._set_events(self._load(self._path))
+
+    @classmethod
+    def empty(cls) -> "FundingSchedule":
+        """これは何をする関数？→ イベント0件のスケジュールを、ファイルを介さずに作ります（スケジュール省略時のダミー）。"""
+
+        obj = cls.__new__(cls)
+        obj._path = None
+        obj._set_events([])
+        return obj
+
+    def _set_events(self, events: list[FundingRateEvent]) -> None:
+        """これは何をする関数？→ (ts, symbol) 順のイベント列を保持し、検索用の索引とカーソルを作ります。"""
+
+        self._events: list[FundingRateEvent] = events
+        # 何をする行？→ 銘柄ごとに「ts（datetime）のリスト・イベント列」を時刻順で持ち、bisect で引けるようにする
+        self._by_sym: dict[str, tuple[list[datetime], list[FundingRateEvent]]] = self._index_by_symbol(self._events)
+        # 何をする行？→ 全イベントの ts(ns) リストと「何件目まで適用済みか」のカーソル（_events は (ts, symbol) 順）
+        self._ts_ns: list[int] = [_datetime_to_ns(e.ts) for e in self._events]
+        self._cursor = 0
+        self._next_due_ns = self._due_ns_at(0)
+
+    def _due_ns_at(self, cursor: int) -> int:
+        """これは何をする関数？→ cursor 位置のイベント時刻（ns）を返します。未適用イベントがなければ int64 の最大値。"""
+
+        return self._ts_ns[cursor] if cursor < len(self._ts_ns) else _NS_MAX
+
+    @property
+    def next_due_ns(self) -> int:
+        """これは何をする関数？→ 次に期限が来る未適用イベントの時刻（ns）。これより前の now では due_events は空になります。"""
+
+        return self._next_due_ns
+
+    def fork(self) -> "FundingSchedule":
+        """これは何をする関数？
+        → 読み込み済みのイベント/索引を共有し、適用カーソルだけ空にした複製を返します（日ごとの並列リプレイ用）。
+        """
+
+        other = copy.copy(self)
+        other._cursor = 0
+        other._next_due_ns = other._due_ns_at(0)
+        return other
 
     def _load(self, p: Path) -> list[FundingRateEvent]:
         df = pd.read_csv(p)
@@ -141,37 +382,52 @@ class FundingSchedule:
         out.sort(key=lambda x: (x.ts, x.symbol))
         return out
 
+    @staticmethod
+    def _index_by_symbol(
+        events: list[FundingRateEvent],
+    ) -> dict[str, tuple[list[datetime], list[FundingRateEvent]]]:
+        """これは何をする関数？→ (ts, symbol) でソート済みのイベント列を銘柄ごとのリストに分けます（順序は保持）。"""
+
+        groups: dict[str, list[FundingRateEvent]] = {}
+        for ev in events:
+            groups.setdefault(ev.symbol, []).append(ev)
+        return {sym: ([e.ts for e in evs], evs) for sym, evs in groups.items()}
+
     def next_rate_and_time(self, *, symbol: str, now: datetime) -> tuple[float | None, datetime | None]:
         """これは何をする関数？
         → 現在時刻に対する「次のFundingレートと時刻」を返します（なければ両方None）。
         """
 
-        for ev in self._events:
-            if ev.symbol == symbol and ev.ts > now:
-                return ev.rate, ev.ts
-        return None, None
+        entry = self._by_sym.get(symbol)
+        if entry is None:
+            return None, None
+        ts_list, evs = entry
+        # 何をする行？→ ts > now となる最初の位置を O(log N) で求める。1件だけの問い合わせなので、
+        #   ns への変換や NumPy スカラーの往復が要らない bisect で datetime 同士を直接比較する
+        idx = bisect.bisect_right(ts_list, now)
+        if idx >= len(evs):
+            return None, None
+        ev = evs[idx]
+        return ev.rate, ev.ts
 
     def due_events(self, *, now: datetime) -> list[FundingRateEvent]:
         """これは何をする関数？
         → まだ適用していない「期限到来のFundingイベント」をすべて返します。
         """
 
-        out: list[FundingRateEvent] = []
-        for sym in set(e.symbol for e in self._events):
-            idx = self._applied_idx.get(sym, 0)
-            while idx < len(self._events):
-                ev = self._events[idx]
-                if ev.symbol != sym:
-                    idx += 1
-                    continue
-                if ev.ts <= now:
-                    out.append(ev)
-                    idx += 1
-                else:
-                    break
-            self._applied_idx[sym] = idx
-        # 時刻順に返す
-        out.sort(key=lambda x: (x.ts, x.symbol))
+        return self.due_events_ns(_datetime_to_ns(now))
+
+    def due_events_ns(self, now_ns: int) -> list[FundingRateEvent]:
+        """これは何をする関数？→ due_events の int64 ns 版（datetime を介さず整数比較だけで判定する）。"""
+
+        if now_ns < self._next_due_ns:
+            return []
+        # 何をする行？→ ts <= now の件数＝新しいカーソル位置。_events は (ts, symbol) 順なので差分スライスがそのまま時刻順になる
+        #   探索は未適用の範囲 [cursor, N) だけに絞る
+        new_cursor = bisect.bisect_right(self._ts_ns, now_ns, lo=self._cursor)
+        out = self._events[self._cursor : new_cursor]
+        self._cursor = new_cursor
+        self._next_due_ns = self._due_ns_at(new_cursor)
         return out
 
 
@@ -188,6 +444,9 @@ class ReplayDataSource(ExchangeGateway):
         self._schedule = schedule
         self._now: datetime = datetime.now(timezone.utc)
         self._tickers: dict[str, float] = {}
+        # 銘柄ごとの FundingInfo を (有効開始, 有効期限=next_funding_time, 値) で使い回す。
+        # now が次の Funding 時刻をまたぐまで結果は変わらないので、ティックごと・step ごとの再計算を省く
+        self._funding_cache: dict[str, tuple[datetime, datetime | None, FundingInfo]] = {}
 
     def set_now(self, now: datetime) -> None:
         """これは何をする関数？→ シミュレーション現在時刻を更新します。"""
@@ -195,22 +454,49 @@ class ReplayDataSource(ExchangeGateway):
         self._now = now
 
     def update_price(self, symbol: str, *, bid: float | None, ask: float | None, last: float | None) -> None:
-        """これは何をする関数？→ フォールバック用の近似価格を内部更新します。"""
+        """これは何をする関数？
+        → フォールバック用の近似価格を内部更新します。
+           価格フィードの列はすでに float なので再キャストせず、直前と同じ値なら書き込みも省きます。
+        """
 
         if last is not None:
-            self._tickers[symbol] = float(last)
+            px = last
         elif bid is not None and ask is not None:
-            self._tickers[symbol] = (float(bid) + float(ask)) / 2.0
+            px = (bid + ask) / 2.0
+        else:
+            return
+        tickers = self._tickers
+        if tickers.get(symbol) != px:
+            tickers[symbol] = px
 
     async def get_funding_info(self, symbol: str) -> FundingInfo:
         """これは何をする関数？→ 次のFunding予想レートと時刻を返します（currentは未使用）。"""
 
-        rate, t = self._schedule.next_rate_and_time(symbol=symbol, now=self._now)
-        return FundingInfo(symbol=symbol, current_rate=None, predicted_rate=rate, next_funding_time=t)
+        return self._get_funding_info_sync(symbol)
 
     async def get_ticker(self, symbol: str) -> float:
         """これは何をする関数？→ 近似価格（last→mid）を返します。"""
 
+        return self._get_ticker_sync(symbol)
+
+    def _get_funding_info_sync(self, symbol: str) -> FundingInfo:
+        """これは何をする関数？→ get_funding_info の同期版（メモリ上の参照だけなので await 不要）。"""
+
+        now = self._now
+        cached = self._funding_cache.get(symbol)
+        if cached is not None:
+            valid_from, valid_until, info = cached
+            # 何をする行？→ 計算した時刻以降かつ次の Funding 時刻より前なら、bisect の結果は同じなのでそのまま返す
+            if valid_from <= now and (valid_until is None or now < valid_until):
+                return info
+        rate, t = self._schedule.next_rate_and_time(symbol=symbol, now=now)
+        info = FundingInfo(symbol=symbol, current_rate=None, predicted_rate=rate, next_funding_time=t)
+        self._funding_cache[symbol] = (now, t, info)
+        return info
+
+    def _get_ticker_sync(self, symbol: str) -> float:
+        """これは何をする関数？→ get_ticker の同期版。"""
+
         return float(self._tickers.get(symbol, 0.0))
 
     # 未使用API（MVP）
@@ -240,6 +526,159 @@ class ReplayDataSource(ExchangeGateway):
 
 # ===== ランナー本体 =====
 
+# backtest用の最低限メタ（OMSのサイズガードに必要）。銘柄ごとに初出時だけコピーして _scale_cache に載せる
+_BT_SCALE_META: dict[str, float] = {
+    "priceScale": 2,
+    # qtyの刻み/最小（実取引所とは異なるが、dust注文を抑止できる程度の値にする）
+    "qtyStep_perp": 1e-6,
+    "qtyStep_spot": 1e-6,
+    "minQty_perp": 1e-6,
+    "minQty_spot": 1e-6,
+    # 最小名目（USDT想定）。5USDT未満は skip して現実のrejectに近づける
+    "minNotional_perp": 5.0,
+    "minNotional_spot": 5.0,
+}
+
+
+def _walk_positions_py(
+    price: np.ndarray, qty: np.ndarray, sign: np.ndarray, ts_us: np.ndarray, sym_code: np.ndarray, n_syms: int
+) -> tuple[float, int, int, float, int]:
+    """これは何をする関数？
+    → 時刻順に並んだ約定配列を1本ずつ歩き、銘柄ごとの建玉状態から（実現損益, エントリー数, イグジット数,
+       保有秒の合計, 保有回数）を求める数値カーネル（属性参照を含まない配列とスカラーだけで計算する）。
+    """
+
+    size = np.zeros(n_syms)
+    avg = np.zeros(n_syms)
+    entry_us = np.zeros(n_syms, dtype=np.int64)
+    has_entry = np.zeros(n_syms, dtype=np.bool_)
+    realized = 0.0
+    entries = 0
+    exits = 0
+    hold_sum = 0.0
+    hold_cnt = 0
+
+    for i in range(price.shape[0]):
+        k = sym_code[i]
+        px = price[i]
+        signed_qty = qty[i] * sign[i]
+        sz = size[k]
+
+        if sz == 0 or sz * signed_qty >= 0:
+            new_size = sz + signed_qty
+            if new_size != 0:
+                avg[k] = ((avg[k] * abs(sz)) + px * abs(signed_qty)) / abs(new_size)
+            else:
+                avg[k] = px
+            if sz == 0 and new_size != 0:
+                entries += 1
+                entry_us[k] = ts_us[i]
+                has_entry[k] = True
+            size[k] = new_size
+            continue
+
+        close_qty = min(abs(sz), abs(signed_qty))
+        if sz > 0:
+            realized += (px - avg[k]) * close_qty
+        else:
+            realized += (avg[k] - px) * close_qty
+
+        new_size = sz + signed_qty
+        if abs(new_size) < 1e-12:
+            exits += 1
+            if has_entry[k]:
+                hold_sum += (ts_us[i] - entry_us[k]) / 1e6
+                hold_cnt += 1
+            size[k] = 0.0
+            avg[k] = 0.0
+            has_entry[k] = False
+        else:
+            size[k] = new_size
+            avg[k] = px
+            entry_us[k] = ts_us[i]
+            has_entry[k] = True
+            entries += 1
+
+    return realized, entries, exits, hold_sum, hold_cnt
+
+
+# 何をする行？→ _walk_positions が初回に選んだ実装（numba の JIT 版か Python 版）。import 時には決めない
+_walk_positions_impl: Callable[..., tuple[float, int, int, float, int]] | None = None
+
+
+def _walk_positions(
+    price: np.ndarray, qty: np.ndarray, sign: np.ndarray, ts_us: np.ndarray, sym_code: np.ndarray, n_syms: int
+) -> tuple[float, int, int, float, int]:
+    """これは何をする関数？
+    → _walk_positions_py を呼びます。初回だけ numba（任意依存）を import し、入っていれば JIT 版
+       （コンパイル結果はディスクにキャッシュ）、無ければ Python 版を選びます。
+       replay を import するだけのプロセス（CLI・ライブ系・テスト）には numba の読み込みと JIT の費用をかけません。
+    """
+
+    global _walk_positions_impl
+    impl = _walk_positions_impl
+    if impl is None:
+        try:
+            from numba import njit
+        except ImportError:  # pragma: no cover - numba 未導入環境
+            impl = _walk_positions_py
+        else:
+            impl = njit(cache=True)(_walk_positions_py)
+        _walk_positions_impl = impl
+    return impl(price, qty, sign, ts_us, sym_code, n_syms)
+
+
+def _calc_trade_metrics(trades: list, cost_model: CostModel) -> tuple[float, float, float, int, int, float | None]:
+    """これは何をする関数？
+    → 1日分のトレード行から（実現損益, 手数料, スリッページ推定, エントリー数, イグジット数, 平均保有秒）を求めます。
+       手数料・スリッページは行を配列へ詰める1パスで足し込み、建玉の状態遷移は数値カーネル _walk_positions に任せます。
+    """
+
+    trades_sorted = sorted(trades, key=lambda x: x.ts)
+    n = len(trades_sorted)
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0, 0, None
+
+    fees = 0.0
+    slippage = 0.0
+    price = np.empty(n)
+    qty = np.empty(n)
+    sign = np.empty(n)
+    ts_us = np.empty(n, dtype=np.int64)
+    sym_code = np.empty(n, dtype=np.int64)
+    codes: dict[str, int] = {}
+    venues: list[str] = []  # 銘柄コード → venue（シンボル名からの判定は銘柄ごとに1回だけ）
+    side_sign: dict[str | None, float] = {}
+    taker_fee = cost_model.taker_fee
+    slippage_cost = cost_model.slippage_cost  # スリッページの式は CostModel に一元化（ここで独自に組まない）
+    t0 = trades_sorted[0].ts
+    us = timedelta(microseconds=1)
+
+    for i, t in enumerate(trades_sorted):
+        px = float(t.price)
+        q = float(t.qty)
+        s = side_sign.get(t.side)
+        if s is None:
+            s = side_sign[t.side] = 1.0 if (t.side or "").lower() == "buy" else -1.0
+        code = codes.get(t.symbol)
+        if code is None:
+            code = codes[t.symbol] = len(codes)
+            venues.append(cost_model.venue_of(t.symbol))
+        price[i] = px
+        qty[i] = q
+        sign[i] = s
+        # 何をする行？→ 保有秒は差分だけ使うので、先頭約定からの μs 整数で持つ（naive/aware どちらの datetime でも同じ）
+        ts_us[i] = (t.ts - t0) // us
+        sym_code[i] = code
+
+        fee_val = float(t.fee or 0.0)
+        fees += fee_val if fee_val > 0.0 else taker_fee(venue=venues[code], qty=q, price=px)
+        slippage += slippage_cost(notional=q * px)
+
+    realized, entries, exits, hold_sum, hold_cnt = _walk_positions(price, qty, sign, ts_us, sym_code, len(codes))
+    avg_hold = hold_sum / hold_cnt if hold_cnt else None
+    return float(realized), fees, slippage, int(entries), int(exits), avg_hold
+
 
 @dataclass
 class BacktestResult:
@@ -260,6 +699,48 @@ class BacktestResult:
     avg_hold_seconds: float | None
 
 
+def _env_value(environ: Mapping[str, str], name: str, default: float, cast: Callable[[str], Any] = float) -> Any:
+    """これは何をする関数？
+    → 環境変数 name を cast で数値にして返します。未設定・空文字（前後空白のみを含む）のときは default を返します。
+    """
+
+    raw = environ.get(name, "").strip()
+    return cast(raw) if raw else default
+
+
+@dataclass(frozen=True)
+class _BtEnv:
+    """これは何を表す型？
+    → バックテストで env から上書きできる前提値（コスト・Funding 符号反転 KILL）を、Runner 生成時に1回だけ読んだもの。
+    """
+
+    taker_fee_bps_roundtrip: float
+    estimated_slippage_bps: float
+    extra_spread_bps: float
+    funding_flip_min_abs: float
+    funding_flip_consecutive: int
+
+    @classmethod
+    def from_environ(cls, strategy_cfg: StrategyFundingConfig, environ: Mapping[str, str] = os.environ) -> _BtEnv:
+        """これは何をする関数？
+        → env を読み、未設定/空の項目は設定ファイル（strategy_cfg）か既定値で埋めます。
+           以前の `float(env or 0.0)` は空文字の手数料・スリッページを設定値ではなく 0 にしていたので、その誤りも直しています。
+        """
+
+        return cls(
+            taker_fee_bps_roundtrip=_env_value(
+                environ, "STRATEGY__TAKER_FEE_BPS_ROUNDTRIP", float(strategy_cfg.taker_fee_bps_roundtrip)
+            ),
+            estimated_slippage_bps=_env_value(
+                environ, "STRATEGY__ESTIMATED_SLIPPAGE_BPS", float(strategy_cfg.estimated_slippage_bps)
+            ),
+            extra_spread_bps=_env_value(environ, "STRATEGY__EXTRA_SPREAD_BPS", 1.0),
+            # Funding/Basis はホールドが本質なので、既定では符号反転 KILL が実質起きない値にしておく
+            funding_flip_min_abs=_env_value(environ, "BACKTEST__FUNDING_FLIP_MIN_ABS", 1.0),
+            funding_flip_consecutive=_env_value(environ, "BACKTEST__FUNDING_FLIP_CONSECUTIVE", 999999, int),
+        )
+
+
 class BacktestRunner:
     """1日のティックを順に適用し、戦略 step() を回すリプレイランナー"""
 
@@ -282,25 +763,19 @@ class BacktestRunner:
         self._step_sec = float(step_sec)
         self._repo = Repo(db_url=db_url)
         # backtestでのコスト前提は env で上書き可能（感度分析用）
-        taker_fee_bps_roundtrip = float(
-            os.environ.get("STRATEGY__TAKER_FEE_BPS_ROUNDTRIP", str(strategy_cfg.taker_fee_bps_roundtrip)) or 0.0
-        )
-        estimated_slippage_bps = float(
-            os.environ.get("STRATEGY__ESTIMATED_SLIPPAGE_BPS", str(strategy_cfg.estimated_slippage_bps)) or 0.0
-        )
-        extra_spread_bps = float(os.environ.get("STRATEGY__EXTRA_SPREAD_BPS", "1.0") or 1.0)
+        env = _BtEnv.from_environ(strategy_cfg)
         self._cost_model = CostModel(
-            spot_taker_fee_bps=taker_fee_bps_roundtrip / 2.0,
-            perp_taker_fee_bps=taker_fee_bps_roundtrip / 2.0,
-            slippage_bps=estimated_slippage_bps,
-            extra_spread_bps=extra_spread_bps,
+            spot_taker_fee_bps=env.taker_fee_bps_roundtrip / 2.0,
+            perp_taker_fee_bps=env.taker_fee_bps_roundtrip / 2.0,
+            slippage_bps=env.estimated_slippage_bps,
+            extra_spread_bps=env.extra_spread_bps,
         )
 
         # Strategy の対象シンボル
         self._symbols = list(strategy_cfg.symbols)
 
         # Funding 情報提供のためのデータ源（スケジュールなしならダミー）
-        self._data_src = ReplayDataSource(schedule=funding_schedule or FundingSchedule(path=self._empty_schedule_csv()))
+        self._data_src = ReplayDataSource(schedule=funding_schedule or FundingSchedule.empty())
 
         # 疑似約定の取引所
         self._paper = PaperExchange(data_source=self._data_src, initial_usdt=100_000.0, cost_model=self._cost_model)
@@ -326,8 +801,8 @@ class BacktestRunner:
             flatten_all=_flatten_all,
             # Funding/Basis は「ホールドして稼ぐ」が本質なので、バックテストでは sign flip によるKILLを原則無効化する。
             # 必要なら env で上書きできるようにしておく（例：BACKTEST__FUNDING_FLIP_MIN_ABS=0.00005）。
-            funding_flip_min_abs=float(os.environ.get("BACKTEST__FUNDING_FLIP_MIN_ABS", "1.0") or 1.0),
-            funding_flip_consecutive=int(os.environ.get("BACKTEST__FUNDING_FLIP_CONSECUTIVE", "999999") or 999999),
+            funding_flip_min_abs=env.funding_flip_min_abs,
+            funding_flip_consecutive=env.funding_flip_consecutive,
         )
 
         # Strategy（実装の引数名に合わせて渡す）
@@ -336,8 +811,8 @@ class BacktestRunner:
             risk_config=risk_cfg,
             strategy_config=strategy_cfg,
             period_seconds=8.0 * 3600.0,
-            taker_fee_bps_roundtrip=taker_fee_bps_roundtrip,
-            estimated_slippage_bps=estimated_slippage_bps,
+            taker_fee_bps_roundtrip=env.taker_fee_bps_roundtrip,
+            estimated_slippage_bps=env.estimated_slippage_bps,
             risk_manager=self._risk,
         )
         self._strategy_holder["strategy"] = self._strategy
@@ -345,15 +820,91 @@ class BacktestRunner:
         # OMS を PaperExchange に結線
         self._paper.bind_oms(self._oms)
 
-    def _empty_schedule_csv(self) -> str:
-        """これは何をする関数？→ 空のFunding CSVを一時生成してパスを返します（スケジュール省略時のダミー）。"""
+        # backtest補助：Strategyの市場データREADY判定を通すための擬似スケール/ガード/アンカー用 dict を一度だけ用意する
+        # - _scale_cache: priceScale が存在すれば「スケール準備OK」と判定される
+        # - _price_state: READY にして価格ガードを通す
+        # - _last_spot_px/_last_index_px: アンカー価格（spot→index）に利用される
+        for name in ("_scale_cache", "_price_state", "_bbo_cache", "_last_spot_px", "_last_index_px"):
+            if not isinstance(getattr(self._paper, name, None), dict):
+                setattr(self._paper, name, {})
+
+        # ティックごとの dict/list/文字列生成を避けるため、銘柄ごとの WS メッセージ雛形・BBO dict と大文字化結果を初出時にキャッシュする
+        # （雛形はティックごとに値だけ書き換えて使い回す。handle_public_msg は受け取った dict を保持しない）
+        self._tick_bufs: dict[str, dict[str, Any]] = {}
+        self._sym_upper: dict[str, str] = {}
+        self._pos_sym_norm: dict[str, str] = {}
+
+        # step() 1回分の処理は銘柄数で形が決まるので、ここで1度だけ組み立てる（単一銘柄ならループなしの版）
+        self._run_step = self._build_run_step()
+
+    def _new_tick_buffers(self, symbol: str) -> dict[str, Any]:
+        """これは何をする関数？
+        → 初出の銘柄について _bbo_cache 用の dict を作り、擬似スケールと READY 状態を登録します。
+        """
+
+        self._paper._scale_cache.setdefault(symbol, dict(_BT_SCALE_META))
+        self._paper._price_state[symbol] = "READY"
+        bbo = self._paper._bbo_cache[symbol] = {}
+        return bbo
+
+    def _upper(self, symbol: str) -> str:
+        """これは何をする関数？→ 銘柄名の大文字化結果をキャッシュ経由で返します。"""
+
+        up = self._sym_upper.get(symbol)
+        if up is None:
+            up = self._sym_upper[symbol] = symbol.upper()
+        return up
+
+    def _position_symbol(self, symbol: str) -> str:
+        """これは何をする関数？
+        → 建玉の銘柄名（例: BTC/USDT:USDT）を Funding イベントと突き合わせる形（BTCUSDT）に正規化します。
+           建玉の銘柄名は種類が少ないので、正規化結果は初出時だけ計算してキャッシュします。
+        """
+
+        norm = self._pos_sym_norm.get(symbol)
+        if norm is None:
+            norm = self._pos_sym_norm[symbol] = symbol.replace("/", "").replace(":USDT", "").upper()
+        return norm
+
+    def _build_run_step(self) -> Callable[[], Awaitable[None]]:
+        """これは何をする関数？
+        → 「各銘柄の Funding 情報と価格を取得し Strategy を1ステップ進める」処理を返します。
+           単一銘柄（よくあるケース）はリストを回さない専用版にします。価格・Funding はメモリ参照なので同期版で引きます。
+        """
+
+        data_src = self._data_src
+        strategy = self._strategy
+        ticker_sync = self._ticker_sync
+
+        if len(self._symbols) == 1:
+            sym0 = self._symbols[0]
+
+            async def _run_step_one() -> None:
+                f_info = data_src._get_funding_info_sync(sym0)
+                px = ticker_sync(sym0)
+                await strategy.step(funding=f_info, spot_price=px, perp_price=px)
+
+            return _run_step_one
+
+        symbols = tuple(self._symbols)
+
+        async def _run_step_many() -> None:
+            for sym in symbols:
+                f_info = data_src._get_funding_info_sync(sym)
+                px = ticker_sync(sym)
+                await strategy.step(funding=f_info, spot_price=px, perp_price=px)
 
-        tmp = Path(".backtest_empty_funding.csv")
-        if not tmp.exists():
-            tmp.write_text("ts,symbol,rate\n", encoding="utf-8")
-        return str(tmp)
+        return _run_step_many
 
-    async def _apply_funding_if_due(self, now: datetime) -> None:
+    def _ticker_sync(self, symbol: str) -> float:
+        """これは何をする関数？
+        → PaperExchange.get_ticker と同じ優先順位（mid > last > ReplayDataSource の近似価格）で、await せずに価格を返します。
+        """
+
+        px = self._paper._get_ticker_sync(symbol)
+        return px if px is not None else self._data_src._get_ticker_sync(symbol)
+
+    async def _apply_funding_if_due(self, now_ns: int) -> None:
         """これは何をする関数？
         → 現在時刻に到来した Funding イベントを適用し、DB に FundingEvent を記録します。
            実現PnLは「ポジション側（long/short）の向き」に応じ、+rate×notional（shortは受取り）、-rate×notional（longは支払い）。
@@ -361,16 +912,27 @@ class BacktestRunner:
 
         if not self._schedule:
             return
-        for ev in self._schedule.due_events(now=now):
+        events = self._schedule.due_events_ns(now_ns)
+        if not events:
+            return
+        # 何をする行？→ now は固定なので、建玉取得と銘柄名の正規化は1回の適用パスで一度だけ行う
+        positions = await self._paper.get_positions()
+        # 何をする行？→ 正規化済み銘柄名ごとに建玉をまとめ、イベントごとの全建玉走査を辞書参照1回にする（並び順は保持）
+        pos_by_sym: dict[str, list[Position]] = {}
+        for p in positions:
+            pos_by_sym.setdefault(self._position_symbol(p.symbol), []).append(p)
+        last_px_cache: dict[str, float] = {}  # 同一銘柄のイベントが重なったときに get_ticker を繰り返さない
+        records: list[dict[str, Any]] = []  # この適用パスの Funding 実績（最後に add_funding_events でまとめて保存）
+        for ev in events:
             # 対象銘柄の perp ポジション名目を計算
-            positions = await self._paper.get_positions()
-            last_px = await self._paper.get_ticker(ev.symbol) or 0.0
+            ev_sym_upper = self._upper(ev.symbol)
+            last_px = last_px_cache.get(ev.symbol)
+            if last_px is None:
+                last_px = self._ticker_sync(ev.symbol) or 0.0
+                last_px_cache[ev.symbol] = last_px
             notional = 0.0
             realized = 0.0
-            for p in positions:
-                sym_norm = p.symbol.replace("/", "").replace(":USDT", "").upper()
-                if sym_norm != ev.symbol.upper():
-                    continue
+            for p in pos_by_sym.get(ev_sym_upper, ()):
                 # long: 支払い（-）、short: 受取（+）
                 if p.side.lower() == "long":
                     realized += -ev.rate * float(p.size) * float(last_px)
@@ -378,21 +940,27 @@ class BacktestRunner:
                 elif p.side.lower() == "short":
                     realized += ev.rate * float(p.size) * float(last_px)
                     notional += abs(float(p.size) * float(last_px))
-            await self._repo.add_funding_event(
-                ts=ev.ts,
-                symbol=ev.symbol,
-                rate=ev.rate,
-                notional=notional,
-                realized_pnl=realized,
+            records.append(
+                {
+                    "ts": ev.ts,
+                    "symbol": ev.symbol,
+                    "rate": ev.rate,
+                    "notional": notional,
+                    "realized_pnl": realized,
+                }
             )
-            logger.info(
+            # 何をする行？→ lazy=True で、INFO が出力されないときは isoformat()/round() 自体を評価しない
+            #   （引数はすべて呼び出し可能である必要があるため、ループ変数は既定引数/partial でその場の値に束縛する）
+            logger.opt(lazy=True).info(
                 "BT funding applied: {} {} rate={} notional={} realized={}",
-                ev.ts.isoformat(),
-                ev.symbol,
-                ev.rate,
-                round(notional, 2),
-                round(realized, 4),
+                ev.ts.isoformat,
+                lambda e=ev: e.symbol,
+                lambda e=ev: e.rate,
+                functools.partial(round, notional, 2),
+                functools.partial(round, realized, 4),
             )
+        # 何をする行？→ 同じ時刻に到来した分を1回の executemany で保存する（適用と保存の間に他の処理を挟まない）
+        await self._repo.add_funding_events(records)
 
     async def run_one_day(self, *, date_utc: str) -> BacktestResult:
         """これは何をする関数？
@@ -402,151 +970,72 @@ class BacktestRunner:
 
         await self._repo.create_all()
 
-        last_step_at: datetime | None = None
+        # 何をする行？→ 「次に step() を実行してよい時刻」を int64 ns で1つだけ持ち、ティックごとの判定を整数比較1回にする
+        #   （固定グリッドではなく、直前の step を打ったティック時刻 + step_sec を次回とする従来の間隔判定と同じ挙動。
+        #    間隔は timedelta と同じくマイクロ秒に丸める）
+        step_ns = timedelta(seconds=self._step_sec) // timedelta(microseconds=1) * _NS_PER_US
+        next_step_ns = -_NS_MAX  # 最初のティックで必ず step する（None 判定を挟まず整数比較1回にする）
+        # 何をする行？→ 次に Funding 期限が来る時刻をローカル整数で持ち、適用したときだけ取り直す（スケジュールなしなら来ない）
+        schedule = self._schedule
+        next_funding_ns = schedule.next_due_ns if schedule is not None else _NS_MAX
+        tick_bufs = self._tick_bufs
+        paper = self._paper
+        paper_bbo = paper._bbo
+        paper_last = paper._last_price
+        limit_candidates = paper._limit_candidates
+        last_spot_px = self._paper._last_spot_px
+        last_index_px = self._paper._last_index_px
 
         # ティックを順次適用
-        for tick in self._feed.iter_ticks(date_utc=date_utc):
+        # 何をする行？→ PriceTick を作らず、列の値をそのままタプルで受け取る（ティックごとのオブジェクト生成を省く）
+        for ts_ns, ts, sym, bid, ask, last in self._feed._iter_day(date_utc):
             # 現在時刻を進め、Fundingの予告＆適用
-            self._data_src.set_now(tick.ts)
-            self._data_src.update_price(tick.symbol, bid=tick.bid, ask=tick.ask, last=tick.last)
-
-            # PaperExchange に BBO・trade を通知（Bitget 形式に擬態）
-            if tick.bid is not None or tick.ask is not None:
-                msg_ob = {
-                    "topic": f"orderbook.1.{tick.symbol}",
-                    "data": [{"b": [[tick.bid or 0.0, "0"]], "a": [[tick.ask or 0.0, "0"]]}],
-                }
-                await self._paper.handle_public_msg(msg_ob)
-            if tick.last is not None:
-                msg_tr = {
-                    "topic": f"publicTrade.{tick.symbol}",
-                    "data": [{"p": str(tick.last)}],
-                }
-                await self._paper.handle_public_msg(msg_tr)
-
-            # backtest補助：Strategyの市場データREADY判定を通すための擬似スケール/ガード/アンカーをPaperExchangeに付与
-            # - _scale_cache: priceScale が存在すれば「スケール準備OK」と判定される
-            # - _price_state: READY にして価格ガードを通す
-            # - _last_spot_px/_last_index_px: アンカー価格（spot→index）に利用される
-            try:
-                if not hasattr(self._paper, "_scale_cache"):
-                    self._paper._scale_cache = {}
-                if not hasattr(self._paper, "_price_state"):
-                    self._paper._price_state = {}
-                if not hasattr(self._paper, "_bbo_cache"):
-                    self._paper._bbo_cache = {}
-                sc = self._paper._scale_cache
-                ps = self._paper._price_state
-                bbo = self._paper._bbo_cache
-                # backtest用の最低限メタ（OMSのサイズガードに必要）
-                sc[tick.symbol] = {
-                    "priceScale": 2,
-                    # qtyの刻み/最小（実取引所とは異なるが、dust注文を抑止できる程度の値にする）
-                    "qtyStep_perp": 1e-6,
-                    "qtyStep_spot": 1e-6,
-                    "minQty_perp": 1e-6,
-                    "minQty_spot": 1e-6,
-                    # 最小名目（USDT想定）。5USDT未満は skip して現実のrejectに近づける
-                    "minNotional_perp": 5.0,
-                    "minNotional_spot": 5.0,
-                }
-                ps[tick.symbol] = "READY"
-                bbo[tick.symbol] = {"bid": tick.bid, "ask": tick.ask}
-                if tick.last is not None:
-                    if not hasattr(self._paper, "_last_spot_px"):
-                        self._paper._last_spot_px = {}
-                    if not hasattr(self._paper, "_last_index_px"):
-                        self._paper._last_index_px = {}
-                    self._paper._last_spot_px[tick.symbol] = float(tick.last)
-                    self._paper._last_index_px[tick.symbol] = float(tick.last)
-            except Exception:
-                pass  # backtest便宜用の付帯属性なので、失敗時は黙殺
-
-            # Funding 適用
-            await self._apply_funding_if_due(tick.ts)
+            self._data_src.set_now(ts)
+            self._data_src.update_price(sym, bid=bid, ask=ask, last=last)
+
+            # 何をする行？→ 銘柄ごとの BBO dict を1回の辞書参照で取り出す（初出の銘柄だけ作る）
+            bbo = tick_bufs.get(sym)
+            if bbo is None:
+                bbo = tick_bufs[sym] = self._new_tick_buffers(sym)
+
+            # PaperExchange に BBO・trade を反映する（handle_public_msg と同じ結果を、WS メッセージを組まずに同期で書き込む）
+            #   ReplayDataSource は価格スケールを持たないので倍率は常に1。await が要るのは指値が残っている銘柄の約定判定だけ
+            if bid is not None or ask is not None:
+                paper_bbo[sym] = (bid or 0.0, ask or 0.0)
+                candidates = limit_candidates(sym)
+                if candidates:
+                    await paper._fill_limit_candidates(candidates)
+            if last is not None:
+                paper_last[sym] = last
+
+            # backtest補助：Strategyの市場データREADY判定用の BBO/アンカー（スケール/READY は初出時に設定済み）
+            bbo["bid"] = bid
+            bbo["ask"] = ask
+            if last is not None:
+                last_spot_px[sym] = last  # 列配列から来る値はすでに float
+                last_index_px[sym] = last
+
+            # Funding 適用（次の期限より前なら整数比較だけで素通りする）
+            if ts_ns >= next_funding_ns:
+                await self._apply_funding_if_due(ts_ns)
+                next_funding_ns = schedule.next_due_ns if schedule is not None else _NS_MAX
 
             # step() 実行（一定間隔）
-            if (last_step_at is None) or ((tick.ts - last_step_at).total_seconds() >= self._step_sec):
+            if ts_ns >= next_step_ns:
                 try:
-                    for sym in self._symbols:
-                        # Funding 情報と価格を取得し Strategy を1ステップ進める
-                        f_info = await self._data_src.get_funding_info(sym)
-                        px = await self._paper.get_ticker(sym)
-                        await self._strategy.step(funding=f_info, spot_price=px, perp_price=px)
+                    await self._run_step()
                 except Exception as e:  # noqa: BLE001
                     logger.exception("backtest step error: {}", e)
-                last_step_at = tick.ts
+                next_step_ns = ts_ns + step_ns
 
-        # 1日終了時点の集計
-        ff = await self._repo.list_funding_events()
-        tt = await self._repo.list_trades()
-        funding_today = [f for f in ff if f.ts.date().isoformat() == date_utc]
-        trades_today = [t for t in tt if t.ts.date().isoformat() == date_utc]
-        funding_pnl = sum(f.realized_pnl for f in funding_today)
+        # 1日終了時点の集計（日付の絞り込みと Funding の合計は SQL 側で行い、全件読み込み＋Pythonフィルタを避ける）
+        day_start, day_end = _day_bounds(date_utc)
+        funding_count, funding_pnl = await self._repo.aggregate_funding(since=day_start, until=day_end)
+        trades_today = await self._repo.list_trades(since=day_start, until=day_end)
 
-        def _calc_trade_metrics(trades: list) -> tuple[float, float, float, int, int, float | None]:
-            trades_sorted = sorted(trades, key=lambda x: x.ts)
-            realized = 0.0
-            fees = 0.0
-            slippage = 0.0
-            entries = 0
-            exits = 0
-            hold_durations: list[float] = []
-            pos: dict[str, dict[str, Any]] = defaultdict(lambda: {"size": 0.0, "avg": 0.0, "entry_ts": None})
-
-            for t in trades_sorted:
-                price = float(t.price)
-                qty = float(t.qty)
-                side = (t.side or "").lower()
-                signed_qty = qty if side == "buy" else -qty
-                notional = abs(qty * price)
-
-                fee_val = float(getattr(t, "fee", 0.0) or 0.0)
-                fees += fee_val if fee_val > 0.0 else self._cost_model.taker_fee(symbol=t.symbol, qty=qty, price=price)
-                slippage += self._cost_model.slippage_cost(notional=notional)
-
-                p = pos[t.symbol]
-                size = float(p["size"])
-                avg = float(p["avg"])
-                entry_ts = p["entry_ts"]
-
-                if size == 0 or size * signed_qty >= 0:
-                    new_size = size + signed_qty
-                    new_avg = (
-                        ((avg * abs(size)) + price * abs(signed_qty)) / abs(new_size) if new_size != 0 else price
-                    )
-                    if size == 0 and new_size != 0:
-                        entries += 1
-                        entry_ts = t.ts
-                    p["size"] = new_size
-                    p["avg"] = new_avg
-                    p["entry_ts"] = entry_ts
-                    continue
-
-                close_qty = min(abs(size), abs(signed_qty))
-                if size > 0:
-                    realized += (price - avg) * close_qty
-                else:
-                    realized += (avg - price) * close_qty
-
-                new_size = size + signed_qty
-                if abs(new_size) < 1e-12:
-                    exits += 1
-                    if entry_ts:
-                        hold_durations.append((t.ts - entry_ts).total_seconds())
-                    p["size"] = 0.0
-                    p["avg"] = 0.0
-                    p["entry_ts"] = None
-                else:
-                    p["size"] = new_size
-                    p["avg"] = price
-                    p["entry_ts"] = t.ts
-                    entries += 1
-
-            avg_hold = sum(hold_durations) / len(hold_durations) if hold_durations else None
-            return realized, fees, slippage, entries, exits, avg_hold
-
-        trading_pnl, fees_est, slippage_est, entries, exits, avg_hold = _calc_trade_metrics(trades_today)
+        trading_pnl, fees_est, slippage_est, entries, exits, avg_hold = _calc_trade_metrics(
+            trades_today, self._cost_model
+        )
         # slippage_est は「どれくらい滑ったか/補正が乗ったか」の診断値。
         # PaperExchange の約定価格はすでに slippage(+extra_spread) を織り込んでいるため、
         # ここで net からさらに控除すると二重計上になる。
@@ -554,7 +1043,7 @@ class BacktestRunner:
 
         return BacktestResult(
             date=date_utc,
-            funding_events=len(funding_today),
+            funding_events=funding_count,
             trades=len(trades_today),
             net_pnl=float(net),
             funding_pnl=float(funding_pnl),
@@ -567,12 +1056,71 @@ class BacktestRunner:
         )
 
 
+# ===== 複数日リプレイ =====
+
+
+def _check_multi_day_db_url(db_url: str, n_days: int) -> None:
+    """これは何をする関数？
+    → 複数日の結果が1つの DB に混ざらないよう、"{date}" を含まないファイル/サーバーの db_url を ValueError で弾きます。
+       インメモリDBは Repo ごとに別物なので、"{date}" がなくても通します。
+    """
+
+    if n_days <= 1 or "{date}" in db_url:
+        return
+    if make_url(db_url).database in (None, "", ":memory:"):
+        return
+    raise ValueError(
+        f"multi-day replay needs '{{date}}' in db_url (or sqlite+aiosqlite:///:memory:) to keep days apart: {db_url}"
+    )
+
+
+async def run_days(
+    *,
+    dates: list[str],
+    price_feed: CsvPriceFeed,
+    funding_schedule: FundingSchedule | None,
+    strategy_cfg: StrategyFundingConfig,
+    risk_cfg: RiskConfig,
+    db_url: str = "sqlite+aiosqlite:///:memory:",
+    step_sec: float = 3.0,
+    max_concurrency: int | None = None,
+) -> list[BacktestResult]:
+    """これは何をする関数？
+    → 複数のUTC日を、日ごとに独立した BacktestRunner/Repo で回し、dates と同じ順で結果を返します。
+       db_url に "{date}" を含めると日ごとの別DBファイルになります（既定は日ごとのインメモリDB）。
+       複数日で "{date}" を含まないファイル/サーバーの db_url を渡すと ValueError です。
+       価格フィードは読み取り専用なので共有し、Funding スケジュールは適用カーソルだけ日ごとに分けます。
+       1つのイベントループ上で日を交互に進めるだけなので CPU 並列にはならず、かかる時間は順に回すのとほぼ同じです
+       （CPU コア数ぶん速くしたいときは bot.backtest.sweep.run_sweep のプロセスプールを使う）。
+    """
+
+    _check_multi_day_db_url(db_url, len(dates))
+    sem = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+
+    async def _one(date_utc: str) -> BacktestResult:
+        async with sem:
+            runner = BacktestRunner(
+                price_feed=price_feed,
+                funding_schedule=funding_schedule.fork() if funding_schedule else None,
+                strategy_cfg=strategy_cfg,
+                risk_cfg=risk_cfg,
+                db_url=db_url.replace("{date}", date_utc),
+                step_sec=step_sec,
+            )
+            try:
+                return await runner.run_one_day(date_utc=date_utc)
+            finally:
+                await runner._repo.dispose()
+
+    return list(await asyncio.gather(*(_one(d) for d in dates)))
+
+
 # ===== CLI（任意実行） =====
 
 
 def main() -> None:
     """これは何をする関数？
-    → コマンドラインから1日リプレイを実行します。
+    → コマンドラインから1日（--date を複数指定すると複数日）のリプレイを実行します。
        例：
          poetry run python -m bot.backtest.replay \
            --prices data/prices.csv \
@@ -583,45 +1131,78 @@ def main() -> None:
 
     parser = argparse.ArgumentParser(description="Backtest 1-day replay (paper fill from CSV/Parquet)")
     parser.add_argument("--prices", required=True, help="CSV/Parquet with columns: ts,symbol,bid,ask,last")
+    parser.add_argument(
+        "--feed-cache",
+        action="store_true",
+        help="整形済み価格データを <prices>.cache.parquet に保存し、次回から再利用する（CSV入力時）",
+    )
     parser.add_argument("--funding", default=None, help="CSV with columns: ts,symbol,rate (period rate, signed)")
-    parser.add_argument("--date", required=True, help="UTC date YYYY-MM-DD")
+    parser.add_argument("--date", required=True, nargs="+", help="UTC date YYYY-MM-DD（複数指定で日ごとに別DBで実行）")
     parser.add_argument("--step-sec", type=float, default=3.0, help="strategy step interval seconds")
     parser.add_argument(
         "--config",
         default="config/app.yaml",
         help="設定ファイルパス（db_urlなどを取得）。未指定なら config/app.yaml",
     )
-    parser.add_argument("--db-url", help="DB接続文字列。指定があればconfigより優先")
+    parser.add_argument(
+        "--db-url",
+        help="DB接続文字列。指定があればconfigより優先（{date} を日付に置換。複数日ではファイルDBに {date} が必須）",
+    )
+    parser.add_argument("--concurrency", type=int, default=None, help="複数日実行時に同時に進める日数（既定: CPU数）")
     args = parser.parse_args()
+    cfg = load_config(config_path=args.config)
+    db_url = args.db_url or cfg.db_url
+    try:
+        _check_multi_day_db_url(db_url, len(args.date))
+    except ValueError as e:
+        parser.error(f"{e}（--db-url で {{date}} 入りのパスか sqlite+aiosqlite:///:memory: を指定してください）")
+
+    def _log_result(res: BacktestResult) -> None:
+        logger.opt(lazy=True).info(
+            "Backtest done: date={} funding_events={} trades={} net_pnl={} funding_pnl={} trading_pnl={} fees_est={} slippage_est={} entries={} exits={} avg_hold_s={}",
+            lambda: res.date,
+            lambda: res.funding_events,
+            lambda: res.trades,
+            lambda: round(res.net_pnl, 4),
+            lambda: round(res.funding_pnl, 4),
+            lambda: round(res.trading_pnl, 4),
+            lambda: round(res.fees_est, 4),
+            lambda: round(res.slippage_est, 4),
+            lambda: res.entries,
+            lambda: res.exits,
+            lambda: None if res.avg_hold_seconds is None else round(res.avg_hold_seconds, 2),
+        )
 
     async def _run() -> None:
-        cfg = load_config(config_path=args.config)
-        db_url = args.db_url or cfg.db_url
-        feed = CsvPriceFeed(path=args.prices)
+        feed = CsvPriceFeed(path=args.prices, cache=args.feed_cache)
         sched = FundingSchedule(path=args.funding) if args.funding else None
+        if len(args.date) > 1:
+            # 複数日は日ごとに独立したDBで回す（db_url の {date} を日付に置換。インメモリなら日ごとに別DB）
+            results = await run_days(
+                dates=args.date,
+                price_feed=feed,
+                funding_schedule=sched,
+                strategy_cfg=cfg.strategy,
+                risk_cfg=cfg.risk,
+                db_url=db_url,
+                step_sec=args.step_sec,
+                max_concurrency=args.concurrency,
+            )
+            for res in results:
+                _log_result(res)
+            return
         runner = BacktestRunner(
             price_feed=feed,
             funding_schedule=sched,
             strategy_cfg=cfg.strategy,
             risk_cfg=cfg.risk,
-            db_url=db_url,
+            db_url=db_url.replace("{date}", args.date[0]),
             step_sec=args.step_sec,
         )
-        res = await runner.run_one_day(date_utc=args.date)
-        logger.info(
-            "Backtest done: date={} funding_events={} trades={} net_pnl={} funding_pnl={} trading_pnl={} fees_est={} slippage_est={} entries={} exits={} avg_hold_s={}",
-            res.date,
-            res.funding_events,
-            res.trades,
-            round(res.net_pnl, 4),
-            round(res.funding_pnl, 4),
-            round(res.trading_pnl, 4),
-            round(res.fees_est, 4),
-            round(res.slippage_est, 4),
-            res.entries,
-            res.exits,
-            None if res.avg_hold_seconds is None else round(res.avg_hold_seconds, 2),
-        )
+        try:
+            _log_result(await runner.run_one_day(date_utc=args.date[0]))
+        finally:
+            await runner._repo.dispose()
 
     try:
         asyncio.run(_run())
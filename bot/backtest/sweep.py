@@ -0,0 +1,97 @@
+"""複数日 × 複数パラメータのバックテストを、プロセスプールで CPU コア数ぶん並列に回すドライバ。"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from bot.backtest.replay import BacktestResult, BacktestRunner, CsvPriceFeed, FundingSchedule
+from bot.config.models import RiskConfig, StrategyFundingConfig
+
+# 何をする行？→ ワーカープロセスごとに1回だけ読み込んだ価格フィード/Funding スケジュール（タスクごとに pickle しない）
+_WORKER_FEED: CsvPriceFeed | None = None
+_WORKER_SCHEDULE: FundingSchedule | None = None
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """これは何を表す型？
+    → パラメータスイープの1マス分（上書きしたパラメータ＋その日の集計結果）。
+    """
+
+    params: dict[str, Any]
+    result: BacktestResult
+
+
+def _init_worker(prices_path: str, funding_path: str | None) -> None:
+    """これは何をする関数？
+    → ワーカープロセスの起動時に1回だけ呼ばれ、価格フィード（整形済み Parquet キャッシュから）と Funding を読み込みます。
+    """
+
+    global _WORKER_FEED, _WORKER_SCHEDULE
+    _WORKER_FEED = CsvPriceFeed(path=prices_path, cache=True)
+    _WORKER_SCHEDULE = FundingSchedule(path=funding_path) if funding_path else None
+
+
+def _run_cell(
+    date_utc: str, strategy_cfg: StrategyFundingConfig, risk_cfg: RiskConfig, step_sec: float
+) -> BacktestResult:
+    """これは何をする関数？
+    → ワーカー内で1日×1パラメータのリプレイを、インメモリDBの新しい BacktestRunner で完走させます。
+    """
+
+    assert _WORKER_FEED is not None  # _init_worker で必ず設定される
+
+    async def _one() -> BacktestResult:
+        runner = BacktestRunner(
+            price_feed=_WORKER_FEED,
+            funding_schedule=_WORKER_SCHEDULE.fork() if _WORKER_SCHEDULE else None,
+            strategy_cfg=strategy_cfg,
+            risk_cfg=risk_cfg,
+            db_url="sqlite+aiosqlite:///:memory:",
+            step_sec=step_sec,
+        )
+        try:
+            return await runner.run_one_day(date_utc=date_utc)
+        finally:
+            await runner._repo.dispose()
+
+    return asyncio.run(_one())
+
+
+def run_sweep(
+    *,
+    dates: list[str],
+    param_grid: list[dict[str, Any]],
+    prices_path: str,
+    funding_path: str | None,
+    strategy_cfg: StrategyFundingConfig,
+    risk_cfg: RiskConfig,
+    step_sec: float = 3.0,
+    workers: int | None = None,
+) -> list[SweepResult]:
+    """これは何をする関数？
+    → param_grid の各 dict で strategy_cfg を上書きした設定 × dates の全組み合わせを、プロセスプールで並列実行します。
+       結果は param_grid の順 → dates の順に並べて返します。
+       価格CSVは先に親プロセスで整形済み Parquet キャッシュを作り、各ワーカーはそれを読むだけにします。
+    """
+
+    # 何をする行？→ 上書き後の値も pydantic の検証を通す（タスク投入前に不正なパラメータで落とす）
+    base = strategy_cfg.model_dump()
+    cfgs = [StrategyFundingConfig.model_validate({**base, **params}) for params in param_grid]
+    CsvPriceFeed(path=prices_path, cache=True)  # キャッシュ作成をワーカー同士で競合させない
+
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        initializer=_init_worker,
+        initargs=(prices_path, funding_path),
+    ) as pool:
+        futures = [[pool.submit(_run_cell, d, cfg, risk_cfg, step_sec) for d in dates] for cfg in cfgs]
+        return [
+            SweepResult(params=dict(params), result=fut.result())
+            for params, row in zip(param_grid, futures, strict=True)
+            for fut in row
+        ]
@@ -2,20 +2,36 @@
 # 優先順位は「環境変数 > .env > YAML > デフォルト値」となります。
 from __future__ import annotations
 
+import copy
 import csv
+import functools
 import os
 import re  # .env内の 'export ' や 'KEY: value' を正規化するために使用
 from io import StringIO  # テキストをストリーム化して python-dotenv に渡すために使用
 from pathlib import Path
-from typing import Any, Mapping
-
-import yaml  # type: ignore[import-untyped]  # YAML を dict に読み込むだけなので型はゆるく扱う
-from dotenv import dotenv_values  # .env を環境変数として読み込むためのライブラリ
+from typing import Any, Iterable, Iterator, Mapping, Sequence
 
 from .models import AppConfig
 
+# ENV から取り込むキーの先頭要素（"RISK__X" の "RISK"）。キーごとに partition 1回と集合の参照1回で判定する
+_ENV_ROOTS = frozenset({"KEYS", "EXCHANGE", "RISK", "STRATEGY"})
+_ENV_PASSTHROUGH = frozenset({"DB_URL", "TIMEZONE"})  # ルート直下に置くキー
+
+# .env 正規化用の正規表現と、除去する不可視文字（BOM/ゼロ幅）の変換表は import 時に1回だけ作る
+_EXPORT_RE = re.compile(r"^\s*export\s+", re.MULTILINE)  # シェル由来の 'export KEY=VAL'
+_COLON_KV_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\s*:\s*", re.MULTILINE)  # 'KEY: VAL' 形式
+_ZW_TABLE = str.maketrans("", "", "\ufeff\u200b\u200c\u200d")
+# 補間（$）・エスケープ（\）・行内コメント（#）を含まない素朴な 'KEY=VAL' 行（値は無引用/単引用/二重引用のいずれか）
+_SIMPLE_KV_RE = re.compile(
+    r"""[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:'([^'\\]*)'|"([^"\\$]*)"|([^'"\\$#\s](?:[^'"\\$#]*[^'"\\$#\s])?)?)[ \t]*"""
+)
+
+# load_config の結果キャッシュ（入力ファイルの更新時刻と設定系 ENV の組 → AppConfig）
+_CONFIG_CACHE: dict[tuple[Any, ...], AppConfig] = {}
 
-def _set_nested(d: dict[str, Any], keys: list[str], value: Any) -> None:
+
+def _set_nested(d: dict[str, Any], keys: Sequence[str], value: Any) -> None:
     """ネスト辞書用ヘルパー: ['risk','max_total_notional'] のようなキー列で入れ子に値を設定する。"""
 
     cur = d
@@ -26,34 +42,41 @@ def _set_nested(d: dict[str, Any], keys: list[str], value: Any) -> None:
     cur[keys[-1]] = value
 
 
-def _env_to_nested_dict(environ: Mapping[str, str]) -> dict[str, Any]:
-    """ENV を AppConfig 互換のネスト辞書に変換する。
+def _merge_env_into(target: dict[str, Any], items: Iterable[tuple[str, str]]) -> dict[str, Any]:
+    """ENV を AppConfig 互換のネスト辞書として target（YAML の dict）に直接書き込み、target を返す。
 
-    - KEYS__/EXCHANGE__/RISK__/STRATEGY__ のプレフィックスを持つキーだけを取り込む。
+    - items は _iter_config_env で選んだ (キー, 値) の列（KEYS__/EXCHANGE__/RISK__/STRATEGY__ と DB_URL/TIMEZONE）。
     - DB_URL / TIMEZONE はトップレベルのキーとして素通しする。
+    - 別のネスト辞書を作ってから深いマージをせず、1回の走査で YAML の値を上書きする（途中が dict でなければ dict に置き換える）。
     """
 
-    result: dict[str, Any] = {}
-    allowed_roots = {"KEYS", "EXCHANGE", "RISK", "STRATEGY"}
-    passthrough_roots = {"DB_URL", "TIMEZONE"}  # ルート直下に置くキー
+    for raw_key, raw_val in items:
+        # 大文字小文字は区別しない運用にするため lower に寄せておく
+        if raw_key in _ENV_PASSTHROUGH:
+            # 何をする行？→ 1段だけのキーは _set_nested もキー列の分割も通さず、ルートに直接置く
+            target[raw_key.lower()] = raw_val
+            continue
+        _set_nested(target, _env_key_parts(raw_key), raw_val)
+    return target
 
-    for raw_key, raw_val in environ.items():
-        if raw_key in passthrough_roots or any(raw_key.startswith(root + "__") for root in allowed_roots):
-            # 大文字小文字は区別しない運用にするため lower に寄せておく
-            parts = raw_key.lower().split("__")
-            _set_nested(result, parts, raw_val)
-    return result
 
+@functools.lru_cache(maxsize=256)
+def _env_key_parts(raw_key: str) -> tuple[str, ...]:
+    """ENV のキー名をネスト辞書のキー列に分ける（"RISK__MAX_NET_DELTA" → ("risk", "max_net_delta")）。"""
 
-def _deep_update(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
-    """dict の深いマージ: override の内容で base を上書きして返す。"""
+    return tuple(raw_key.lower().split("__"))
 
-    for k, v in override.items():
-        if isinstance(v, dict) and isinstance(base.get(k), dict):
-            _deep_update(base[k], v)
-        else:
-            base[k] = v
-    return base
+
+def _iter_config_env(environ: Mapping[str, str]) -> Iterator[tuple[str, str]]:
+    """ENV のうち設定に取り込むキー（_ENV_ROOTS 配下と DB_URL/TIMEZONE）だけを (キー, 値) で返す。"""
+
+    for raw_key, raw_val in environ.items():
+        if raw_key in _ENV_PASSTHROUGH:
+            yield raw_key, raw_val
+            continue
+        head, sep, _ = raw_key.partition("__")
+        if sep and head in _ENV_ROOTS:
+            yield raw_key, raw_val
 
 
 def load_env_robust(dotenv_path: Path, override: bool = True) -> dict:
@@ -67,9 +90,8 @@ def load_env_robust(dotenv_path: Path, override: bool = True) -> dict:
     """
 
     try:
-        # バイナリで開いて BOM やエンコーディングを自前で判別する
-        with open(dotenv_path, "rb") as f:
-            data = f.read()
+        # バイナリで一括して読み、BOM やエンコーディングを自前で判別する
+        data = Path(dotenv_path).read_bytes()
     except FileNotFoundError:
         return {}
 
@@ -83,33 +105,36 @@ def load_env_robust(dotenv_path: Path, override: bool = True) -> dict:
         encoding = "utf-8-sig"
 
     # --- デコード（失敗したら別候補でリトライ） ---
-    candidates = (encoding, "utf-8", "utf-8-sig", "utf-16", "cp932")
     text: str | None = None
-    for enc in candidates:
-        try:
-            text = data.decode(enc)
-            break
-        except Exception:
-            continue
+    if encoding == "utf-8" and data.isascii():
+        # 何をする行？→ BOM なしの ASCII だけの .env（ほとんどの場合）は候補を試さずにそのまま読む
+        text = data.decode("ascii")
+    else:
+        for enc in (encoding, "utf-8", "utf-8-sig", "utf-16", "cp932"):
+            try:
+                text = data.decode(enc)
+                break
+            except UnicodeDecodeError:
+                continue
     if text is None:
         # どのエンコーディングでも読めない場合はあきらめる
         return {}
 
     # --- ゼロ幅スペースや BOM を除去してクリーンなテキストにする ---
-    cleaned = text.replace("\ufeff", "").replace("\u200b", "").replace("\u200c", "").replace("\u200d", "")
+    cleaned = text.translate(_ZW_TABLE)
 
     # シェル由来の 'export KEY=VAL' を 'KEY=VAL' に正規化
-    cleaned = re.sub(r"^\s*export\s+", "", cleaned, flags=re.MULTILINE)
+    cleaned = _EXPORT_RE.sub("", cleaned)
     # 'KEY: VAL' 形式も 'KEY=VAL' に正規化
-    cleaned = re.sub(
-        r"^([A-Za-z_][A-Za-z0-9_]*)\s*:\s*",
-        r"\1=",
-        cleaned,
-        flags=re.MULTILINE,
-    )
+    cleaned = _COLON_KV_RE.sub(r"\1=", cleaned)
+
+    # --- 素朴な行だけなら自前で読み、それ以外は python-dotenv でパースする。必要なら os.environ に反映 ---
+    values = _parse_simple_env(cleaned)
+    if values is None:
+        # 何をする行？→ python-dotenv は補間・エスケープなどを含む .env のときだけ import する
+        from dotenv import dotenv_values
 
-    # --- python-dotenv でパースし、必要なら os.environ に反映 ---
-    values = dotenv_values(stream=StringIO(cleaned))
+        values = dotenv_values(stream=StringIO(cleaned))
     for k, v in values.items():
         if v is None:
             continue
@@ -122,6 +147,68 @@ def load_env_robust(dotenv_path: Path, override: bool = True) -> dict:
     return values
 
 
+def _parse_simple_env(text: str) -> dict[str, str | None] | None:
+    """.env の全行が空行・コメント・素朴な 'KEY=VAL' なら、python-dotenv と同じ結果を自前で返す（それ以外は None）。"""
+
+    values: dict[str, str | None] = {}
+    # 何をする行？→ 行区切りは python-dotenv と同じ \r\n / \r / \n だけにする（splitlines は \x0c なども区切ってしまう）
+    for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        stripped = line.lstrip(" \t")
+        if not stripped or stripped.startswith("#"):
+            continue
+        m = _SIMPLE_KV_RE.fullmatch(line)
+        if m is None:
+            return None
+        key, single, double, bare = m.groups()
+        values[key] = single if single is not None else double if double is not None else bare or ""
+    return values
+
+
+@functools.lru_cache(maxsize=8)
+def _read_yaml(path: str, mtime_ns: int) -> dict[str, Any]:
+    """YAML を dict として読み込む（パスと更新時刻が同じなら再パースしない。呼び出し側で複製して使う）。"""
+
+    # 何をする行？→ yaml は実際に YAML ファイルを読むときだけ import する（設定を読まない CLI の起動を軽くする）
+    import yaml  # type: ignore[import-untyped]  # YAML を dict に読み込むだけなので型はゆるく扱う
+
+    try:  # 何をする行？→ libyaml（C 実装）付きの PyYAML なら C のローダで読み、無ければ純 Python の SafeLoader を使う
+        from yaml import CSafeLoader as loader  # type: ignore[import-untyped]
+    except ImportError:  # pragma: no cover - libyaml なしでビルドされた PyYAML
+        from yaml import SafeLoader as loader  # type: ignore[import-untyped,assignment]
+
+    # 何をする行？→ ファイルはバイト列で一括して読み、そのまま C ローダへ渡す（行ごとの読み出しを挟まない）
+    loaded = yaml.load(Path(path).read_bytes(), Loader=loader)
+    return loaded if isinstance(loaded, dict) else {}
+
+
+def _mtime_ns(path: str | os.PathLike[str]) -> int:
+    """ファイルの更新時刻[ns]（無ければ -1）。キャッシュキーに使う"""
+
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _config_cache_key(config_path: str | os.PathLike[str] | None) -> tuple[Any, ...]:
+    """load_config の結果を左右する入力（作業ディレクトリ・各ファイルの更新時刻・設定系 ENV）をまとめたキーを作る。"""
+
+    environ = os.environ
+    cfg_path = config_path if config_path is not None else environ.get("APP_CONFIG_FILE", "config/app.yaml")
+    symbols_csv = environ.get("STRATEGY_SYMBOLS_CSV", "config/symbols.csv")
+    # ENV の並び順のままタプルにする（同じ設定キーに大小文字違いの ENV があるとき、従来と同じ順で後勝ちにするため）
+    env_items = tuple(_iter_config_env(environ))
+    return (
+        os.getcwd(),
+        os.fspath(cfg_path),
+        _mtime_ns(cfg_path),
+        _mtime_ns(".env"),
+        symbols_csv,
+        _mtime_ns(symbols_csv),
+        env_items,
+    )
+
+
 def load_config(config_path: str | os.PathLike[str] | None = None) -> AppConfig:
     """`.env` と YAML を読み込み、AppConfig インスタンスを構築して返す。
 
@@ -130,11 +217,23 @@ def load_config(config_path: str | os.PathLike[str] | None = None) -> AppConfig:
         2. .env ファイル（既存の環境変数を上書きしない）
         3. YAML (`config/app.yaml` など)
         4. AppConfig のデフォルト値
+
+    入力（YAML/.env/シンボルCSV の更新時刻と設定系 ENV）が前回と同じなら、パースと検証を省いてキャッシュの複製を返す。
     """
 
+    key = _config_cache_key(config_path)
+    cached = _CONFIG_CACHE.get(key)
+    if cached is not None:
+        # 何をする行？→ 呼び出し側が書き換えてもキャッシュに波及しないよう、深いコピーを返す
+        return cached.model_copy(deep=True)
+    dotenv_mtime_ns, env_items = key[3], key[-1]
+
     # 1) .env から環境変数を補完する
     #    既に os.environ に存在するキーは .env で上書きしない（override=False）。
-    load_env_robust(Path(".env"), override=False)
+    #    .env が無ければ ENV はキーを作った時点から変わらないので、読み込みも ENV の再走査も省く
+    if dotenv_mtime_ns >= 0:
+        load_env_robust(Path(".env"), override=False)
+        env_items = tuple(_iter_config_env(os.environ))
 
     # 2) YAML のパス:
     #    明示指定 (config_path) > 環境変数 APP_CONFIG_FILE > デフォルト 'config/app.yaml'
@@ -144,18 +243,18 @@ def load_config(config_path: str | os.PathLike[str] | None = None) -> AppConfig:
         cfg_path = Path(os.environ.get("APP_CONFIG_FILE", "config/app.yaml"))
 
     # 3) YAML を dict として読み込む（なければ空 dict）
+    #    パース結果は (パス, 更新時刻) でキャッシュし、マージで書き換えないよう深いコピーを使う。
+    #    ENV/.env/CSV は呼び出しごとに読み直すので、プロセス内で env を変えても従来どおり反映される
     yaml_data: dict[str, Any] = {}
-    if cfg_path.exists():
-        with cfg_path.open("r", encoding="utf-8") as f:
-            loaded = yaml.safe_load(f)
-            if isinstance(loaded, dict):
-                yaml_data = loaded
-
-    # 4) 環境変数をネスト辞書に変換
-    env_data = _env_to_nested_dict(os.environ)
+    try:
+        mtime_ns = cfg_path.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    if mtime_ns is not None:
+        yaml_data = copy.deepcopy(_read_yaml(str(cfg_path), mtime_ns))
 
-    # 5) YAML ベースに環境変数をマージ
-    merged = _deep_update(dict(yaml_data), env_data)
+    # 4-5) 環境変数を YAML の dict（上で深いコピー済み）に直接書き込んでマージ
+    merged = _merge_env_into(yaml_data, env_items)
 
     # 5.5) 監視シンボルをCSVで上書き（例: STRATEGY_SYMBOLS_CSV=config/symbols.csv）
     symbols_csv = Path(os.environ.get("STRATEGY_SYMBOLS_CSV", "config/symbols.csv"))
@@ -171,11 +270,26 @@ def load_config(config_path: str | os.PathLike[str] | None = None) -> AppConfig:
             pass
 
     # 6) AppConfig としてバリデーションしつつインスタンス化
-    return AppConfig.from_dict(merged)
+    config = AppConfig.from_dict(merged)
+    _CONFIG_CACHE[key] = config
+    return config.model_copy(deep=True)
+
+
+def _clear_config_cache() -> None:
+    """load_config のキャッシュを捨てる（テストなどで入力を同じ時刻のまま差し替えるとき用）。"""
+
+    _CONFIG_CACHE.clear()
+    _read_yaml.cache_clear()
+
+
+load_config.cache_clear = _clear_config_cache  # type: ignore[attr-defined]
 
 
 def redact_secrets(config: AppConfig) -> dict[str, Any]:
-    """AppConfig から API キーなどの機密情報をマスクした dict を返す。"""
+    """AppConfig から API キーなどの機密情報をマスクした dict を返す。
+
+    AppConfig は書き換えられるモデルなので結果はキャッシュせず、呼ぶたびに今の値から作り直す。
+    """
 
     safe = config.to_dict()
     keys = safe.get("keys")
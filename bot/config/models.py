@@ -3,7 +3,7 @@ from __future__ import annotations
 # アプリ設定用の Pydantic モデル群（v2 対応）。
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 DEFAULT_STRATEGY_SYMBOLS: tuple[str, str] = ("BTCUSDT", "ETHUSDT")
 
@@ -54,7 +54,7 @@ class RiskConfig(BaseModel):
 class StrategyFundingConfig(BaseModel):
     """Funding/Basis 戦略のパラメータ（MVP）。"""
 
-    symbols: list[str]
+    symbols: list[str] = Field(default_factory=lambda: list(DEFAULT_STRATEGY_SYMBOLS))  # 未指定時はデフォルト銘柄
     min_expected_apr: float = 0.13  # 新規エントリーに必要な APR（年率）。
     holdover_min_expected_apr: float = 0.10  # 継続保有を許容する下限 APR。
     pre_event_open_minutes: int = 15
@@ -70,25 +70,20 @@ class StrategyFundingConfig(BaseModel):
     chase_interval_ms: int = 2500
     chase_max_amends_per_min: int = 6
 
-    def __init__(self, **data: Any) -> None:  # type: ignore[override]
-        """シンボル未指定時はデフォルト銘柄を使う。"""
-
-        if "symbols" not in data:
-            data["symbols"] = list(DEFAULT_STRATEGY_SYMBOLS)
-        super().__init__(**data)
-
 
 class AppConfig(BaseModel):
     """アプリ全体の設定ルート（.env / YAML をマージして生成）。"""
 
     keys: ExchangeKeys
-    exchange: ExchangeConfig = ExchangeConfig()
+    # 既定値はインスタンスごとに新しく作る（既定インスタンスを毎回 deepcopy するより速く、共有もしない）
+    exchange: ExchangeConfig = Field(default_factory=ExchangeConfig)
     risk: RiskConfig
-    strategy: StrategyFundingConfig = StrategyFundingConfig()
+    strategy: StrategyFundingConfig = Field(default_factory=StrategyFundingConfig)
     db_url: str = "sqlite+aiosqlite:///./db/trading.db"
     timezone: str = "UTC"
 
     # Pydantic v2 用設定
+    # 何をする行？→ env/.env/YAML は load_config が1回だけマージ済みなので、BaseSettings にせず環境変数の再走査をさせない
     model_config = {
         "extra": "ignore",
     }
@@ -98,17 +93,22 @@ class AppConfig(BaseModel):
         """生 dict から AppConfig を構築し、サブモデルも必要に応じて型付けする。"""
 
         payload = dict(data)
-        if "keys" in payload and not isinstance(payload["keys"], ExchangeKeys):
-            payload["keys"] = ExchangeKeys(**payload["keys"])
-        if "exchange" in payload and not isinstance(payload["exchange"], ExchangeConfig):
-            payload["exchange"] = ExchangeConfig(**payload["exchange"])
-        if "risk" in payload and not isinstance(payload["risk"], RiskConfig):
-            payload["risk"] = RiskConfig(**payload["risk"])
-        if "strategy" in payload and not isinstance(payload["strategy"], StrategyFundingConfig):
-            payload["strategy"] = StrategyFundingConfig(**payload["strategy"])
+        for name, model in _SUBMODELS:
+            sub = payload.get(name)
+            if sub is not None and not isinstance(sub, model):
+                payload[name] = model(**sub)
         return cls(**payload)
 
     def to_dict(self) -> dict[str, Any]:
         """AppConfig をロギング等で扱いやすい dict 形式に変換する。"""
 
         return self.model_dump(mode="python")
+
+
+# from_dict で生 dict から型付けするサブモデル（AppConfig のフィールド名 → モデル）
+_SUBMODELS: tuple[tuple[str, type[BaseModel]], ...] = (
+    ("keys", ExchangeKeys),
+    ("exchange", ExchangeConfig),
+    ("risk", RiskConfig),
+    ("strategy", StrategyFundingConfig),
+)
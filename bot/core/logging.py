@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import json
 import logging  # 標準logging→loguru(JSONL)ブリッジ用
 import os
 import re
 import sys
+import threading
+import traceback
+import weakref
+from bisect import bisect_right
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from types import FrameType
-from typing import Iterable
+from typing import Callable, Iterable
 
 from loguru import logger
 
+try:  # 何をする行？→ orjson は任意依存。あれば JSONL の1行を C 実装で作り、無ければ標準 json にフォールバック
+    import orjson
+except ImportError:  # pragma: no cover - orjson 未導入環境
+    orjson = None  # type: ignore[assignment]
+
 ORDER_INFO_PREFIXES = (
     "order.submit",
     "order.placed",
@@ -22,6 +33,23 @@ ORDER_INFO_PREFIXES = (
     "position.",
     "trade.",
 )  # 注文/約定/ポジ系イベントをINFOへ昇格させる対象
+# 組み込みレベルの番号は後から変えられないので、import 時に1回だけ引いておく
+_DEBUG_NO = logger.level("DEBUG").no
+_INFO_NO = logger.level("INFO").no
+# 何をする行？→ 先頭の "." までの語（order/fill/position/trade）→ その語で始まるプレフィックス群。
+#   大半のログは辞書参照1回で外れ、当たっても同じ語のプレフィックスだけを startswith で確かめる
+_ORDER_PREFIXES_BY_HEAD: dict[str, tuple[str, ...]] = {}
+for _p in ORDER_INFO_PREFIXES:
+    _head = _p.split(".", 1)[0]
+    _ORDER_PREFIXES_BY_HEAD[_head] = (*_ORDER_PREFIXES_BY_HEAD.get(_head, ()), _p)
+del _p, _head
+
+
+def _is_order_info(msg: str) -> bool:
+    """メッセージが ORDER_INFO_PREFIXES のどれかで始まるか（先頭語で候補を絞ってから判定する）。"""
+
+    prefixes = _ORDER_PREFIXES_BY_HEAD.get(msg[: msg.find(".")])
+    return prefixes is not None and msg.startswith(prefixes)
 
 
 def _loguru_origin_patcher(record: dict) -> None:
@@ -35,9 +63,9 @@ def _loguru_origin_patcher(record: dict) -> None:
     extra["origin_file"] = record["file"].name  # ファイル名
     extra["origin_line"] = record["line"]  # 行番号
     # loguru直書きでDEBUGの注文系イベントはINFOへ昇格（JSONLのINFOシンクで確実に可視化）
-    if record["level"].name == "DEBUG" and record["message"].startswith(ORDER_INFO_PREFIXES):
+    if record["level"].name == "DEBUG" and _is_order_info(record["message"]):
         record["level"].name = "INFO"
-        record["level"].no = logger.level("INFO").no
+        record["level"].no = _INFO_NO
 
 
 def apply_loguru_patcher() -> None:
@@ -51,6 +79,8 @@ ORDER_PROMOTION_PATTERNS: tuple[re.Pattern[str], ...] = (
     re.compile(r"position\.(open|increase|decrease|close|update)", re.IGNORECASE),
     re.compile(r"(fill|executed|trade_id|約定|成交)", re.IGNORECASE),
 )
+# 何をする行？→ 上のパターン群を1本の選択に束ね、レコードごとの search を1回で済ませる
+_ORDER_PROMOTION_RE = re.compile("|".join(f"(?:{p.pattern})" for p in ORDER_PROMOTION_PATTERNS), re.IGNORECASE)
 
 
 def _parse_debug_modules(raw: str | Iterable[str] | None) -> tuple[str, ...]:
@@ -68,15 +98,23 @@ def _parse_debug_modules(raw: str | Iterable[str] | None) -> tuple[str, ...]:
 def _level_filter_factory(base_level_no: int, debug_modules: tuple[str, ...]):
     """�f�t�H���gINFO�ł�debug_modules�̂�DEBUG��A�b�v���A���̕ς݂͏���B"""
 
-    debug_no = logger.level("DEBUG").no
+    # 何をする行？→ 他のモジュール名を接頭辞に持つものを除いて整列しておく。
+    #   こうすると name 以下で最大の1件だけが接頭辞の候補になり、bisect 1回と startswith 1回で判定できる
+    mods: list[str] = []
+    for m in sorted(debug_modules):
+        if not (mods and m.startswith(mods[-1])):
+            mods.append(m)
 
     def _filter(record: dict) -> bool:
         level_no = record["level"].no
         if level_no >= base_level_no:
             return True
-        if level_no == debug_no and debug_modules:
+        if level_no == _DEBUG_NO and mods:
             name = record["extra"].get("origin") or record.get("name")
-            return any(name and name.startswith(m) for m in debug_modules)
+            if not name:
+                return False
+            i = bisect_right(mods, name)
+            return i > 0 and name.startswith(mods[i - 1])
         return False
 
     return _filter
@@ -85,6 +123,9 @@ def _level_filter_factory(base_level_no: int, debug_modules: tuple[str, ...]):
 class InterceptHandler(logging.Handler):
     """標準loggingのレコードをloguruへ転送する中継ハンドラ。"""
 
+    # 何をする行？→ loguru に渡す呼び出し深さ（固定）。呼び出し元の情報は origin* で別に持たせる
+    _DEPTH = 2
+
     def emit(self, record: logging.LogRecord) -> None:
         msg = record.getMessage()
         try:
@@ -92,15 +133,9 @@ class InterceptHandler(logging.Handler):
         except ValueError:
             level = record.levelno
 
-        if record.levelno < logging.INFO and any(p.search(msg) for p in ORDER_PROMOTION_PATTERNS):
+        if record.levelno < logging.INFO and _ORDER_PROMOTION_RE.search(msg):
             level = "INFO"
-        frame: FrameType | None = logging.currentframe()
-        depth = 2
-        while frame and frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back
-            depth += 1
-
-        if record.levelno == logging.DEBUG and msg.startswith(ORDER_INFO_PREFIXES):
+        if record.levelno == logging.DEBUG and _is_order_info(msg):
             level = "INFO"
 
         logger.bind(
@@ -109,13 +144,47 @@ class InterceptHandler(logging.Handler):
             origin_func=record.funcName,
             origin_file=record.filename,
             origin_line=record.lineno,
-        ).opt(depth=depth, exception=record.exc_info).log(level, msg)
+        ).opt(depth=self._DEPTH, exception=record.exc_info).log(level, msg)
+
+
+# JSONL の ts_ns を record["time"] から求めるための基準（UNIX エポック）と刻み（loguru の時刻は µs 精度）
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+
+def _json_line(record: dict) -> str:
+    """loguru のレコードを JSONL の1行（フラットな time/ts_ns/level/name/function/line/message/extra）にする。
+
+    例外つきのレコードには exception: {type, value, traceback} を足す。
+    """
+
+    payload = {
+        "time": record["time"].isoformat(),  # 従来どおりの ISO 8601 文字列（既存の読み手はこちらを使う）
+        "ts_ns": (record["time"] - _EPOCH) // _ONE_US * 1000,  # time と同じ時刻の UNIX エポック ns（µs 精度）
+        "level": record["level"].name,
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+        "extra": record["extra"],
+    }
+    exc = record["exception"]
+    if exc is not None:
+        payload["exception"] = {
+            "type": exc.type.__name__ if exc.type else None,
+            "value": str(exc.value) if exc.value is not None else None,
+            # 何をする行？→ type/value だけでは発生箇所が分からないので、整形済みのトレースバック全文も残す
+            "traceback": "".join(traceback.format_exception(exc.type, exc.value, exc.traceback)),
+        }
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(payload, default=str, ensure_ascii=False)
 
 
 def _inject_origin(record: dict) -> None:
     """loguru直書きログにもorigin系メタ情報を付与するパッチャ。"""
 
-    extra = record.setdefault("extra", {})
+    extra = record["extra"]  # loguru のレコードには必ず extra がある
     if "origin" in extra:
         return None
 
@@ -133,6 +202,169 @@ def _inject_origin(record: dict) -> None:
     return None
 
 
+# 何をする行？→ fork した子プロセスで背景スレッドを起こし直すため、動いている BufferedSink を覚えておく
+_LIVE_SINKS: weakref.WeakSet[BufferedSink] = weakref.WeakSet()
+
+
+def _restart_sinks_after_fork() -> None:
+    """fork 直後の子プロセスで呼ばれ、引き継いだ BufferedSink の背景スレッドを起こし直す。"""
+
+    for sink in list(_LIVE_SINKS):
+        sink._after_fork()
+
+
+class BufferedSink:
+    """ファイルへのログ書き込みをまとめる loguru 用シンク（日次ローテーション・保持数つき）。
+
+    - write() は整形済みの1行を上限つきのキューに積むだけ（上限を超えた分は捨てて dropped を数える）。
+      render を渡すと、loguru の整形結果ではなく render(record) の戻り値を1行として積む（JSONL 用）。
+    - 背景スレッドが interval_sec ごと（または batch_size 行たまったとき）にまとめて1回の write で書き出す。
+    - 日付が変わったら path を "<stem>.<YYYY-MM-DD><suffix>" に退避し、古いものは retention 個まで残す。
+    - fork（ProcessPoolExecutor のワーカーなど）した子では背景スレッドを起こし直す。
+    - 書き出しに失敗した行は戻さずに dropped に数え、理由を stderr に書く（背景スレッドは止めない）。
+    - 背景スレッドが止まっていたら、次に batch_size 行たまった write() で起こし直す。
+    - 閉じるときに捨てた行があれば、その数を stderr に書く。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        retention: int = 10,
+        max_pending: int = 8192,
+        batch_size: int = 512,
+        interval_sec: float = 0.05,
+        render: Callable[[dict], str] | None = None,
+    ) -> None:
+        self._path = Path(path)
+        self._render = render
+        self._retention = retention
+        self._max_pending = max_pending
+        self._batch_size = batch_size
+        self._interval_sec = interval_sec
+        self._pending: deque[tuple[date, str]] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self.dropped = 0  # キューあふれで捨てた行数
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # 何をする行？→ 既存ファイルは最終更新日の分として扱い、日付が変わっていれば最初の書き込みで退避する
+        self._day = datetime.fromtimestamp(self._path.stat().st_mtime).date() if self._path.exists() else date.today()
+        self._file = open(self._path, "ab", buffering=0)  # stop() で閉じる
+        self._start_thread()
+        _LIVE_SINKS.add(self)
+
+    def write(self, message: str) -> None:
+        # 何をする行？→ loguru の Message は record を持つので、その時刻でどの日のファイルに書くかを決める
+        record = getattr(message, "record", None)
+        day = record["time"].date() if record is not None else date.today()
+        if self._render is not None and record is not None:
+            # 何をする行？→ record（他のシンクと共有）は書き換えず、このシンク用の1行だけを作る
+            message = self._render(record) + "\n"
+        with self._lock:
+            if len(self._pending) >= self._max_pending:
+                self.dropped += 1
+                full = True
+            else:
+                self._pending.append((day, message))  # UTF-8 への変換は書き出し時にまとめて1回
+                full = len(self._pending) >= self._batch_size
+        if full:
+            if not self._thread.is_alive():
+                self._ensure_thread()
+            self._wake.set()
+
+    def stop(self) -> None:
+        """logger.remove() から呼ばれる: 背景スレッドを止め、残りを書き出して閉じる。"""
+
+        _LIVE_SINKS.discard(self)
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+        self._flush_pending()
+        self._file.close()
+        if self.dropped:
+            sys.stderr.write(f"BufferedSink({self._path}): dropped {self.dropped} log lines (queue full)\n")
+
+    def _start_thread(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"log-flush-{self._path.name}", daemon=True)
+        self._thread.start()
+
+    def _ensure_thread(self) -> None:
+        # 何をする行？→ 背景スレッドが何かの理由で止まっていたら（閉じていない限り）1本だけ起こし直す
+        with self._lock:
+            if self._thread.is_alive() or self._closed.is_set():
+                return
+            self._start_thread()
+
+    def _after_fork(self) -> None:
+        # 何をする行？→ fork 時に他スレッドが持っていたロックは子では解けないので作り直し、
+        #   親がまだ書き出していない行は親に任せて（二重に書かないよう）捨ててから背景スレッドを起こす
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending.clear()
+        self._start_thread()
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self._interval_sec)
+            self._wake.clear()
+            self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            batch = list(self._pending)
+            self._pending.clear()
+        written = 0  # 書き出し済みの行数
+        try:
+            if self._file.closed:  # 前回のローテーションで開き直せなかったときはここで開き直す
+                self._file = open(self._path, "ab", buffering=0)  # stop() で閉じる
+            # 何をする行？→ 同じ日の行は連結して1回の write にし、日付が変わる所でだけ区切ってローテーションする
+            chunk: list[str] = []
+            for day, line in batch:
+                if day != self._day:
+                    if chunk:
+                        self._write_all("".join(chunk).encode("utf-8"))
+                        written += len(chunk)
+                        chunk = []
+                    self._rotate(day)
+                chunk.append(line)
+            self._write_all("".join(chunk).encode("utf-8"))
+        except Exception as e:  # noqa: BLE001
+            # 何をする行？→ 書けなかった行は（壊れたファイルに書き直し続けないよう）戻さずに捨てた数へ足し、理由を stderr に出す
+            lost = len(batch) - written
+            with self._lock:
+                self.dropped += lost
+            sys.stderr.write(f"BufferedSink({self._path}): failed to write {lost} log lines: {e!r}\n")
+
+    def _write_all(self, data: bytes) -> None:
+        # 何をする行？→ バッファなしのファイルは1回の write で全部書けるとは限らないので、書けた分だけずらして続ける
+        view = memoryview(data)
+        while view:
+            written = self._file.write(view)
+            view = view[written:]
+
+    def _rotate(self, new_day: date) -> None:
+        self._file.close()
+        try:
+            if self._path.exists() and self._path.stat().st_size > 0:
+                rotated = self._path.with_name(f"{self._path.stem}.{self._day.isoformat()}{self._path.suffix}")
+                os.replace(self._path, rotated)
+                olds = sorted(self._path.parent.glob(f"{self._path.stem}.*{self._path.suffix}"))
+                for old in olds[: max(len(olds) - self._retention, 0)]:
+                    old.unlink(missing_ok=True)
+        finally:
+            # 何をする行？→ 退避や古いファイルの削除に失敗しても、書き込み先は必ず開き直す
+            self._day = new_day
+            self._file = open(self._path, "ab", buffering=0)  # stop() で閉じる
+
+
+if hasattr(os, "register_at_fork"):  # Windows には fork が無い
+    os.register_at_fork(after_in_child=_restart_sinks_after_fork)
+
+
 def setup_std_logging_bridge() -> None:
     """標準loggingのrootをInterceptHandlerに置き換えてloguruへ橋渡しする。"""
 
@@ -153,9 +385,9 @@ def setup_logging(
 ) -> None:
     """Initialize logging files and console.
 
-    Adds two rotating file sinks under `log_dir`:
-      1) Human-readable: logs/app.log (rotated by size, keep ~10 files)
-      2) JSON structured: logs/app.jsonl (rotated by size, keep ~10 files)
+    Adds two BufferedSink file sinks under `log_dir`:
+      1) Human-readable: logs/app.log (rotated daily by BufferedSink, keep 10 files)
+      2) JSON structured: logs/app.jsonl (rotated daily by BufferedSink, keep 10 files)
     """
     logger.configure(patcher=_inject_origin)  # type: ignore[arg-type]
     logger.remove()
@@ -167,48 +399,44 @@ def setup_logging(
     try:
         base_level_no = logger.level(normalized_level).no
     except ValueError:
-        base_level_no = logger.level("INFO").no
+        base_level_no = _INFO_NO
     debug_modules_raw = debug_modules if debug_modules is not None else os.getenv("LOG_DEBUG_MODULES")
     debug_modules_tuple = _parse_debug_modules(debug_modules_raw)
     level_filter = _level_filter_factory(base_level_no, debug_modules_tuple)
+    # 何をする行？→ シンクの level を filter が通しうる最低レベルにし、それ未満（TRACE など）は filter も整形も呼ばせない。
+    #   DEBUG の注文系イベントは patcher で INFO に昇格させるので、INFO 設定でも DEBUG より上には上げない
+    #   （全シンクの最低 level 未満のレコードは patcher より前に loguru が捨ててしまうため）
+    sink_level = min(base_level_no, _DEBUG_NO)
 
     human_format = (
         "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
         "<level>{level: <8}</level> | {name}:{function}:{line} | {message}"
     )
 
-    # JSTで日次ローテーション
-    human_rotation = "00:00"
-    json_rotation = "00:00"
+    # 日次ローテーションは BufferedSink が日付の変わり目で行う（ここでは保持数だけ決める）
     human_retention = 10  # �ő�10�t�@�C���ʂ�ho���Ȃ��߂̃��[�e�B�V����
     json_retention = 10
 
-    # Human-readable log (size rotation)
+    # Human-readable log (daily rotation, 背景スレッドでまとめ書き)
     logger.add(
-        str(log_path / human_filename),
-        level="DEBUG",
-        rotation=human_rotation,
-        retention=human_retention,
-        enqueue=True,
+        BufferedSink(log_path / human_filename, retention=human_retention),
+        level=sink_level,
         backtrace=True,
         diagnose=False,
-        encoding="utf-8",
         format=human_format,
         filter=level_filter,
+        colorize=False,
     )
 
-    # JSON structured log (size rotation)
+    # JSON structured log (daily rotation, 背景スレッドでまとめ書き)
     logger.add(
-        str(log_path / json_filename),
-        level="DEBUG",
-        rotation=json_rotation,
-        retention=json_retention,
-        enqueue=True,
-        backtrace=True,
+        BufferedSink(log_path / json_filename, retention=json_retention, render=_json_line),
+        level=sink_level,
+        backtrace=False,  # JSONL には例外の type/value だけを書くので、呼び出し元まで遡るトレースバックは組まない
         diagnose=False,
-        encoding="utf-8",
-        serialize=True,
+        format="{message}",  # 実際の1行は BufferedSink が _json_line で作るので、loguru 側の整形は最小にする
         filter=level_filter,
+        colorize=False,
     )
     apply_loguru_patcher()  # JSONLシンク設定直後にorigin*自動付与を有効化
 
@@ -217,7 +445,7 @@ def setup_logging(
     # Console sink (stdout)
     logger.add(
         sys.stdout,
-        level="DEBUG",
+        level=sink_level,
         backtrace=True,
         diagnose=False,
         format=human_format,
@@ -225,12 +453,10 @@ def setup_logging(
     )
 
     logger.info(
-        "logging init level={} dir={} mods={} rot_human={} rot_json={} ret_human={} ret_json={}",
+        "logging init level={} dir={} mods={} ret_human={} ret_json={}",
         normalized_level,
         log_dir,
         debug_modules_tuple,
-        human_rotation,
-        json_rotation,
         human_retention,
         json_retention,
     )
@@ -1,7 +1,9 @@
 # これは「同期/非同期関数どちらにも使える指数バックオフ再試行デコレータ」を提供するファイルです。
 from __future__ import annotations
 
+import functools
 import inspect
+import random
 from typing import Any, Callable
 
 from loguru import logger
@@ -11,12 +13,13 @@ from tenacity import (
     Retrying,
     retry_if_exception_type,
     stop_after_attempt,
-    wait_exponential,
-    wait_random_exponential,
 )
 
 from .errors import ExchangeError, RateLimitError, WsDisconnected
 
+# 既定で再試行する例外（retryable() のたびに作らず、この tuple をそのまま lru_cache のキーに使う）
+_DEFAULT_RETRY_ON: tuple[type[BaseException], ...] = (ExchangeError, RateLimitError, WsDisconnected, TimeoutError)
+
 
 def _log_before_sleep(retry_state: RetryCallState) -> None:
     """これは何をする関数？
@@ -44,13 +47,41 @@ def _log_before_sleep(retry_state: RetryCallState) -> None:
     )
 
 
+class _ScheduledBackoff:
+    """これは何をするクラス？
+    → tenacity の wait_exponential / wait_random_exponential と同じ待機秒を返す wait です。
+      指数部分（wait_initial * 2**(n-1) を wait_max で頭打ち）はデコレート時に表にしておき、
+      再試行のたびには表を引くだけにします。jitter のゆらぎは従来どおり毎回引き直します。
+    """
+
+    _TABLE_LEN = 64  # 2**63 倍まで。これを超える試行回数は都度計算する
+
+    def __init__(self, wait_initial: float, wait_max: float, jitter: bool, tries: int) -> None:
+        self._wait_initial = wait_initial
+        self._wait_max = wait_max
+        self._jitter = jitter
+        self._schedule = tuple(self._envelope(i) for i in range(min(max(tries - 1, 0), self._TABLE_LEN)))
+
+    def _envelope(self, i: int) -> float:
+        try:
+            result = self._wait_initial * 2**i
+        except OverflowError:
+            return self._wait_max
+        return max(0, min(result, self._wait_max))
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        i = retry_state.attempt_number - 1
+        high = self._schedule[i] if i < len(self._schedule) else self._envelope(i)
+        return random.uniform(0, high) if self._jitter else high
+
+
 def retryable(
     *,
     tries: int = 5,
     wait_initial: float = 0.5,
     wait_max: float = 8.0,
     jitter: bool = True,
-    retry_on: tuple[type[BaseException], ...] = (ExchangeError, RateLimitError, WsDisconnected, TimeoutError),
+    retry_on: tuple[type[BaseException], ...] = _DEFAULT_RETRY_ON,
     reraise: bool = True,
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """これは何をする関数（デコレータ）？
@@ -62,20 +93,34 @@ def retryable(
       - retry_on: 再試行対象の例外タプル
       - reraise: 上限到達で例外をそのまま送出するか
     """
-    wait_policy = (
-        wait_random_exponential(multiplier=wait_initial, max=wait_max)
-        if jitter
-        else wait_exponential(multiplier=wait_initial, max=wait_max)
-    )
+    return _retryable_cached(tries, wait_initial, wait_max, jitter, tuple(retry_on), reraise)
+
+
+@functools.lru_cache(maxsize=64)
+def _retryable_cached(
+    tries: int,
+    wait_initial: float,
+    wait_max: float,
+    jitter: bool,
+    retry_on: tuple[type[BaseException], ...],
+    reraise: bool,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """これは何をする関数？
+    → retryable の本体です。同じ引数の組には同じデコレータを返し（@retryable() を何度書いても1つで済む）、
+      stop/wait/retry の各ポリシーもここで1回だけ作って、呼び出しごとの Retrying で使い回します。
+    """
+    stop_policy = stop_after_attempt(tries)
+    wait_policy = _ScheduledBackoff(wait_initial, wait_max, jitter, tries)
+    retry_policy = retry_if_exception_type(retry_on)
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         if inspect.iscoroutinefunction(func):
 
             async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
                 async for attempt in AsyncRetrying(
-                    stop=stop_after_attempt(tries),
+                    stop=stop_policy,
                     wait=wait_policy,
-                    retry=retry_if_exception_type(retry_on),
+                    retry=retry_policy,
                     reraise=reraise,
                     before_sleep=_log_before_sleep,
                 ):
@@ -86,9 +131,9 @@ def retryable(
 
         def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
             for attempt in Retrying(
-                stop=stop_after_attempt(tries),
+                stop=stop_policy,
                 wait=wait_policy,
-                retry=retry_if_exception_type(retry_on),
+                retry=retry_policy,
                 reraise=reraise,
                 before_sleep=_log_before_sleep,
             ):
@@ -0,0 +1,35 @@
+# これは「SIGTERM/SIGINT を受けたらトップレベルのタスクをキャンセルして後片付けを走らせる」起動ヘルパーのファイルです。
+from __future__ import annotations
+
+import asyncio
+import signal
+from typing import Any, Coroutine
+
+_SHUTDOWN_SIGNALS: tuple[signal.Signals, ...] = (signal.SIGTERM, signal.SIGINT)
+
+
+def run_until_signal(main: Coroutine[Any, Any, Any]) -> None:
+    """これは何をする関数？
+    → main をイベントループで実行し、SIGTERM/SIGINT を受けたら main のタスクを cancel します。
+      - KeyboardInterrupt に頼らず、systemd/Docker の停止（SIGTERM）でも finally（ccxt クローズ等）が走る
+      - add_signal_handler 非対応のループ（Windows の Proactor など）では従来どおり Ctrl+C を握りつぶす
+    """
+
+    with asyncio.Runner() as runner:
+        loop = runner.get_loop()
+        task = loop.create_task(main)
+        installed: list[signal.Signals] = []
+        for sig in _SHUTDOWN_SIGNALS:
+            try:
+                loop.add_signal_handler(sig, task.cancel)
+                installed.append(sig)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # 何をする行？→ 非対応環境・メインスレッド外ではハンドラ登録を諦める
+                continue
+        try:
+            loop.run_until_complete(task)
+        except (asyncio.CancelledError, KeyboardInterrupt):
+            pass
+        finally:
+            for sig in installed:
+                loop.remove_signal_handler(sig)
@@ -3,10 +3,13 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 
 from loguru import logger
 
+if TYPE_CHECKING:  # 型注釈のためだけに numpy を参照する
+    import numpy as np
+
 
 def utc_now() -> datetime:
     """これは何をする関数？
@@ -15,6 +18,42 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _ts_from_datetime(x: datetime) -> datetime:
+    dt = x if x.tzinfo else x.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _ts_from_number(x: int | float) -> datetime:
+    ts = float(x)
+    if ts > 1e12:  # 13桁（ミリ秒）
+        ts = ts / 1000.0
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def _ts_from_str(x: str) -> datetime:
+    s = x.strip()
+    if s.isdigit():
+        return _ts_from_number(int(s))
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(s)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except Exception as e:  # noqa: BLE001
+        raise ValueError(f"unsupported timestamp format: {x}") from e
+
+
+# 型 → 変換関数（判定順も兼ねる）。よく来る型は type(x) の1回の辞書参照で振り分ける
+_TS_PARSERS: dict[type, Callable[[Any], datetime]] = {
+    datetime: _ts_from_datetime,
+    int: _ts_from_number,
+    float: _ts_from_number,
+    str: _ts_from_str,
+}
+
+
 def parse_exchange_ts(x: Any) -> datetime:
     """これは何をする関数？
     → 取引所から来る様々な型のタイムスタンプ（ms/秒/ISO文字列等）をUTCのdatetimeに正規化します。
@@ -22,30 +61,34 @@ def parse_exchange_ts(x: Any) -> datetime:
       - str: ISO8601を想定（末尾'Z'は+00:00として扱う）。数字のみなら数値扱い
       - datetime: タイムゾーン未設定ならUTCとみなす
     """
-    if isinstance(x, datetime):
-        dt = x if x.tzinfo else x.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
-    if isinstance(x, (int, float)):
-        ts = float(x)
-        if ts > 1e12:  # 13桁（ミリ秒）
-            ts = ts / 1000.0
-        return datetime.fromtimestamp(ts, tz=timezone.utc)
-    if isinstance(x, str):
-        s = x.strip()
-        if s.isdigit():
-            return parse_exchange_ts(int(s))
-        if s.endswith("Z"):
-            s = s[:-1] + "+00:00"
-        try:
-            dt = datetime.fromisoformat(s)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc)
-        except Exception as e:  # noqa: BLE001
-            raise ValueError(f"unsupported timestamp format: {x}") from e
+    parser = _TS_PARSERS.get(type(x))
+    if parser is not None:
+        return parser(x)
+    # 何をする行？→ bool や pandas.Timestamp などのサブクラスは、従来どおり isinstance で上から順に判定する
+    for base, parser in _TS_PARSERS.items():
+        if isinstance(x, base):
+            return parser(x)
     raise TypeError(f"unsupported timestamp type: {type(x)}")
 
 
+def parse_exchange_ts_batch(values: Iterable[Any]) -> np.ndarray:
+    """これは何をする関数？
+    → タイムスタンプの列をまとめて UTC の datetime64[us] 配列（tz なし）に変換します（parse_exchange_ts の一括版）。
+      - 整数のエポック（10桁=秒 / 13桁=ミリ秒）の列は、numpy の一括演算だけで変換します
+      - それ以外（ISO文字列・datetime・浮動小数の混在など）は、1件ずつ parse_exchange_ts で変換します
+      datetime が必要な所では .astype(object) で取り出し、tzinfo=UTC を付けて使ってください。
+    """
+    import numpy as np  # 何をする行？→ 一括変換を使う所でだけ読み込む（ふだんの import を重くしない）
+
+    items = values if isinstance(values, (list, tuple, np.ndarray)) else list(values)
+    arr = np.asarray(items)
+    if arr.dtype.kind in "iu":
+        ts = arr.astype(np.int64)
+        # 何をする行？→ 1e12 を超えるものはミリ秒、それ以外は秒として、ともにマイクロ秒へ
+        return np.where(ts > 10**12, ts * 1000, ts * 1_000_000).astype("datetime64[us]")
+    return np.array([parse_exchange_ts(v).replace(tzinfo=None) for v in items], dtype="datetime64[us]")
+
+
 async def sleep_until(when: datetime) -> None:
     """これは何をする関数？
     → 与えられたタイムゾーン付きの時刻をUTCに揃えて、その時刻まで非同期で待機します。
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Literal
 
 Side = Literal["buy", "sell"]
 Venue = Literal["spot", "perp"]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CostModel:
     """手数料・スリッページ・スプレッド補正を一元管理する簡易モデル。"""
 
@@ -15,14 +15,32 @@ class CostModel:
     perp_taker_fee_bps: float = 6.0
     slippage_bps: float = 3.0
     extra_spread_bps: float = 1.0
+    # 何をする行？→ 約定価格に掛ける倍率（1±補正率）を生成時に一度だけ計算して保持（比較・表示には含めない）
+    _buy_mult: float = field(init=False, repr=False, compare=False)
+    _sell_mult: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """frozen なので object.__setattr__ で派生値（売買別の価格倍率）を格納する"""
+
+        slip = (self.slippage_bps + self.extra_spread_bps) / 10_000.0
+        object.__setattr__(self, "_buy_mult", 1.0 + slip)
+        object.__setattr__(self, "_sell_mult", 1.0 - slip)
 
     def _is_spot(self, symbol: str) -> bool:
         return symbol.endswith("_SPOT")
 
-    def taker_fee(self, *, symbol: str, qty: float, price: float) -> float:
-        """名目に応じたテイカー手数料を返す。"""
+    def venue_of(self, symbol: str) -> Venue:
+        """シンボル名から venue（"_SPOT" 終わりなら spot、それ以外は perp）を判定する。"""
+        return "spot" if self._is_spot(symbol) else "perp"
+
+    def taker_fee(self, *, qty: float, price: float, symbol: str | None = None, venue: Venue | None = None) -> float:
+        """名目に応じたテイカー手数料を返す（venue が分かっていれば渡すとシンボル名の判定を省ける）。"""
         notional = abs(qty * price)
-        bps = self.spot_taker_fee_bps if self._is_spot(symbol) else self.perp_taker_fee_bps
+        if venue is None:
+            if symbol is None:
+                raise TypeError("taker_fee() requires symbol or venue")
+            venue = self.venue_of(symbol)
+        bps = self.spot_taker_fee_bps if venue == "spot" else self.perp_taker_fee_bps
         return notional * bps / 10_000.0
 
     def notional_to_qty(self, *, notional_quote: float, px: float) -> float:
@@ -38,26 +56,24 @@ class CostModel:
 
     def slippage_px(self, *, px: float, side: Side) -> float:
         """価格に対してスリッページ/補正を乗せた擬似約定価格を返す（BBOが無い場合の近似）。"""
-        slip = (self.slippage_bps + self.extra_spread_bps) / 10_000.0
         if side.lower() == "buy":
-            return float(px) * (1.0 + slip)
-        return float(px) * (1.0 - slip)
+            return float(px) * self._buy_mult
+        return float(px) * self._sell_mult
 
     def market_fill_price(
         self, *, bid: float | None, ask: float | None, side: Side, fallback: float | None = None
     ) -> float:
         """BBOにスリッページ/スプレッド補正を乗せた約定価格を返す。"""
-        slip = (self.slippage_bps + self.extra_spread_bps) / 10_000.0
         if side.lower() == "buy":
             if ask is not None:
-                return float(ask) * (1.0 + slip)
+                return float(ask) * self._buy_mult
             if bid is not None:
-                return float(bid) * (1.0 + slip)
+                return float(bid) * self._buy_mult
         else:
             if bid is not None:
-                return float(bid) * (1.0 - slip)
+                return float(bid) * self._sell_mult
             if ask is not None:
-                return float(ask) * (1.0 - slip)
+                return float(ask) * self._sell_mult
         base = fallback if fallback is not None else 0.0
         return float(base)
 
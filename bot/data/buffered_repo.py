@@ -0,0 +1,314 @@
+# これは「OMS などの書き込みを溜めて、裏のタスクがまとめて Repo に流す」書き戻しバッファです。
+# 呼び出し側は add_trade / add_order_log で待たされず、DB には1回のトランザクションで複数行が入ります。
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Iterable, Mapping
+
+from loguru import logger
+
+from bot.core.time import utc_now
+
+from .repo import Repo
+
+# 溜めている1行（(保存に失敗した回数, 行の dict)）
+_Pending = list[tuple[int, dict[str, Any]]]
+
+
+class BufferedRepo:
+    """Repo の前に置く書き戻しバッファ（トレード/注文イベント/Funding 実績を溜めて一括保存する）"""
+
+    def __init__(
+        self,
+        inner: Repo,
+        *,
+        max_batch: int = 256,
+        flush_interval_sec: float = 0.05,
+        max_pending: int = 100_000,
+        max_retries: int = 3,
+    ) -> None:
+        """これは何をする関数？
+        → 包む Repo と、まとめる件数（max_batch）・最長の待ち時間（flush_interval_sec）を受け取ります。
+          種類ごとに溜める行は max_pending まで（超えた分は捨てて dropped に数える）、
+          1行の保存は max_retries 回まで試し、それでも入らない行は記録して捨てます（quarantined に数える）。
+          裏の書き込みタスクは最初の add_* で起動します。
+        """
+        self._inner = inner
+        self._max_batch = max_batch
+        self._flush_interval_sec = flush_interval_sec
+        self._max_pending = max_pending
+        self._max_retries = max_retries
+        self._trades: _Pending = []
+        self._order_logs: _Pending = []
+        self._funding_events: _Pending = []
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._closing = False
+        self.dropped = 0  # 溜める上限を超えて捨てた行数
+        self.quarantined = 0  # 再試行しても保存できずに捨てた行数
+
+    # ---------- 内部：溜める・流す ----------
+
+    def _enqueue(self, pending: _Pending, row: dict[str, Any]) -> None:
+        """これは何をする関数？
+        → 行を溜め、裏の書き込みタスクが無ければ起動し、max_batch に達したらすぐ流すよう起こします。
+          DB が止まっていてもメモリを使い切らないよう、種類ごとに max_pending を超えた行は捨てます。
+        """
+        if len(pending) >= self._max_pending:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("buffered_repo.queue_full dropped={} max_pending={}", self.dropped, self._max_pending)
+            return
+        pending.append((0, row))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if len(self._trades) + len(self._order_logs) + len(self._funding_events) >= self._max_batch:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        """これは何をする関数？→ flush_interval_sec ごと（または max_batch 到達で起こされたとき）に溜まった行を流し続けます。"""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._flush_interval_sec)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """これは何をする関数？
+        → 溜まっている行を種類ごとに別々に保存します（注文イベント→トレード→Funding の順）。
+          ある種類の保存が失敗しても、ほかの種類は止めずに保存します。
+        """
+        async with self._flush_lock:
+            await self._flush_one("order_log", self._order_logs, self._inner.add_order_logs)
+            await self._flush_one("trade", self._trades, self._inner.add_trades)
+            await self._flush_one("funding_event", self._funding_events, self._inner.add_funding_events)
+
+    async def _flush_one(self, kind: str, pending: _Pending, write: Any) -> None:
+        """これは何をする関数？
+        → 1種類の行をまず1回の一括保存で流し、失敗したら1行ずつ保存し直します。
+          1行でも失敗した行は失敗回数を増やして先頭に戻し、max_retries 回に達した行は記録して捨てます。
+          こうして、保存できない1行が後ろの行まで止め続けないようにします。
+        """
+        if not pending:
+            return
+        batch = pending[:]
+        del pending[:]
+        try:
+            await write([row for _, row in batch])
+            return
+        except asyncio.CancelledError:
+            pending[:0] = batch
+            raise
+        except Exception as e:  # noqa: BLE001
+            logger.warning("buffered_repo.bulk_failed table={} rows={} error={}", kind, len(batch), e)
+
+        retry: _Pending = []
+        for n, (attempts, row) in enumerate(batch):
+            try:
+                await write([row])
+            except asyncio.CancelledError:
+                pending[:0] = retry + batch[n:]
+                raise
+            except Exception as e:  # noqa: BLE001
+                if attempts + 1 >= self._max_retries:
+                    self.quarantined += 1
+                    logger.error("buffered_repo.quarantine table={} row={} error={}", kind, row, e)
+                else:
+                    retry.append((attempts + 1, row))
+        pending[:0] = retry
+
+    async def close(self) -> None:
+        """これは何をする関数？
+        → 裏の書き込みタスクを止め、残っている行を保存します（終了時に必ず呼ぶ）。
+          再試行しても残った行は、件数を記録して捨てます。
+        """
+        self._closing = True
+        self._wake.set()
+        task, self._task = self._task, None
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        for _ in range(self._max_retries):
+            if not (self._trades or self._order_logs or self._funding_events):
+                break
+            await self.flush()
+        lost = len(self._trades) + len(self._order_logs) + len(self._funding_events)
+        if lost:
+            logger.error("buffered_repo.close lost={} (could not be saved)", lost)
+            self.quarantined += lost
+            del self._trades[:], self._order_logs[:], self._funding_events[:]
+        self._closing = False
+
+    # ---------- スキーマ作成・終了処理 ----------
+
+    async def create_all(self) -> None:
+        """これは何をする関数？→ 包んでいる Repo のテーブル作成をそのまま呼びます。"""
+        await self._inner.create_all()
+
+    async def dispose(self) -> None:
+        """これは何をする関数？→ 残りを保存してから、包んでいる Repo の接続を閉じます（保存に失敗しても接続は閉じる）。"""
+        try:
+            await self.close()
+        finally:
+            await self._inner.dispose()
+
+    # ---------- 書き込み（溜めるだけ。戻り値は None） ----------
+
+    async def add_trade(
+        self,
+        *,
+        ts=None,
+        symbol: str,
+        side: str,
+        qty: float,
+        price: float,
+        fee: float,
+        exchange_order_id: str,
+        client_id: str | None = None,
+    ) -> None:
+        """これは何をする関数？→ トレード行を溜めます（ts は省略時に「溜めた時刻」を入れる）。"""
+        self._enqueue(
+            self._trades,
+            {
+                "ts": ts or utc_now(),
+                "symbol": symbol,
+                "side": side,
+                "qty": qty,
+                "price": price,
+                "fee": fee,
+                "exchange_order_id": exchange_order_id,
+                "client_id": client_id,
+            },
+        )
+
+    async def add_trades(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """これは何をする関数？→ 複数のトレード行をまとめて溜め、件数を返します。"""
+        n = 0
+        for r in records:
+            await self.add_trade(**r)
+            n += 1
+        return n
+
+    async def add_order_log(
+        self,
+        *,
+        ts=None,
+        symbol: str,
+        side: str,
+        type: str,
+        qty: float,
+        price: float | None,
+        status: str,
+        exchange_order_id: str,
+        client_id: str | None = None,
+    ) -> None:
+        """これは何をする関数？→ 注文イベント行を溜めます（ts は省略時に「溜めた時刻」を入れる）。"""
+        self._enqueue(
+            self._order_logs,
+            {
+                "ts": ts or utc_now(),
+                "symbol": symbol,
+                "side": side,
+                "type": type,
+                "qty": qty,
+                "price": price,
+                "status": status,
+                "exchange_order_id": exchange_order_id,
+                "client_id": client_id,
+            },
+        )
+
+    async def add_order_logs(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """これは何をする関数？→ 複数の注文イベント行をまとめて溜め、件数を返します。"""
+        n = 0
+        for r in records:
+            await self.add_order_log(**r)
+            n += 1
+        return n
+
+    async def add_funding_event(
+        self,
+        *,
+        ts=None,
+        symbol: str,
+        rate: float,
+        notional: float,
+        realized_pnl: float,
+    ) -> None:
+        """これは何をする関数？→ Funding 実績を溜めます（ts は省略時に「溜めた時刻」を入れる）。"""
+        self._enqueue(
+            self._funding_events,
+            {"ts": ts or utc_now(), "symbol": symbol, "rate": rate, "notional": notional, "realized_pnl": realized_pnl},
+        )
+
+    async def add_funding_events(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """これは何をする関数？→ 複数の Funding 実績をまとめて溜め、件数を返します。"""
+        n = 0
+        for r in records:
+            await self.add_funding_event(**r)
+            n += 1
+        return n
+
+    async def add_position_snap(self, **kwargs: Any) -> Any:
+        """これは何をする関数？→ ポジションスナップは溜めずにそのまま保存します（件数が少ないため）。"""
+        return await self._inner.add_position_snap(**kwargs)
+
+    async def add_daily_pnl(self, **kwargs: Any) -> Any:
+        """これは何をする関数？→ 日次PnLは溜めずにそのまま保存します（締めの値を確実に残すため）。"""
+        return await self._inner.add_daily_pnl(**kwargs)
+
+    # ---------- 読み出し（先に溜まった行を流してから読む） ----------
+
+    async def list_trades(self, **kwargs: Any) -> list[Any]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.list_trades を呼びます。"""
+        await self.flush()
+        return await self._inner.list_trades(**kwargs)
+
+    async def iter_trades(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.iter_trades の行を順に返します。"""
+        await self.flush()
+        async for row in self._inner.iter_trades(**kwargs):
+            yield row
+
+    async def aggregate_trades(self, **kwargs: Any) -> tuple[int, float, float]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.aggregate_trades を呼びます。"""
+        await self.flush()
+        return await self._inner.aggregate_trades(**kwargs)
+
+    async def list_order_logs(self, **kwargs: Any) -> list[Any]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.list_order_logs を呼びます。"""
+        await self.flush()
+        return await self._inner.list_order_logs(**kwargs)
+
+    async def iter_order_logs(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.iter_order_logs の行を順に返します。"""
+        await self.flush()
+        async for row in self._inner.iter_order_logs(**kwargs):
+            yield row
+
+    async def list_position_snaps(self, **kwargs: Any) -> list[Any]:
+        """これは何をする関数？→ Repo.list_position_snaps をそのまま呼びます。"""
+        return await self._inner.list_position_snaps(**kwargs)
+
+    async def list_funding_events(self, **kwargs: Any) -> list[Any]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.list_funding_events を呼びます。"""
+        await self.flush()
+        return await self._inner.list_funding_events(**kwargs)
+
+    async def iter_funding_events(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.iter_funding_events の行を順に返します。"""
+        await self.flush()
+        async for row in self._inner.iter_funding_events(**kwargs):
+            yield row
+
+    async def aggregate_funding(self, **kwargs: Any) -> tuple[int, float]:
+        """これは何をする関数？→ 溜まった行を保存してから Repo.aggregate_funding を呼びます。"""
+        await self.flush()
+        return await self._inner.aggregate_funding(**kwargs)
+
+    async def list_daily_pnl(self, **kwargs: Any) -> list[Any]:
+        """これは何をする関数？→ Repo.list_daily_pnl をそのまま呼びます。"""
+        return await self._inner.list_daily_pnl(**kwargs)
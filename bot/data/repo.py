@@ -3,16 +3,50 @@
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Mapping
 
-from sqlalchemy import select
+from sqlalchemy import Select, event, func, insert, select
 from sqlalchemy.engine import make_url
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from bot.core.time import utc_now  # テストや既定値で使う
 
 from .schema import Base, DailyPnl, FundingEvent, OrderLog, PositionSnap, TradeLog
 
+# SQLite の接続ごとに流す PRAGMA（WAL で読み書きを並行させ、commit ごとの fsync を減らし、キャッシュを広げる）
+_SQLITE_PRAGMAS: tuple[str, ...] = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 約64MB（負の値は KiB 単位）
+    "PRAGMA mmap_size=268435456",  # 256MB
+    "PRAGMA busy_timeout=5000",
+)
+
+# iter_* が1ページで取り出す行数（メモリはこの件数ぶんに抑えられる）
+_ITER_BATCH = 500
+
+
+def _set_sqlite_pragmas(dbapi_conn: Any, _record: Any) -> None:
+    """これは何をする関数？→ 新しい SQLite 接続が作られるたびに _SQLITE_PRAGMAS を流します。"""
+    cur = dbapi_conn.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cur.execute(pragma)
+    finally:
+        cur.close()
+
 
 class Repo:
     """アプリがDBへアクセスするための窓口（create_allとCRUDを提供）"""
@@ -21,11 +55,17 @@ class Repo:
         """これは何をする関数？
         → 接続文字列を受け取り、非同期エンジンとセッションファクトリを準備します。
           SQLiteのときはDBファイルの親ディレクトリを自動作成します。
+          実際の接続は最初のDBアクセス（または start()）で1本だけ開き、以後の呼び出しで使い回します。
         """
         self._db_url = db_url
         self._ensure_sqlite_dir(db_url)
         self._engine: AsyncEngine = create_async_engine(db_url, echo=False, future=True)
+        if self._engine.dialect.name == "sqlite":
+            event.listen(self._engine.sync_engine, "connect", _set_sqlite_pragmas)
         self._sessionmaker: async_sessionmaker[AsyncSession] = async_sessionmaker(self._engine, expire_on_commit=False)
+        # 何をする行？→ 使い回す長寿命の接続と、その接続を同時に1セッションだけが使うためのロック
+        self._conn: AsyncConnection | None = None
+        self._conn_lock = asyncio.Lock()
 
     # ---------- 内部：SQLiteパスのディレクトリ自動作成 ----------
 
@@ -48,14 +88,82 @@ class Repo:
             p = Path.cwd() / p
         p.parent.mkdir(parents=True, exist_ok=True)
 
+    @staticmethod
+    def _in_range(stmt: Select, ts_col: Any, since: datetime | None, until: datetime | None) -> Select:
+        """これは何をする関数？→ since/until（任意）が渡されたら ts が [since, until) の行に絞る条件を足します。"""
+        if since is not None:
+            stmt = stmt.where(ts_col >= since)
+        if until is not None:
+            stmt = stmt.where(ts_col < until)
+        return stmt
+
+    @staticmethod
+    def _page(stmt: Select, id_col: Any, limit: int | None, before_id: int | None) -> Select:
+        """これは何をする関数？
+        → before_id（任意）より小さい id だけに絞り、limit（任意）件で打ち切ります（id 降順のキーセット・ページング）。
+          次のページは「前ページ最後の行の id」を before_id に渡して取ります。
+        """
+        if before_id is not None:
+            stmt = stmt.where(id_col < before_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    @staticmethod
+    async def _iter_pages(fetch: Callable[..., Awaitable[list[Any]]]) -> AsyncIterator[Any]:
+        """これは何をする関数？
+        → list_* を limit=_ITER_BATCH と before_id で1ページずつ呼び、行を順に返します（id 降順のキーセット・ページング）。
+          共有接続のロックは1ページを取り出す間だけ持つので、ループの中で同じ Repo の他のメソッドを呼べます。
+        """
+        before_id: int | None = None
+        while True:
+            rows = await fetch(limit=_ITER_BATCH, before_id=before_id)
+            for row in rows:
+                yield row
+            if len(rows) < _ITER_BATCH:
+                return
+            before_id = rows[-1].id
+
+    # ---------- 共有接続 ----------
+
+    async def start(self) -> None:
+        """これは何をする関数？
+        → 使い回す接続を1本開き、セッションファクトリをその接続に結びつけます（開いていれば何もしません）。
+          呼ばなくても最初のDBアクセスで自動的に開きます。
+        """
+        if self._conn is None:
+            self._conn = await self._engine.connect()
+            self._sessionmaker.configure(bind=self._conn)
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """これは何をする関数？
+        → 共有接続に結びついたセッションを1つ貸し出します。
+          1本の接続を複数タスクが同時に使わないよう、セッションの間はロックを持ちます。
+        """
+        async with self._conn_lock:
+            await self.start()
+            async with self._sessionmaker() as s:
+                yield s
+
     # ---------- スキーマ作成 ----------
 
     async def create_all(self) -> None:
         """これは何をする関数？
-        → モデルに基づく全テーブルを作成します（既にあれば何もしません）。
+        → モデルに基づく全テーブルと索引を作成します（既にあれば何もしません）。
+          索引は既存のテーブルにも後から足します（create_all はテーブルを作るときしか索引を作らないため）。
         """
-        async with self._engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        async with self._session() as s:
+            await s.run_sync(lambda sync_s: self._create_schema(sync_s.connection()))
+            await s.commit()
+
+    @staticmethod
+    def _create_schema(conn: Any) -> None:
+        """これは何をする関数？→ 同期接続でテーブルを作り、まだ無い索引を1つずつ作ります。"""
+        Base.metadata.create_all(conn)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
     # ---------- TradeLog ----------
 
@@ -82,21 +190,89 @@ class Repo:
             exchange_order_id=exchange_order_id,
             client_id=client_id,
         )
-        async with self._sessionmaker() as s:
+        async with self._session() as s:
             s.add(row)
             await s.commit()
-            await s.refresh(row)
         return row
 
-    async def list_trades(self, *, symbol: str | None = None) -> list[TradeLog]:
-        """これは何をする関数？→ 条件（任意）でトレード一覧を返します。"""
-        async with self._sessionmaker() as s:
-            stmt = select(TradeLog).order_by(TradeLog.id.desc())
-            if symbol:
-                stmt = stmt.where(TradeLog.symbol == symbol)
+    async def add_trades(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """これは何をする関数？
+        → トレード行を複数件まとめて保存し、件数を返します（1回の executemany + 1回の commit）。
+          各要素は add_trade と同じキー（ts は省略時に現在時刻、client_id は省略可）を持つ dict。
+        """
+        rows = [
+            {
+                "ts": r.get("ts") or utc_now(),
+                "symbol": r["symbol"],
+                "side": r["side"],
+                "qty": r["qty"],
+                "price": r["price"],
+                "fee": r["fee"],
+                "exchange_order_id": r["exchange_order_id"],
+                "client_id": r.get("client_id"),
+            }
+            for r in records
+        ]
+        if not rows:
+            return 0
+        async with self._session() as s:
+            await s.execute(insert(TradeLog), rows)
+            await s.commit()
+        return len(rows)
+
+    async def list_trades(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> list[TradeLog]:
+        """これは何をする関数？
+        → 条件（任意）でトレード一覧を返します。since/until を渡すと ts が [since, until) の行だけを SQL 側で絞り込みます。
+          limit/before_id（任意）で id 降順のページ単位に取れます（次ページは前ページ最後の id を before_id に）。
+        """
+        async with self._session() as s:
+            stmt = self._page(self._trades_stmt(symbol, since, until), TradeLog.id, limit, before_id)
             res = await s.execute(stmt)
             return list(res.scalars().all())
 
+    async def iter_trades(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[TradeLog]:
+        """これは何をする関数？
+        → list_trades と同じ条件・並びのトレードを、_ITER_BATCH 件ずつ取り出しながら1行ずつ返します（全件をリストにしない）。
+          共有接続のロックは各ページを取り出す間だけ持つので、ループの中で同じ Repo の他のメソッドも呼べます。
+        """
+        fetch = partial(self.list_trades, symbol=symbol, since=since, until=until)
+        async for row in self._iter_pages(fetch):
+            yield row
+
+    def _trades_stmt(self, symbol: str | None, since: datetime | None, until: datetime | None) -> Select:
+        """これは何をする関数？→ list_trades / iter_trades 共通の SELECT 文（新しい順）を組み立てます。"""
+        stmt = select(TradeLog).order_by(TradeLog.id.desc())
+        if symbol:
+            stmt = stmt.where(TradeLog.symbol == symbol)
+        return self._in_range(stmt, TradeLog.ts, since, until)
+
+    async def aggregate_trades(self, *, since: datetime, until: datetime) -> tuple[int, float, float]:
+        """これは何をする関数？
+        → ts が [since, until) のトレードの「件数・手数料合計・名目合計（|qty×price|）」を 1 本の集計 SQL で返します。
+        """
+        async with self._session() as s:
+            stmt = select(
+                func.count(TradeLog.id),
+                func.coalesce(func.sum(TradeLog.fee), 0.0),
+                func.coalesce(func.sum(func.abs(TradeLog.qty * TradeLog.price)), 0.0),
+            ).where(TradeLog.ts >= since, TradeLog.ts < until)
+            count, fees, notional = (await s.execute(stmt)).one()
+            return int(count), float(fees), float(notional)
+
     # ---------- OrderLog ----------
 
     async def add_order_log(
@@ -124,21 +300,77 @@ class Repo:
             exchange_order_id=exchange_order_id,
             client_id=client_id,
         )
-        async with self._sessionmaker() as s:
+        async with self._session() as s:
             s.add(row)
             await s.commit()
-            await s.refresh(row)
         return row
 
-    async def list_order_logs(self, *, symbol: str | None = None) -> list[OrderLog]:
-        """これは何をする関数？→ 条件（任意）で注文イベント一覧を返します。"""
-        async with self._sessionmaker() as s:
-            stmt = select(OrderLog).order_by(OrderLog.id.desc())
-            if symbol:
-                stmt = stmt.where(OrderLog.symbol == symbol)
+    async def add_order_logs(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """これは何をする関数？
+        → 注文イベント行を複数件まとめて保存し、件数を返します（1回の executemany + 1回の commit）。
+          各要素は add_order_log と同じキー（ts は省略時に現在時刻、client_id は省略可）を持つ dict。
+        """
+        rows = [
+            {
+                "ts": r.get("ts") or utc_now(),
+                "symbol": r["symbol"],
+                "side": r["side"],
+                "type": r["type"],
+                "qty": r["qty"],
+                "price": r["price"],
+                "status": r["status"],
+                "exchange_order_id": r["exchange_order_id"],
+                "client_id": r.get("client_id"),
+            }
+            for r in records
+        ]
+        if not rows:
+            return 0
+        async with self._session() as s:
+            await s.execute(insert(OrderLog), rows)
+            await s.commit()
+        return len(rows)
+
+    async def list_order_logs(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> list[OrderLog]:
+        """これは何をする関数？
+        → 条件（任意）で注文イベント一覧を返します（since/until は ts の [since, until)）。
+          limit/before_id（任意）で id 降順のページ単位に取れます（次ページは前ページ最後の id を before_id に）。
+        """
+        async with self._session() as s:
+            stmt = self._page(self._order_logs_stmt(symbol, since, until), OrderLog.id, limit, before_id)
             res = await s.execute(stmt)
             return list(res.scalars().all())
 
+    async def iter_order_logs(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[OrderLog]:
+        """これは何をする関数？
+        → list_order_logs と同じ条件の注文イベントを _ITER_BATCH 件ずつ取り出しながら1行ずつ返します。
+          共有接続のロックは各ページを取り出す間だけ持つので、ループの中で同じ Repo の他のメソッドも呼べます。
+        """
+        fetch = partial(self.list_order_logs, symbol=symbol, since=since, until=until)
+        async for row in self._iter_pages(fetch):
+            yield row
+
+    def _order_logs_stmt(self, symbol: str | None, since: datetime | None, until: datetime | None) -> Select:
+        """これは何をする関数？→ list_order_logs / iter_order_logs 共通の SELECT 文（新しい順）を組み立てます。"""
+        stmt = select(OrderLog).order_by(OrderLog.id.desc())
+        if symbol:
+            stmt = stmt.where(OrderLog.symbol == symbol)
+        return self._in_range(stmt, OrderLog.ts, since, until)
+
     # ---------- PositionSnap ----------
 
     async def add_position_snap(
@@ -160,18 +392,24 @@ class Repo:
             entry_price=entry_price,
             upnl=upnl,
         )
-        async with self._sessionmaker() as s:
+        async with self._session() as s:
             s.add(row)
             await s.commit()
-            await s.refresh(row)
         return row
 
-    async def list_position_snaps(self, *, symbol: str | None = None) -> list[PositionSnap]:
-        """これは何をする関数？→ 条件（任意）でポジションスナップ一覧を返します。"""
-        async with self._sessionmaker() as s:
+    async def list_position_snaps(
+        self,
+        *,
+        symbol: str | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> list[PositionSnap]:
+        """これは何をする関数？→ 条件（任意）でポジションスナップ一覧を返します（limit/before_id でページ単位に取れます）。"""
+        async with self._session() as s:
             stmt = select(PositionSnap).order_by(PositionSnap.id.desc())
             if symbol:
                 stmt = stmt.where(PositionSnap.symbol == symbol)
+            stmt = self._page(stmt, PositionSnap.id, limit, before_id)
             res = await s.execute(stmt)
             return list(res.scalars().all())
 
@@ -194,21 +432,84 @@ class Repo:
             notional=notional,
             realized_pnl=realized_pnl,
         )
-        async with self._sessionmaker() as s:
+        async with self._session() as s:
             s.add(row)
             await s.commit()
-            await s.refresh(row)
         return row
 
-    async def list_funding_events(self, *, symbol: str | None = None) -> list[FundingEvent]:
-        """これは何をする関数？→ 条件（任意）でFunding実績一覧を返します。"""
-        async with self._sessionmaker() as s:
-            stmt = select(FundingEvent).order_by(FundingEvent.id.desc())
-            if symbol:
-                stmt = stmt.where(FundingEvent.symbol == symbol)
+    async def add_funding_events(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """これは何をする関数？
+        → Funding実績を複数件まとめて保存し、件数を返します（1回の executemany + 1回の commit）。
+          各要素は add_funding_event と同じキー（ts は省略時に現在時刻）を持つ dict。
+        """
+        rows = [
+            {
+                "ts": r.get("ts") or utc_now(),
+                "symbol": r["symbol"],
+                "rate": r["rate"],
+                "notional": r["notional"],
+                "realized_pnl": r["realized_pnl"],
+            }
+            for r in records
+        ]
+        if not rows:
+            return 0
+        async with self._session() as s:
+            await s.execute(insert(FundingEvent), rows)
+            await s.commit()
+        return len(rows)
+
+    async def list_funding_events(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> list[FundingEvent]:
+        """これは何をする関数？
+        → 条件（任意）でFunding実績一覧を返します（since/until は ts の [since, until)）。
+          limit/before_id（任意）で id 降順のページ単位に取れます（次ページは前ページ最後の id を before_id に）。
+        """
+        async with self._session() as s:
+            stmt = self._page(self._funding_events_stmt(symbol, since, until), FundingEvent.id, limit, before_id)
             res = await s.execute(stmt)
             return list(res.scalars().all())
 
+    async def iter_funding_events(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[FundingEvent]:
+        """これは何をする関数？
+        → list_funding_events と同じ条件の Funding 実績を _ITER_BATCH 件ずつ取り出しながら1行ずつ返します。
+          共有接続のロックは各ページを取り出す間だけ持つので、ループの中で同じ Repo の他のメソッドも呼べます。
+        """
+        fetch = partial(self.list_funding_events, symbol=symbol, since=since, until=until)
+        async for row in self._iter_pages(fetch):
+            yield row
+
+    def _funding_events_stmt(self, symbol: str | None, since: datetime | None, until: datetime | None) -> Select:
+        """これは何をする関数？→ list_funding_events / iter_funding_events 共通の SELECT 文（新しい順）を組み立てます。"""
+        stmt = select(FundingEvent).order_by(FundingEvent.id.desc())
+        if symbol:
+            stmt = stmt.where(FundingEvent.symbol == symbol)
+        return self._in_range(stmt, FundingEvent.ts, since, until)
+
+    async def aggregate_funding(self, *, since: datetime, until: datetime) -> tuple[int, float]:
+        """これは何をする関数？
+        → ts が [since, until) の Funding 実績の「件数」と「realized_pnl 合計」を 1 本の集計 SQL で返します（行は読み込まない）。
+        """
+        async with self._session() as s:
+            stmt = select(func.count(FundingEvent.id), func.coalesce(func.sum(FundingEvent.realized_pnl), 0.0)).where(
+                FundingEvent.ts >= since, FundingEvent.ts < until
+            )
+            count, total = (await s.execute(stmt)).one()
+            return int(count), float(total)
+
     # ---------- DailyPnl ----------
 
     async def add_daily_pnl(
@@ -221,23 +522,34 @@ class Repo:
     ) -> DailyPnl:
         """これは何をする関数？→ 日付キーで日次PnLを追加（同日が複数あっても良いMVP仕様）"""
         row = DailyPnl(date=date, gross=gross, fees=fees, net=net)
-        async with self._sessionmaker() as s:
+        async with self._session() as s:
             s.add(row)
             await s.commit()
-            await s.refresh(row)
         return row
 
-    async def list_daily_pnl(self, *, date: str | None = None) -> list[DailyPnl]:
-        """これは何をする関数？→ 条件（任意）で日次PnLの一覧を返します。"""
-        async with self._sessionmaker() as s:
+    async def list_daily_pnl(
+        self,
+        *,
+        date: str | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> list[DailyPnl]:
+        """これは何をする関数？→ 条件（任意）で日次PnLの一覧を返します（limit/before_id でページ単位に取れます）。"""
+        async with self._session() as s:
             stmt = select(DailyPnl).order_by(DailyPnl.id.desc())
             if date:
                 stmt = stmt.where(DailyPnl.date == date)
+            stmt = self._page(stmt, DailyPnl.id, limit, before_id)
             res = await s.execute(stmt)
             return list(res.scalars().all())
 
     # ---------- 終了処理 ----------
 
     async def dispose(self) -> None:
-        """これは何をする関数？→ エンジンを明示的に閉じます（任意）。"""
+        """これは何をする関数？→ 共有接続とエンジンを明示的に閉じます（任意。閉じた後のアクセスでは接続を開き直します）。"""
+        async with self._conn_lock:
+            if self._conn is not None:
+                await self._conn.close()
+                self._conn = None
+                self._sessionmaker.configure(bind=self._engine)
         await self._engine.dispose()
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 # A no-op repository: keeps the same async interface as Repo but does not persist.
 # Useful when you want to avoid DB writes entirely.
-from typing import Any, List
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, List, Mapping
 
 
 class NoopRepo:
@@ -24,9 +25,33 @@ class NoopRepo:
     ) -> Any:
         return None
 
-    async def list_trades(self, *, symbol: str | None = None) -> List[Any]:
+    async def add_trades(self, records: Iterable[Mapping[str, Any]]) -> int:
+        return 0
+
+    async def list_trades(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> List[Any]:
         return []
 
+    async def iter_trades(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[Any]:
+        return
+        yield
+
+    async def aggregate_trades(self, *, since: datetime, until: datetime) -> tuple[int, float, float]:
+        return 0, 0.0, 0.0
+
     # ----- OrderLog -----
     async def add_order_log(
         self,
@@ -43,9 +68,30 @@ class NoopRepo:
     ) -> Any:
         return None
 
-    async def list_order_logs(self, *, symbol: str | None = None) -> List[Any]:
+    async def add_order_logs(self, records: Iterable[Mapping[str, Any]]) -> int:
+        return 0
+
+    async def list_order_logs(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> List[Any]:
         return []
 
+    async def iter_order_logs(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[Any]:
+        return
+        yield
+
     # ----- PositionSnap -----
     async def add_position_snap(
         self,
@@ -59,7 +105,13 @@ class NoopRepo:
     ) -> Any:
         return None
 
-    async def list_position_snaps(self, *, symbol: str | None = None) -> List[Any]:
+    async def list_position_snaps(
+        self,
+        *,
+        symbol: str | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> List[Any]:
         return []
 
     # ----- FundingEvent -----
@@ -74,9 +126,33 @@ class NoopRepo:
     ) -> Any:
         return None
 
-    async def list_funding_events(self, *, symbol: str | None = None) -> List[Any]:
+    async def add_funding_events(self, records: Iterable[Mapping[str, Any]]) -> int:
+        return 0
+
+    async def list_funding_events(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+    ) -> List[Any]:
         return []
 
+    async def iter_funding_events(
+        self,
+        *,
+        symbol: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[Any]:
+        return
+        yield
+
+    async def aggregate_funding(self, *, since: datetime, until: datetime) -> tuple[int, float]:
+        return 0, 0.0
+
     # ----- Misc -----
     async def dispose(self) -> None:  # pragma: no cover - trivial
         return None
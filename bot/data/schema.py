@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy import DateTime, Float, Index, Integer, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -19,8 +19,10 @@ class TradeLog(Base):
     """約定（トレード）を記録するテーブル"""
 
     __tablename__ = "trade_log"
+    # 何をする行？→ symbol で絞って id 降順に並べる list_* を、索引の範囲走査だけで返せるようにする
+    __table_args__ = (Index("ix_trade_log_symbol_id", "symbol", "id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # 約定時刻（UTC）
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)  # 約定時刻（UTC）
     symbol: Mapped[str] = mapped_column(String(32))
     side: Mapped[str] = mapped_column(String(8))  # "buy" / "sell"
     qty: Mapped[float] = mapped_column(Float)  # ベース数量
@@ -34,8 +36,9 @@ class OrderLog(Base):
     """注文イベント（発注・更新・取消など）を記録するテーブル"""
 
     __tablename__ = "order_log"
+    __table_args__ = (Index("ix_order_log_symbol_id", "symbol", "id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     symbol: Mapped[str] = mapped_column(String(32))
     side: Mapped[str] = mapped_column(String(8))
     type: Mapped[str] = mapped_column(String(16))  # "limit" / "market" など
@@ -50,6 +53,7 @@ class PositionSnap(Base):
     """建玉スナップショット（定期的に保存してポジションの推移を追う）"""
 
     __tablename__ = "position_snap"
+    __table_args__ = (Index("ix_position_snap_symbol_id", "symbol", "id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     symbol: Mapped[str] = mapped_column(String(32))
@@ -63,8 +67,9 @@ class FundingEvent(Base):
     """Funding 受払の実績を記録（検証/レポートで使用）"""
 
     __tablename__ = "funding_event"
+    __table_args__ = (Index("ix_funding_event_symbol_id", "symbol", "id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # 実支払の時刻（UTC）
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)  # 実支払の時刻（UTC）
     symbol: Mapped[str] = mapped_column(String(32))
     rate: Mapped[float] = mapped_column(Float)  # その期間の実現レート（符号付）
     notional: Mapped[float] = mapped_column(Float)  # 基準名目
@@ -76,7 +81,7 @@ class DailyPnl(Base):
 
     __tablename__ = "daily_pnl"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    date: Mapped[str] = mapped_column(String(10))  # "YYYY-MM-DD"
+    date: Mapped[str] = mapped_column(String(10), index=True)  # "YYYY-MM-DD"
     gross: Mapped[float] = mapped_column(Float)
     fees: Mapped[float] = mapped_column(Float)
     net: Mapped[float] = mapped_column(Float)
@@ -919,15 +919,16 @@ class BitgetGateway(ExchangeGateway):
         # 実装は _subscribe_private_impl に切り出し、retryable 側から WsDisconnected を拾いやすくする
         return await _bitget_subscribe_private_impl(self, callbacks)
 
+    @retryable(tries=999999, wait_initial=1.0, wait_max=30.0)
     async def subscribe_public(
         self,
         symbols: list[str],
         callbacks: dict[str, Callable[[dict], Awaitable[None]]],
     ) -> None:
-        """Bitget Public WS は現時点では未実装。
+        """Bitget Public WS（ticker/books/trade）を購読し続ける。
 
-        - Paper runner は Bitget 前提のまま利用する想定。
-        - 将来的に ticker/orderbook/trades をここで実装する想定。
+        - 断線・無通信（WsDisconnected）はここで指数バックオフ再接続するため、呼び出し側で再試行を重ねない。
+        - キャンセル（CancelledError）は再試行対象外なので、そのまま呼び出し元へ伝わる。
         """
 
         # 実装は _subscribe_public_impl に切り出し、retryable 側から WsDisconnected を拾いやすくする
@@ -173,15 +173,11 @@ class MetricsLogger:
         if self._repo is None:
             return self._estimate_daily_pnl_from_logs(day)
 
-        ff = await self._repo.list_funding_events()
-        tt = await self._repo.list_trades()
-
-        def _is_same_day(ts: datetime) -> bool:
-            d = ts.astimezone(timezone.utc).date()
-            return d == day
-
-        funding_sum = sum(f.realized_pnl for f in ff if _is_same_day(f.ts))
-        fees_sum = sum(t.fee for t in tt if _is_same_day(t.ts))
+        # 日付の絞り込みと合計は集計 SQL で行う（行を全件読み込まない）
+        day_start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        day_end = day_start + timedelta(days=1)
+        _count, funding_sum = await self._repo.aggregate_funding(since=day_start, until=day_end)
+        _trades, fees_sum, _notional = await self._repo.aggregate_trades(since=day_start, until=day_end)
         return float(funding_sum), float(fees_sum)
 
     def _estimate_daily_pnl_from_logs(self, day: date) -> tuple[float, float]:
@@ -31,10 +31,9 @@ async def generate_daily_report(*, repo: Repo, date_str: str | None = None, out_
     start = datetime.combine(target_day, datetime.min.time(), tzinfo=timezone.utc)
     end = start + timedelta(days=1)
 
-    # 既存Repo APIを使って全件取得→Pythonで日付フィルタ（MVP）
-    fundings = [f for f in await repo.list_funding_events() if start <= f.ts.astimezone(timezone.utc) < end]
-    trades = [t for t in await repo.list_trades() if start <= t.ts.astimezone(timezone.utc) < end]
-    orders = [o for o in await repo.list_order_logs() if start <= o.ts.astimezone(timezone.utc) < end]
+    # 日付の絞り込みは SQL 側（ts の [start, end)）で行い、全件取得＋Pythonフィルタを避ける
+    fundings = await repo.list_funding_events(since=start, until=end)
+    orders = await repo.list_order_logs(since=start, until=end)
 
     # Funding 集計
     funding_sum = sum(f.realized_pnl for f in fundings)
@@ -42,10 +41,8 @@ async def generate_daily_report(*, repo: Repo, date_str: str | None = None, out_
     for f in fundings:
         funding_by_symbol[f.symbol] += float(f.realized_pnl)
 
-    # 手数料・出来高（概算）
-    fees_sum = sum(t.fee for t in trades)
-    trade_count = len(trades)
-    traded_notional = sum(abs(t.qty * t.price) for t in trades)
+    # 手数料・出来高（概算）：トレード行は読まず、件数/合計だけを集計 SQL で得る
+    trade_count, fees_sum, traded_notional = await repo.aggregate_trades(since=start, until=end)
 
     # 注文イベント件数（ステータス集計・MVP）
     by_status: dict[str, int] = defaultdict(int)
@@ -144,7 +141,10 @@ def main() -> None:
     async def _run() -> None:
         repo = Repo()  # 既定の SQLite (config と一致させる想定)
         await repo.create_all()
-        await generate_daily_report(repo=repo, date_str=args.date, out_dir=args.out)
+        try:
+            await generate_daily_report(repo=repo, date_str=args.date, out_dir=args.out)
+        finally:
+            await repo.dispose()
 
     try:
         asyncio.run(_run())
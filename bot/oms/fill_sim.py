@@ -176,17 +176,24 @@ class PaperExchange(ExchangeGateway):
                 )
             return out
 
-    async def get_ticker(self, symbol: str) -> float:
+    def _get_ticker_sync(self, symbol: str) -> float | None:
         """これは何をする関数？
-        → 近似価格を返します。優先順位：mid(BBO) > last > data_sourceのticker。
+        → 手元の BBO/last だけで決まる近似価格（mid > last）を同期で返します。data_source への問い合わせが必要なら None。
         """
 
         bid, ask = self._bbo_with_fallback(symbol)
         if bid is not None and ask is not None:
             return (bid + ask) / 2.0
-        last = self._last_price_with_fallback(symbol)
-        if last is not None:
-            return last
+        return self._last_price_with_fallback(symbol)
+
+    async def get_ticker(self, symbol: str) -> float:
+        """これは何をする関数？
+        → 近似価格を返します。優先順位：mid(BBO) > last > data_sourceのticker。
+        """
+
+        px = self._get_ticker_sync(symbol)
+        if px is not None:
+            return px
         # フォールバック：data_source（REST）
         try:
             return await self._data.get_ticker(symbol)
@@ -570,11 +577,22 @@ class PaperExchange(ExchangeGateway):
         """
 
         async with self._lock:
-            candidates = [
-                po
-                for po in self._orders.values()
-                if po.req.symbol == symbol and po.status == "new" and po.req.type.lower() == "limit"
-            ]
+            candidates = self._limit_candidates(symbol)
+        await self._fill_limit_candidates(candidates)
+
+    def _limit_candidates(self, symbol: str) -> list[_PaperOrder]:
+        """これは何をする関数？
+        → 指定シンボルの未約定指値を同期的に列挙します（await を挟まないので、バックテストのティック処理から直接呼べる）。
+        """
+
+        return [
+            po
+            for po in self._orders.values()
+            if po.req.symbol == symbol and po.status == "new" and po.req.type.lower() == "limit"
+        ]
+
+    async def _fill_limit_candidates(self, candidates: list[_PaperOrder]) -> None:
+        """これは何をする関数？→ 列挙済みの未約定指値のうち、板内に入ったものを即時に全部約定させます。"""
 
         for po in candidates:
             if await self._is_limit_crossing(po.req):
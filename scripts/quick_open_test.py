@@ -19,12 +19,7 @@ async def main() -> None:
     symbol = cfg.strategy.symbols[0]
 
     # バックテスト用データソース（リアルWS不要）
-    sched = (
-        FundingSchedule(path=".backtest_empty_funding.csv")
-        if False
-        else FundingSchedule(path=".backtest_empty_funding.csv")
-    )
-    data_src = ReplayDataSource(schedule=sched)
+    data_src = ReplayDataSource(schedule=FundingSchedule.empty())
     data_src.set_now(datetime.now(timezone.utc))
 
     # PaperExchange + OMS
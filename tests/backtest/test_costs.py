@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import numpy as np
+
+from bot.backtest.costs import CostModel, estimate_slippage_bps, maker_fee, taker_fee
+
+
+def test_fee_rates_precomputed_from_bps() -> None:
+    """生成時に計算した倍率で手数料が bps/1e4 と一致すること"""
+
+    model = CostModel(taker_fee_bps=5.0, maker_fee_bps=2.0)
+    assert taker_fee(10_000.0, model=model) == 5.0
+    assert maker_fee(10_000.0, model=model) == 2.0
+    # 派生値は等価比較や repr に影響しない
+    assert model == CostModel(taker_fee_bps=5.0, maker_fee_bps=2.0)
+    assert "_taker_rate" not in repr(model)
+
+
+def test_slippage_has_floor_and_scales_with_size() -> None:
+    """スリッページは最低値を下回らず、サイズ比に応じて増えること"""
+
+    model = CostModel(min_slippage_bps=1.0, depth_qty_base=2.0)
+    assert estimate_slippage_bps(0.0, model=model) == 1.0
+    assert estimate_slippage_bps(-1.0, model=model) == 1.0
+    assert estimate_slippage_bps(2.0, model=model) == 2.0
+    assert estimate_slippage_bps(5.0, model=CostModel(depth_qty_base=0.0)) == 1.0
+
+
+def test_array_inputs_match_scalar_results() -> None:
+    """ndarray 入力でもスカラー版と同じ値を要素ごとに返すこと"""
+
+    model = CostModel(taker_fee_bps=5.0, maker_fee_bps=2.0, min_slippage_bps=1.0, depth_qty_base=2.0)
+    notionals = np.array([0.0, 100.0, 12_345.0])
+    qtys = np.array([-1.0, 0.0, 1.0, 4.0])
+
+    assert np.allclose(taker_fee(notionals, model=model), [taker_fee(float(n), model=model) for n in notionals])
+    assert np.allclose(maker_fee(notionals, model=model), [maker_fee(float(n), model=model) for n in notionals])
+    assert np.allclose(
+        estimate_slippage_bps(qtys, model=model), [estimate_slippage_bps(float(q), model=model) for q in qtys]
+    )
+    assert isinstance(taker_fee(100.0, model=model), float)
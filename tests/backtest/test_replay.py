@@ -8,9 +8,11 @@ from bot.config.models import RiskConfig, StrategyFundingConfig
 
 
 @pytest.mark.asyncio
-async def test_backtest_replay_one_day(tmp_path):
+async def test_backtest_replay_one_day(tmp_path, monkeypatch):
     """小さなCSVで1日リプレイが完走し、Fundingイベントが記録されること"""
 
+    monkeypatch.chdir(tmp_path)  # OMS が書く logs/*.jsonl をリポジトリに残さない
+
     # 価格CSV（UTC 00:00～00:01:10 の間に複数ティック）
     prices_csv = tmp_path / "prices.csv"
     df = pd.DataFrame(
@@ -66,9 +68,268 @@ async def test_backtest_replay_one_day(tmp_path):
         step_sec=1.0,  # 1秒間隔でstepを回す
     )
     res = await runner.run_one_day(date_utc="2024-01-01")
+    await runner._repo.dispose()
 
     # Fundingイベントが1件以上、NetPnLが計算できている
     assert res.funding_events >= 1
     # +rate で perp short（想定）なら受取がプラス寄与になる
     # 厳密な金額までは検証しない（コストを入れていないため）
     assert isinstance(res.net_pnl, float)
+
+
+def test_funding_schedule_next_and_due_events(tmp_path):
+    """次回Fundingの検索と、期限到来イベントの一度きりの払い出しが銘柄ごとに正しいこと"""
+    from datetime import datetime, timezone
+
+    funding_csv = tmp_path / "funding.csv"
+    pd.DataFrame(
+        [
+            ["2024-01-01T08:00:00Z", "ETHUSDT", 0.0002],
+            ["2024-01-01T00:00:00Z", "BTCUSDT", 0.0001],
+            ["2024-01-01T08:00:00Z", "BTCUSDT", -0.0001],
+        ],
+        columns=["ts", "symbol", "rate"],
+    ).to_csv(funding_csv, index=False)
+    sched = FundingSchedule(path=str(funding_csv))
+
+    t0 = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+    t8 = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+    # ちょうど時刻が一致する場合は「次回」に含めない（ts > now）
+    assert sched.next_rate_and_time(symbol="BTCUSDT", now=t0) == (-0.0001, t8)
+    assert sched.next_rate_and_time(symbol="BTCUSDT", now=t8) == (None, None)
+    assert sched.next_rate_and_time(symbol="SOLUSDT", now=t0) == (None, None)
+
+    assert [(e.symbol, e.rate) for e in sched.due_events(now=t0)] == [("BTCUSDT", 0.0001)]
+    assert sched.due_events(now=t0) == []
+    # 同時刻は (ts, symbol) 順で返す
+    assert [(e.symbol, e.rate) for e in sched.due_events(now=t8)] == [("BTCUSDT", -0.0001), ("ETHUSDT", 0.0002)]
+    assert sched.due_events(now=t8) == []
+
+
+@pytest.mark.asyncio
+async def test_run_days_matches_serial_runs(tmp_path, monkeypatch):
+    """run_days の並列実行結果が、日ごとに新しい Runner で順に回した結果と一致すること"""
+    monkeypatch.chdir(tmp_path)  # OMS が書く logs/*.jsonl をリポジトリに残さない
+    from pathlib import Path
+
+    from bot.backtest.replay import run_days
+
+    here = Path(__file__).parent
+    feed = CsvPriceFeed(path=str(here / "prices_feed.csv"))
+    sched = FundingSchedule(path=str(here / "funding_feed.csv"))
+    strategy_cfg = StrategyFundingConfig(
+        symbols=["BTCUSDT", "ETHUSDT"], min_expected_apr=0.0, pre_event_open_minutes=600, hold_across_events=False
+    )
+    risk_cfg = RiskConfig(
+        max_total_notional=1_000_000.0,
+        max_symbol_notional=1_000_000.0,
+        max_net_delta=0.01,
+        max_slippage_bps=50.0,
+        loss_cut_daily_jpy=1_000_000.0,
+    )
+    dates = ["2025-11-29", "2025-11-28"]
+
+    serial = []
+    for d in dates:
+        runner = BacktestRunner(
+            price_feed=feed,
+            funding_schedule=FundingSchedule(path=str(here / "funding_feed.csv")),
+            strategy_cfg=strategy_cfg,
+            risk_cfg=risk_cfg,
+            db_url="sqlite+aiosqlite:///:memory:",
+        )
+        serial.append(await runner.run_one_day(date_utc=d))
+        await runner._repo.dispose()
+
+    parallel = await run_days(
+        dates=dates,
+        price_feed=feed,
+        funding_schedule=sched,
+        strategy_cfg=strategy_cfg,
+        risk_cfg=risk_cfg,
+        max_concurrency=2,
+    )
+    assert [r.date for r in parallel] == dates
+    assert sum(r.funding_events for r in parallel) > 0
+    assert parallel == serial
+
+
+@pytest.mark.asyncio
+async def test_run_days_rejects_shared_file_db(tmp_path):
+    """複数日で {date} を含まないファイルDBは、日が1つのDBに混ざるので ValueError になること"""
+    from bot.backtest.replay import _check_multi_day_db_url, run_days
+
+    shared = f"sqlite+aiosqlite:///{tmp_path / 'bt.db'}"
+    with pytest.raises(ValueError, match="date"):
+        await run_days(
+            dates=["2025-11-28", "2025-11-29"],
+            price_feed=None,  # type: ignore[arg-type]  # 検証で先に落ちるので使われない
+            funding_schedule=None,
+            strategy_cfg=StrategyFundingConfig(symbols=["BTCUSDT"]),
+            risk_cfg=None,  # type: ignore[arg-type]
+            db_url=shared,
+        )
+    assert not (tmp_path / "bt.db").exists()
+    _check_multi_day_db_url(shared, 1)  # 1日だけなら可
+    _check_multi_day_db_url(f"sqlite+aiosqlite:///{tmp_path / 'bt.{date}.db'}", 2)
+    _check_multi_day_db_url("sqlite+aiosqlite:///:memory:", 2)
+    _check_multi_day_db_url("sqlite+aiosqlite://", 2)
+
+
+def test_funding_schedule_empty():
+    """FundingSchedule.empty() はファイルなしでイベント0件のスケジュールになること"""
+    from datetime import datetime, timezone
+
+    sched = FundingSchedule.empty()
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert sched.due_events(now=now) == []
+    assert sched.next_rate_and_time(symbol="BTCUSDT", now=now) == (None, None)
+
+
+def test_replay_data_source_funding_info_refreshes_after_funding_time(tmp_path):
+    """次の Funding 時刻をまたぐまでは同じ FundingInfo を返し、またいだら次のイベントに切り替わること"""
+    from datetime import datetime, timezone
+
+    from bot.backtest.replay import ReplayDataSource
+
+    funding_csv = tmp_path / "funding.csv"
+    funding_csv.write_text(
+        "ts,symbol,rate\n2024-01-01T08:00:00Z,BTCUSDT,0.0001\n2024-01-01T16:00:00Z,BTCUSDT,0.0002\n",
+        encoding="utf-8",
+    )
+    src = ReplayDataSource(schedule=FundingSchedule(path=str(funding_csv)))
+
+    src.set_now(datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc))
+    first = src._get_funding_info_sync("BTCUSDT")
+    src.set_now(datetime(2024, 1, 1, 7, 59, tzinfo=timezone.utc))
+    assert src._get_funding_info_sync("BTCUSDT") is first
+    assert first.predicted_rate == pytest.approx(0.0001)
+
+    src.set_now(datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc))
+    second = src._get_funding_info_sync("BTCUSDT")
+    assert second.predicted_rate == pytest.approx(0.0002)
+    assert second.next_funding_time == datetime(2024, 1, 1, 16, 0, tzinfo=timezone.utc)
+
+
+def test_price_feed_parquet_cache(tmp_path):
+    """cache=True で整形済み Parquet が作られ、2回目はそれを読んでも同じティックになること"""
+    pytest.importorskip("pyarrow")
+
+    prices_csv = tmp_path / "prices.csv"
+    prices_csv.write_text(
+        "ts,symbol,bid,ask,last\n"
+        "2024-01-01T00:00:05Z,ETHUSDT,2.0,2.1,2.05\n"
+        "2024-01-01T00:00:00Z,BTCUSDT,100.0,100.1,100.05\n",
+        encoding="utf-8",
+    )
+    plain = list(CsvPriceFeed(path=str(prices_csv)).iter_ticks(date_utc="2024-01-01"))
+
+    first = list(CsvPriceFeed(path=str(prices_csv), cache=True).iter_ticks(date_utc="2024-01-01"))
+    assert (tmp_path / "prices.csv.cache.parquet").exists()
+    second = list(CsvPriceFeed(path=str(prices_csv), cache=True).iter_ticks(date_utc="2024-01-01"))
+    assert first == plain
+    assert second == plain
+
+
+def test_price_feed_parquet_dataset_reads_day(tmp_path):
+    """ts がタイムスタンプ型の Parquet は日ごとに読み、CSV と同じティックを返すこと"""
+    pytest.importorskip("pyarrow")
+
+    rows = [
+        ["2024-01-01T00:00:10Z", "BTCUSDT", 101.0, 101.1, 101.05],
+        ["2024-01-01T00:00:00Z", "BTCUSDT", 100.0, 100.1, 100.05],
+        ["2024-01-01T00:00:05Z", "ETHUSDT", 2.0, 2.1, None],
+        ["2024-01-02T00:00:00Z", "BTCUSDT", 102.0, 102.1, 102.05],
+    ]
+    df = pd.DataFrame(rows, columns=["ts", "symbol", "bid", "ask", "last"])
+    prices_csv = tmp_path / "prices.csv"
+    df.to_csv(prices_csv, index=False)
+    prices_pq = tmp_path / "prices.parquet"
+    df.assign(ts=pd.to_datetime(df["ts"], utc=True)).to_parquet(prices_pq)
+
+    csv_feed = CsvPriceFeed(path=str(prices_csv))
+    pq_feed = CsvPriceFeed(path=str(prices_pq))
+    assert pq_feed._dataset is not None
+
+    for d in ("2024-01-01", "2024-01-02", "2024-01-03"):
+        ticks = list(pq_feed.iter_ticks(date_utc=d))
+        assert repr(ticks) == repr(list(csv_feed.iter_ticks(date_utc=d)))  # NaN を含むので repr で比べる
+    assert [t.symbol for t in pq_feed.iter_ticks(date_utc="2024-01-01")] == ["BTCUSDT", "ETHUSDT", "BTCUSDT"]
+
+
+def test_price_feed_iter_ticks_chunked(tmp_path, monkeypatch):
+    """区切り行数を跨いでも、1日分のティックが欠けず同じ順で返ること"""
+    import bot.backtest.replay as replay
+
+    prices_csv = tmp_path / "prices.csv"
+    prices_csv.write_text(
+        "ts,symbol,bid,ask,last\n"
+        "2024-01-01T00:00:10Z,BTCUSDT,101.0,101.1,101.05\n"
+        "2024-01-01T00:00:00Z,BTCUSDT,100.0,100.1,100.05\n"
+        "2024-01-01T00:00:05Z,ETHUSDT,2.0,2.1,2.05\n"
+        "2024-01-02T00:00:00Z,BTCUSDT,102.0,102.1,102.05\n",
+        encoding="utf-8",
+    )
+    feed = CsvPriceFeed(path=str(prices_csv))
+    whole = list(feed.iter_ticks(date_utc="2024-01-01"))
+    monkeypatch.setattr(replay, "_ITER_CHUNK", 2)
+
+    assert list(feed.iter_ticks(date_utc="2024-01-01")) == whole
+    assert [t.last for t in whole] == [100.05, 2.05, 101.05]
+
+
+def test_calc_trade_metrics_roundtrip():
+    """買い→売りの往復で実現損益・エントリー/イグジット数・保有時間が求まること"""
+    from datetime import datetime, timezone
+    from types import SimpleNamespace
+
+    from bot.backtest.replay import _calc_trade_metrics
+    from bot.cost.model import CostModel
+
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    t1 = datetime(2024, 1, 1, 0, 10, tzinfo=timezone.utc)
+    trades = [
+        SimpleNamespace(ts=t1, symbol="BTCUSDT", side="sell", qty=2.0, price=110.0, fee=0.5),
+        SimpleNamespace(ts=t0, symbol="BTCUSDT", side="buy", qty=2.0, price=100.0, fee=0.0),
+    ]
+    cm = CostModel(perp_taker_fee_bps=10.0, slippage_bps=2.0, extra_spread_bps=1.0)
+    realized, fees, slippage, entries, exits, avg_hold = _calc_trade_metrics(trades, cm)
+
+    assert realized == pytest.approx(20.0)
+    assert fees == pytest.approx(0.5 + 200.0 * 10.0 / 10_000.0)  # 0 の手数料はテイカー手数料で補う
+    assert slippage == pytest.approx((200.0 + 220.0) * 3.0 / 10_000.0)
+    assert (entries, exits) == (1, 1)
+    assert avg_hold == pytest.approx(600.0)
+
+
+def test_bt_env_empty_values_fall_back_to_config():
+    """env が空文字の項目は 0 ではなく設定値/既定値になり、設定された項目だけが上書きされること"""
+    from bot.backtest.replay import _BtEnv
+
+    cfg = StrategyFundingConfig(symbols=["BTCUSDT"], taker_fee_bps_roundtrip=6.0, estimated_slippage_bps=3.0)
+    env = _BtEnv.from_environ(
+        cfg,
+        {
+            "STRATEGY__TAKER_FEE_BPS_ROUNDTRIP": "",
+            "STRATEGY__ESTIMATED_SLIPPAGE_BPS": "0",
+            "BACKTEST__FUNDING_FLIP_CONSECUTIVE": " 3 ",
+        },
+    )
+
+    assert env.taker_fee_bps_roundtrip == 6.0
+    assert env.estimated_slippage_bps == 0.0
+    assert env.extra_spread_bps == 1.0
+    assert env.funding_flip_min_abs == 1.0
+    assert env.funding_flip_consecutive == 3
+
+
+def test_replay_import_does_not_load_numba():
+    """replay を import しただけでは numba を読まないこと（JIT は _walk_positions の初回呼び出しまで遅らせる）"""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = "import sys, bot.backtest.replay; print('numba' in sys.modules)"
+    root = Path(__file__).resolve().parents[2]
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from bot.backtest.replay import BacktestRunner, CsvPriceFeed, FundingSchedule
+from bot.backtest.sweep import run_sweep
+from bot.config.models import RiskConfig, StrategyFundingConfig
+
+
+@pytest.mark.asyncio
+async def test_run_sweep_matches_single_runs(tmp_path):
+    """プロセスプールでのスイープ結果が、同じパラメータで1日ずつ回した結果と一致すること"""
+
+    here = Path(__file__).parent
+    prices = tmp_path / "prices_feed.csv"
+    funding = tmp_path / "funding_feed.csv"
+    shutil.copy(here / "prices_feed.csv", prices)
+    shutil.copy(here / "funding_feed.csv", funding)
+
+    strategy_cfg = StrategyFundingConfig(
+        symbols=["BTCUSDT", "ETHUSDT"], min_expected_apr=0.0, pre_event_open_minutes=600, hold_across_events=False
+    )
+    risk_cfg = RiskConfig(
+        max_total_notional=1_000_000.0,
+        max_symbol_notional=1_000_000.0,
+        max_net_delta=0.01,
+        max_slippage_bps=50.0,
+        loss_cut_daily_jpy=1_000_000.0,
+    )
+    grid = [{"min_expected_apr": 0.0}, {"min_expected_apr": 100.0}]
+
+    swept = run_sweep(
+        dates=["2025-11-29"],
+        param_grid=grid,
+        prices_path=str(prices),
+        funding_path=str(funding),
+        strategy_cfg=strategy_cfg,
+        risk_cfg=risk_cfg,
+        workers=2,
+    )
+
+    assert [s.params for s in swept] == grid
+    assert (tmp_path / "prices_feed.csv.cache.parquet").exists()
+    for s in swept:
+        runner = BacktestRunner(
+            price_feed=CsvPriceFeed(path=str(prices)),
+            funding_schedule=FundingSchedule(path=str(funding)),
+            strategy_cfg=strategy_cfg.model_copy(update=s.params),
+            risk_cfg=risk_cfg,
+            db_url="sqlite+aiosqlite:///:memory:",
+        )
+        assert s.result == await runner.run_one_day(date_utc="2025-11-29")
+        await runner._repo.dispose()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 import pytest
@@ -14,3 +15,190 @@ def test_setup_logging_creates_files(tmp_path: Path) -> None:
     setup_logging(level="INFO", log_dir=str(tmp_path / "logs"))
     assert (tmp_path / "logs" / "app.log").exists()
     assert (tmp_path / "logs" / "app.jsonl").exists()
+
+
+def test_json_sink_writes_flat_records(tmp_path: Path) -> None:
+    """JSONL は1行1レコードで time/ts_ns/level/message/extra をトップレベルに持つこと"""
+    import json
+    from datetime import datetime, timedelta, timezone
+
+    from loguru import logger
+
+    from bot.core.logging import setup_logging
+
+    setup_logging(level="INFO", log_dir=str(tmp_path / "logs"))
+    later_extras: list[dict] = []
+    logger.add(lambda m: later_extras.append(dict(m.record["extra"])), level="INFO")  # JSONL より後のシンク
+    logger.bind(order_id="X1").info("order.placed {}", "{braces}")
+    logger.remove()  # BufferedSink の残りを書き出して閉じる
+
+    rows = [json.loads(line) for line in (tmp_path / "logs" / "app.jsonl").read_text(encoding="utf-8").splitlines()]
+    row = rows[-1]
+    assert row["level"] == "INFO"
+    assert row["message"] == "order.placed {braces}"
+    assert row["extra"]["order_id"] == "X1"
+    assert "_json" not in row["extra"]
+    assert later_extras and all("_json" not in e for e in later_extras)  # 共有の extra を書き換えない
+    assert isinstance(row["ts_ns"], int) and row["ts_ns"] > 1_600_000_000 * 10**9  # エポック ns
+    assert datetime.fromisoformat(row["time"]).tzinfo is not None  # 従来の ISO の time も残す
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert row["ts_ns"] == (datetime.fromisoformat(row["time"]) - epoch) // timedelta(microseconds=1) * 1000  # 同じ時刻
+
+
+def test_json_sink_keeps_exception_traceback(tmp_path: Path) -> None:
+    """例外つきのレコードは exception に type/value と整形済みのトレースバックを持つこと"""
+    import json
+
+    from loguru import logger
+
+    from bot.core.logging import setup_logging
+
+    setup_logging(level="INFO", log_dir=str(tmp_path / "logs"))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("order.failed")
+    logger.remove()
+
+    row = json.loads((tmp_path / "logs" / "app.jsonl").read_text(encoding="utf-8").splitlines()[-1])
+    assert row["exception"]["type"] == "ValueError"
+    assert row["exception"]["value"] == "boom"
+    assert row["exception"]["traceback"].startswith("Traceback (most recent call last):")
+    assert 'raise ValueError("boom")' in row["exception"]["traceback"]
+
+
+def test_buffered_sink_batches_rotates_daily_and_drops_when_full(tmp_path: Path) -> None:
+    """BufferedSink は日付が変わるとファイルを退避し、上限を超えた行は捨てて数えること"""
+    from datetime import datetime, timedelta
+
+    from bot.core.logging import BufferedSink
+
+    class _Msg(str):
+        record: dict
+
+    def msg(text: str, when: datetime) -> _Msg:
+        m = _Msg(text + "\n")
+        m.record = {"time": when}
+        return m
+
+    today = datetime.now()
+    sink = BufferedSink(tmp_path / "app.log", retention=1, max_pending=3, interval_sec=60)
+    sink.write(msg("a", today))
+    sink.write(msg("b", today + timedelta(days=1)))
+    sink.write(msg("c", today + timedelta(days=2)))
+    sink.write(msg("dropped", today + timedelta(days=2)))
+    sink.stop()
+
+    assert sink.dropped == 1
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == "c\n"
+    rotated = sorted(p.name for p in tmp_path.glob("app.*.log"))
+    day1 = (today + timedelta(days=1)).date().isoformat()
+    assert rotated == [f"app.{day1}.log"]  # retention=1 なので一番古い日の分は消える
+
+
+def test_buffered_sink_reports_dropped_lines_on_stop(tmp_path: Path, capsys) -> None:
+    """キューあふれで捨てた行数を、閉じるときに stderr へ書くこと"""
+    from bot.core.logging import BufferedSink
+
+    sink = BufferedSink(tmp_path / "app.log", max_pending=1, interval_sec=60)
+    sink.write("a\n")
+    sink.write("b\n")
+    sink.stop()
+
+    assert "dropped 1 log lines" in capsys.readouterr().err
+
+
+def test_buffered_sink_survives_write_errors_and_restarts_dead_thread(tmp_path: Path, capsys) -> None:
+    """書き出しに失敗した行は捨てて数え、その後の行は書けること。止まった背景スレッドは write() で起こし直すこと"""
+    from bot.core.logging import BufferedSink
+
+    path = tmp_path / "app.log"
+    sink = BufferedSink(path, batch_size=2, interval_sec=60)
+    real_write_all = sink._write_all
+    calls = {"n": 0}
+
+    def flaky(data: bytes) -> None:
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise OSError("disk full")
+        real_write_all(data)
+
+    sink._write_all = flaky  # type: ignore[method-assign]
+    sink.write("lost\n")
+    sink._flush_pending()  # 例外は外へ出さない
+    assert sink.dropped == 1
+    assert "failed to write 1 log lines" in capsys.readouterr().err
+
+    sink._closed.set()  # 背景スレッドを止めて「死んだスレッド」を作る
+    sink._wake.set()
+    sink._thread.join()
+    sink._closed.clear()
+    dead = sink._thread
+    sink.write("a\n")
+    sink.write("b\n")  # batch_size に達した write がスレッドを起こし直す
+    assert sink._thread is not dead and sink._thread.is_alive()
+    sink.stop()
+    assert path.read_text(encoding="utf-8") == "a\nb\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork が無い環境")
+def test_buffered_sink_restarts_flusher_after_fork(tmp_path: Path) -> None:
+    """fork した子プロセスでも背景スレッドが動き、stop() を呼ばなくても行が書き出されること"""
+    import time
+
+    from bot.core.logging import BufferedSink
+
+    path = tmp_path / "app.log"
+    sink = BufferedSink(path, interval_sec=0.01)
+    pid = os.fork()
+    if pid == 0:  # 子プロセス
+        code = 1
+        try:
+            sink.write("from-child\n")
+            for _ in range(200):
+                time.sleep(0.01)
+                if "from-child" in path.read_text(encoding="utf-8"):
+                    code = 0
+                    break
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    sink.stop()
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_level_filter_debug_modules_prefix_match() -> None:
+    """LOG_DEBUG_MODULES のどれかで始まるモジュールの DEBUG だけを通すこと（接頭辞が重なっても同じ）"""
+    from types import SimpleNamespace
+
+    from loguru import logger
+
+    from bot.core.logging import _level_filter_factory
+
+    f = _level_filter_factory(logger.level("INFO").no, ("bot.oms", "bot.oms.engine", "bot.data"))
+
+    def rec(origin: str | None) -> dict:
+        return {"level": SimpleNamespace(no=logger.level("DEBUG").no), "extra": {"origin": origin}, "name": None}
+
+    assert f(rec("bot.oms.engine"))
+    assert f(rec("bot.oms_extra"))  # 従来どおり単純な文字列の接頭辞一致
+    assert f(rec("bot.data.feed"))
+    assert not f(rec("bot.core.logging"))
+    assert not f(rec("bot.d"))
+    assert not f(rec(None))
+
+
+def test_info_level_drops_plain_debug_but_keeps_promoted_order_events(tmp_path: Path) -> None:
+    """INFO 設定ではただの DEBUG は書かれず、注文系の DEBUG は INFO に昇格して書かれること"""
+    from loguru import logger
+
+    from bot.core.logging import setup_logging
+
+    setup_logging(level="INFO", log_dir=str(tmp_path / "logs"), debug_modules=())
+    logger.debug("noise")
+    logger.debug("order.submit id=1")
+    logger.remove()
+
+    text = (tmp_path / "logs" / "app.log").read_text(encoding="utf-8")
+    assert "noise" not in text
+    assert "INFO     | " in text and "order.submit id=1" in text
@@ -40,3 +40,33 @@ async def test_retry_async_succeeds_after_retries() -> None:
 
     assert await flakey_async() == "ok"
     assert calls["n"] == 2
+
+
+def test_scheduled_backoff_matches_exponential_and_jitters_within_envelope() -> None:
+    """待機秒の表は wait_exponential と同じ値で、jitter は毎回 0〜上限の範囲で引き直されること"""
+    from types import SimpleNamespace
+
+    from tenacity import wait_exponential
+
+    from bot.core.retry import _ScheduledBackoff
+
+    plain = _ScheduledBackoff(0.5, 8.0, jitter=False, tries=999999)
+    ref = wait_exponential(multiplier=0.5, max=8.0)
+    for n in (1, 2, 3, 5, 64, 65, 200):
+        rs = SimpleNamespace(attempt_number=n)
+        assert plain(rs) == ref(rs)
+
+    jittered = _ScheduledBackoff(0.5, 8.0, jitter=True, tries=5)
+    waits = [jittered(SimpleNamespace(attempt_number=3)) for _ in range(50)]
+    assert all(0 <= w <= 2.0 for w in waits)
+    assert len(set(waits)) > 1
+
+
+def test_retryable_reuses_decorator_for_same_arguments() -> None:
+    """同じ引数の @retryable(...) は同じデコレータを返すこと（retry_on は list でも tuple と同じ扱い）"""
+    from bot.core.errors import ExchangeError
+    from bot.core.retry import retryable
+
+    assert retryable() is retryable()
+    assert retryable(tries=3, retry_on=[ExchangeError]) is retryable(tries=3, retry_on=(ExchangeError,))
+    assert retryable(tries=3) is not retryable(tries=4)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sys
+
+import pytest
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="add_signal_handler は POSIX のみ")
+def test_sigterm_cancels_main_and_runs_finally() -> None:
+    """SIGTERM でトップレベルタスクがキャンセルされ、finally の後片付けが実行されること"""
+    from bot.core.signals import run_until_signal
+
+    events: list[str] = []
+
+    async def _main() -> None:
+        try:
+            asyncio.get_running_loop().call_soon(os.kill, os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(30)
+            events.append("not_cancelled")
+        finally:
+            events.append("cleanup")
+
+    run_until_signal(_main())
+
+    assert events == ["cleanup"]
+    # ハンドラは戻されている（既定の SIGTERM 動作に戻る）
+    assert signal.getsignal(signal.SIGTERM) in (signal.SIG_DFL, None)
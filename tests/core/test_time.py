@@ -100,3 +100,16 @@ def test_parse_iso_z() -> None:
     dt = parse_exchange_ts(s)
     assert dt.tzinfo is not None
     assert dt.tzinfo == timezone.utc
+
+
+def test_parse_ts_batch_matches_scalar() -> None:
+    """一括変換が parse_exchange_ts を1件ずつ呼んだ結果と一致すること（秒/ミリ秒/文字列混在）"""
+    from bot.core.time import parse_exchange_ts, parse_exchange_ts_batch
+
+    ints = [1_700_000_000, 1_700_000_000_123, 1_000_000_000_001, 0]
+    mixed = ["2024-01-02T03:04:05Z", 1_700_000_000_123, 1.5e9]
+    for values in (ints, mixed):
+        out = parse_exchange_ts_batch(values)
+        assert str(out.dtype) == "datetime64[us]"
+        got = [d.replace(tzinfo=timezone.utc) for d in out.astype(object)]
+        assert got == [parse_exchange_ts(v) for v in values]
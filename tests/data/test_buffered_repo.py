@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("loguru")
+
+
+def _trade(i: int) -> dict:
+    return {"symbol": "BTCUSDT", "side": "buy", "qty": 1.0, "price": 10.0, "fee": 0.0, "exchange_order_id": f"EX-{i}"}
+
+
+@pytest.mark.asyncio
+async def test_buffered_writes_are_batched_and_visible_to_reads(tmp_path: Path):
+    """add_* は溜めるだけで、読み出し・周期・close のどれかで一括保存されること"""
+    from bot.data.buffered_repo import BufferedRepo
+    from bot.data.repo import Repo
+
+    inner = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    repo = BufferedRepo(inner, max_batch=100, flush_interval_sec=10.0)
+    await repo.create_all()
+
+    assert await repo.add_trade(**_trade(1)) is None
+    await repo.add_order_log(
+        symbol="BTCUSDT", side="buy", type="limit", qty=1.0, price=10.0, status="new", exchange_order_id="EX-1"
+    )
+    assert await inner.list_trades() == []  # まだ DB には入っていない
+    assert [t.exchange_order_id for t in await repo.list_trades()] == ["EX-1"]  # 読み出し前に流れる
+    assert len(await inner.list_order_logs()) == 1
+
+    await repo.add_funding_event(symbol="BTCUSDT", rate=0.0, notional=0.0, realized_pnl=1.0)
+    await repo.dispose()  # close で残りも保存される
+    assert len(await inner.list_funding_events()) == 1
+    await inner.dispose()
+
+
+@pytest.mark.asyncio
+async def test_buffered_flush_by_batch_size_and_retry_on_failure(tmp_path: Path, monkeypatch):
+    """max_batch に達すると裏のタスクがすぐ流し、保存に失敗した行は戻されて次で保存されること"""
+    from bot.data.buffered_repo import BufferedRepo
+    from bot.data.repo import Repo
+
+    inner = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await inner.create_all()
+    repo = BufferedRepo(inner, max_batch=3, flush_interval_sec=10.0)
+
+    for i in range(3):
+        await repo.add_trade(**_trade(i))
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if len(await inner.list_trades()) == 3:
+            break
+    assert len(await inner.list_trades()) == 3
+
+    calls = {"n": 0}
+    real = inner.add_trades
+
+    async def flaky(rows):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("db busy")
+        return await real(rows)
+
+    monkeypatch.setattr(inner, "add_trades", flaky)
+    await repo.add_trade(**_trade(3))
+    await repo.flush()  # 一括保存が失敗しても、1行ずつ保存し直して入る
+    assert calls["n"] == 2
+    assert [t.exchange_order_id for t in await inner.list_trades(limit=1)] == ["EX-3"]
+    await repo.close()
+    await inner.dispose()
+
+
+@pytest.mark.asyncio
+async def test_buffered_bad_row_is_quarantined_without_blocking_others(tmp_path: Path):
+    """保存できない1行は max_retries 回で捨てられ、同じ種類の他の行やほかの種類の行は保存されること"""
+    from bot.data.buffered_repo import BufferedRepo
+    from bot.data.repo import Repo
+
+    inner = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await inner.create_all()
+    repo = BufferedRepo(inner, max_batch=100, flush_interval_sec=10.0, max_retries=2)
+
+    await repo.add_trade(**{**_trade(0), "qty": None})  # NOT NULL 違反で入らない行
+    for i in range(1, 6):
+        await repo.add_trade(**_trade(i))
+    await repo.add_funding_event(symbol="BTCUSDT", rate=0.0, notional=0.0, realized_pnl=1.0)
+
+    await repo.flush()
+    assert len(await inner.list_trades()) == 5
+    assert len(await inner.list_funding_events()) == 1
+    assert (len(repo._trades), repo.quarantined) == (1, 0)  # 1回目の失敗ではまだ戻しておく
+    await repo.flush()
+    assert (len(repo._trades), repo.quarantined) == (0, 1)
+    await repo.close()
+    await inner.dispose()
+
+
+@pytest.mark.asyncio
+async def test_buffered_caps_queue_and_dispose_always_closes_inner(tmp_path: Path, monkeypatch):
+    """溜める行数は max_pending で頭打ちになり、close が失敗しても包んだ Repo は閉じられること"""
+    from bot.data.buffered_repo import BufferedRepo
+    from bot.data.repo import Repo
+
+    inner = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await inner.create_all()
+    repo = BufferedRepo(inner, max_batch=100, flush_interval_sec=10.0, max_pending=2)
+    for i in range(4):
+        await repo.add_trade(**_trade(i))
+    assert (len(repo._trades), repo.dropped) == (2, 2)
+
+    disposed = {"n": 0}
+    real_dispose = inner.dispose
+
+    async def boom() -> None:
+        raise RuntimeError("close failed")
+
+    async def counting_dispose() -> None:
+        disposed["n"] += 1
+        await real_dispose()
+
+    monkeypatch.setattr(repo, "close", boom)
+    monkeypatch.setattr(inner, "dispose", counting_dispose)
+    with pytest.raises(RuntimeError):
+        await repo.dispose()
+    assert disposed["n"] == 1
+    monkeypatch.undo()
+    await repo.close()  # 裏のタスクを止める（閉じた Repo は次のアクセスで開き直す）
+    await inner.dispose()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 
 import pytest
@@ -39,6 +40,7 @@ async def test_create_tables_and_trade_roundtrip(tmp_path: Path):
     got = rows[0]
     assert got.symbol == "BTCUSDT"
     assert got.side in ("buy", "sell")
+    await repo.dispose()
 
 
 @pytest.mark.asyncio
@@ -82,3 +84,245 @@ async def test_order_funding_daily_roundtrip(tmp_path: Path):
     assert len(oo) >= 1
     assert len(ff) >= 1
     assert len(dd) >= 1
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_funding_events_bulk(tmp_path: Path):
+    """Funding実績を複数件まとめて保存でき、空リストは何もしないこと"""
+    from bot.core.time import utc_now
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'db' / 'trading.db'}")
+    await repo.create_all()
+
+    assert await repo.add_funding_events([]) == 0
+    n = await repo.add_funding_events(
+        [
+            {"ts": utc_now(), "symbol": "BTCUSDT", "rate": 0.0001, "notional": 1000.0, "realized_pnl": 0.1},
+            {"symbol": "ETHUSDT", "rate": -0.0002, "notional": 500.0, "realized_pnl": -0.1},
+        ]
+    )
+    assert n == 2
+
+    ff = await repo.list_funding_events()
+    assert sorted(f.symbol for f in ff) == ["BTCUSDT", "ETHUSDT"]
+    assert all(f.ts is not None for f in ff)
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_day_range_queries(tmp_path: Path):
+    """since/until で日付範囲のトレード取得と Funding 集計が SQL 側で絞り込まれること"""
+    from datetime import datetime, timezone
+
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'db' / 'trading.db'}")
+    await repo.create_all()
+
+    day = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    nxt = datetime(2025, 1, 3, tzinfo=timezone.utc)
+    await repo.add_funding_events(
+        [
+            {
+                "ts": datetime(2025, 1, 1, 23, 59, tzinfo=timezone.utc),
+                "symbol": "X",
+                "rate": 0.0,
+                "notional": 0.0,
+                "realized_pnl": 9.0,
+            },
+            {"ts": day, "symbol": "X", "rate": 0.0, "notional": 0.0, "realized_pnl": 1.5},
+            {
+                "ts": datetime(2025, 1, 2, 16, tzinfo=timezone.utc),
+                "symbol": "X",
+                "rate": 0.0,
+                "notional": 0.0,
+                "realized_pnl": -0.5,
+            },
+            {"ts": nxt, "symbol": "X", "rate": 0.0, "notional": 0.0, "realized_pnl": 7.0},
+        ]
+    )
+    for ts in (day, nxt):
+        await repo.add_trade(ts=ts, symbol="X", side="buy", qty=1.0, price=1.0, fee=0.0, exchange_order_id="EX")
+
+    assert await repo.aggregate_funding(since=day, until=nxt) == (2, 1.0)
+    assert await repo.aggregate_funding(since=nxt.replace(year=2030), until=nxt.replace(year=2031)) == (0, 0.0)
+    trades = await repo.list_trades(since=day, until=nxt)
+    assert [t.ts.day for t in trades] == [2]
+    assert await repo.aggregate_trades(since=day, until=nxt) == (1, 0.0, 1.0)
+    assert len(await repo.list_funding_events(since=day, until=nxt)) == 2
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_trades_and_order_logs_bulk(tmp_path: Path):
+    """トレード/注文イベントを複数件まとめて保存でき、空リストは何もしないこと"""
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'db' / 'trading.db'}")
+    await repo.create_all()
+
+    assert await repo.add_trades([]) == 0
+    assert await repo.add_order_logs([]) == 0
+    trade = {"symbol": "BTCUSDT", "side": "buy", "qty": 0.01, "price": 100.0, "fee": 0.01, "exchange_order_id": "X1"}
+    assert await repo.add_trades([trade, {**trade, "symbol": "ETHUSDT", "client_id": "c2"}]) == 2
+    order = {
+        "symbol": "BTCUSDT",
+        "side": "sell",
+        "type": "limit",
+        "qty": 0.01,
+        "price": None,
+        "status": "new",
+        "exchange_order_id": "X2",
+    }
+    assert await repo.add_order_logs([order]) == 1
+
+    trades = await repo.list_trades()
+    assert sorted((t.symbol, t.client_id) for t in trades) == [("BTCUSDT", None), ("ETHUSDT", "c2")]
+    assert all(t.ts is not None for t in trades)
+    (log,) = await repo.list_order_logs()
+    assert (log.status, log.price, log.exchange_order_id) == ("new", None, "X2")
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied_on_connect(tmp_path: Path):
+    """ファイルDBの接続に WAL / synchronous=NORMAL などの PRAGMA が入っていること"""
+    from sqlalchemy import text
+
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await repo.create_all()
+    try:
+        async with repo._engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+            assert (await conn.execute(text("PRAGMA cache_size"))).scalar() == -64000
+    finally:
+        await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_shared_connection_reused_across_writes(tmp_path: Path):
+    """連続した書き込み・同時の書き込みが1本の共有接続で通り、dispose 後も開き直して使えること"""
+    import asyncio
+
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await repo.create_all()
+    conn = repo._conn
+    assert conn is not None
+
+    kw = {"symbol": "BTCUSDT", "side": "buy", "qty": 1.0, "price": 10.0, "fee": 0.0}
+    t1 = await repo.add_trade(exchange_order_id="EX-1", **kw)
+    t2 = await repo.add_trade(exchange_order_id="EX-2", **kw)
+    assert (t1.id, t2.id) == (1, 2)
+    assert repo._conn is conn
+
+    await asyncio.gather(*(repo.add_trade(exchange_order_id=f"EX-{i}", **kw) for i in range(3, 6)))
+    assert len(await repo.list_trades()) == 5
+
+    await repo.dispose()
+    assert repo._conn is None
+    assert len(await repo.list_trades()) == 5
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_iter_streams_same_rows_as_list(tmp_path: Path, monkeypatch):
+    """iter_* が list_* と同じ行を同じ順で返すこと（取り出し単位より件数が多くても）"""
+    import bot.data.repo as repo_mod
+    from bot.data.repo import Repo
+
+    monkeypatch.setattr(repo_mod, "_ITER_BATCH", 2)
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await repo.create_all()
+    kw = {"side": "buy", "qty": 1.0, "price": 10.0, "fee": 0.0, "exchange_order_id": "EX"}
+    await repo.add_trades([{"symbol": "BTCUSDT" if i % 2 else "ETHUSDT", **kw} for i in range(5)])
+    await repo.add_order_logs([{"symbol": "BTCUSDT", "type": "limit", "status": "new", **kw}] * 3)
+    await repo.add_funding_events([{"symbol": "BTCUSDT", "rate": 0.0, "notional": 0.0, "realized_pnl": 1.0}] * 3)
+
+    assert [t.id async for t in repo.iter_trades()] == [t.id for t in await repo.list_trades()]
+    assert [t.id async for t in repo.iter_trades(symbol="BTCUSDT")] == [4, 2]
+    assert [o.id async for o in repo.iter_order_logs()] == [3, 2, 1]
+    assert [f.id async for f in repo.iter_funding_events(symbol="ETHUSDT")] == []
+    assert len(await repo.list_funding_events()) == 3  # 取り出し後も接続が返っていること
+
+    async def read_while_iterating() -> list[int]:
+        seen = []
+        async for t in repo.iter_trades():
+            seen.append(t.id + len(await repo.list_order_logs()))  # ループの中で同じ Repo を使ってもロックで詰まらない
+        return seen
+
+    assert await asyncio.wait_for(read_while_iterating(), timeout=5) == [8, 7, 6, 5, 4]
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_list_keyset_pagination(tmp_path: Path):
+    """limit / before_id で id 降順のページを順にたどれること（未指定なら全件）"""
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await repo.create_all()
+    kw = {"symbol": "BTCUSDT", "side": "buy", "qty": 1.0, "price": 10.0, "fee": 0.0, "exchange_order_id": "EX"}
+    await repo.add_trades([kw] * 5)
+    for d in ("2024-01-01", "2024-01-02", "2024-01-03"):
+        await repo.add_daily_pnl(date=d, gross=1.0, fees=0.0, net=1.0)
+
+    pages, before = [], None
+    while page := await repo.list_trades(limit=2, before_id=before):
+        pages.append([t.id for t in page])
+        before = page[-1].id
+    assert pages == [[5, 4], [3, 2], [1]]
+    assert len(await repo.list_trades()) == 5
+    assert [t.id for t in await repo.list_trades(symbol="BTCUSDT", before_id=3)] == [2, 1]
+    assert [d.date for d in await repo.list_daily_pnl(limit=1, before_id=3)] == ["2024-01-02"]
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_create_all_adds_indexes_to_existing_tables(tmp_path: Path):
+    """索引の無い既存テーブルにも create_all で索引が足され、symbol 絞り込みが索引を使うこと"""
+    from sqlalchemy import text
+
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await repo.create_all()
+    async with repo._session() as s:
+        await s.execute(text("DROP INDEX ix_trade_log_symbol_id"))
+        await s.commit()
+
+    await repo.create_all()
+    async with repo._session() as s:
+        names = set((await s.execute(text("SELECT name FROM sqlite_master WHERE type='index'"))).scalars())
+        plan = (
+            await s.execute(text("EXPLAIN QUERY PLAN SELECT * FROM trade_log WHERE symbol='X' ORDER BY id DESC"))
+        ).all()
+    assert {"ix_trade_log_symbol_id", "ix_order_log_symbol_id", "ix_funding_event_symbol_id"} <= names
+    assert any("ix_trade_log_symbol_id" in str(row) for row in plan)
+    await repo.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_single_row_skips_refresh_select(tmp_path: Path):
+    """1件保存は INSERT だけで済み（refresh の SELECT を出さない）、id は lastrowid から埋まること"""
+    from sqlalchemy import event
+
+    from bot.data.repo import Repo
+
+    repo = Repo(db_url=f"sqlite+aiosqlite:///{tmp_path / 'trading.db'}")
+    await repo.create_all()
+    statements: list[str] = []
+    event.listen(repo._engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    t = await repo.add_trade(symbol="BTCUSDT", side="buy", qty=1.0, price=10.0, fee=0.1, exchange_order_id="EX")
+    d = await repo.add_daily_pnl(date="2024-01-01", gross=1.0, fees=0.1, net=0.9)
+    assert (t.id, t.symbol, t.fee) == (1, "BTCUSDT", 0.1)
+    assert (d.id, d.net) == (1, 0.9)
+    assert [q.split()[0] for q in statements] == ["INSERT", "INSERT"]
+    await repo.dispose()
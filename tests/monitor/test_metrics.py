@@ -51,3 +51,4 @@ async def test_metrics_one_shot_runs(tmp_path):
     ex = _DummyEx()
     m = MetricsLogger(ex=ex, repo=repo, symbols=["BTCUSDT"])
     await m.one_shot()
+    await repo.dispose()
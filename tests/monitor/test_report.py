@@ -35,3 +35,4 @@ async def test_generate_daily_report_creates_file(tmp_path):
     text = path.read_text(encoding="utf-8")
     assert "Daily Report" in text
     assert "Funding PnL" in text
+    await repo.dispose()
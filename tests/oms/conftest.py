@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _run_in_tmp_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """OMS は相対パスの logs/*.jsonl に書くので、テスト中は tmp_path に移ってリポジトリに残さない"""
+    monkeypatch.chdir(tmp_path)
@@ -33,3 +33,25 @@ risk:
     assert cfg.keys.api_key == "abc"
     assert cfg.keys.api_secret == "xyz"
     assert cfg.exchange.environment == "mainnet"
+
+
+def test_strategy_symbols_default_when_omitted():
+    from bot.config.models import DEFAULT_STRATEGY_SYMBOLS, AppConfig, StrategyFundingConfig
+
+    # 直接生成でも、AppConfig の入れ子として検証されても、未指定ならデフォルト銘柄になる
+    assert StrategyFundingConfig().symbols == list(DEFAULT_STRATEGY_SYMBOLS)
+    cfg = AppConfig.model_validate(
+        {
+            "keys": {"api_key": "a", "api_secret": "b"},
+            "risk": {
+                "max_total_notional": 1,
+                "max_symbol_notional": 1,
+                "max_net_delta": 0.001,
+                "max_slippage_bps": 10,
+                "loss_cut_daily_jpy": 1,
+            },
+            "strategy": {"min_expected_apr": 0.2},
+        }
+    )
+    assert cfg.strategy.symbols == list(DEFAULT_STRATEGY_SYMBOLS)
+    assert cfg.strategy.min_expected_apr == 0.2
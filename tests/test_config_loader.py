@@ -61,3 +61,140 @@ def test_load_config_env_overrides_yaml(tmp_path: Path, monkeypatch):
     assert cfg.exchange.environment == "testnet"
     assert "sqlite+aiosqlite" in cfg.db_url
     assert cfg.strategy.symbols == ["BTCUSDT", "ETHUSDT"]
+
+
+def test_load_config_reparses_yaml_after_change_and_reads_env_each_call(tmp_path: Path, monkeypatch):
+    from bot.config.loader import load_config
+
+    base = "\n".join(
+        [
+            "keys:",
+            "  api_key: YAML_KEY",
+            "  api_secret: YAML_SECRET",
+            "risk:",
+            "  max_total_notional: 10000",
+            "  max_symbol_notional: 5000",
+            "  max_net_delta: 0.001",
+            "  max_slippage_bps: 10",
+            "  loss_cut_daily_jpy: 20000",
+            "strategy:",
+            '  symbols: ["BTCUSDT"]',
+            "",
+        ]
+    )
+    cfg_file = tmp_path / "app.yaml"
+    cfg_file.write_text(base + 'db_url: "sqlite+aiosqlite:///./a.db"\n', encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("DB_URL", raising=False)
+
+    assert load_config(cfg_file).db_url.endswith("a.db")
+
+    # YAML を書き換えたら（更新時刻が変われば）読み直す
+    cfg_file.write_text(base + 'db_url: "sqlite+aiosqlite:///./b.db"\n', encoding="utf-8")
+    st = cfg_file.stat()
+    os.utime(cfg_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_config(cfg_file).db_url.endswith("b.db")
+
+    # YAML が同じでも ENV の変更は毎回反映される
+    monkeypatch.setenv("DB_URL", "sqlite+aiosqlite:///./env.db")
+    assert load_config(cfg_file).db_url.endswith("env.db")
+
+
+def test_load_config_cache_returns_copies_and_tracks_dotenv(tmp_path: Path, monkeypatch):
+    from bot.config import loader
+
+    (tmp_path / "app.yaml").write_text(
+        "\n".join(
+            [
+                "keys:",
+                "  api_key: YAML_KEY",
+                "  api_secret: YAML_SECRET",
+                "risk:",
+                "  max_total_notional: 10000",
+                "  max_symbol_notional: 5000",
+                "  max_net_delta: 0.001",
+                "  max_slippage_bps: 10",
+                "  loss_cut_daily_jpy: 20000",
+                "strategy:",
+                '  symbols: ["BTCUSDT"]',
+            ]
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("TIMEZONE", raising=False)
+    loader.load_config.cache_clear()
+
+    first = loader.load_config("app.yaml")
+    second = loader.load_config("app.yaml")
+    assert first == second
+    assert first is not second  # キャッシュヒットでも呼び出し側ごとに別インスタンス
+    first.strategy.symbols.append("ETHUSDT")
+    assert loader.load_config("app.yaml").strategy.symbols == ["BTCUSDT"]
+
+    # .env が増えたら（更新時刻が変われば）読み直して反映する
+    (tmp_path / ".env").write_text("TIMEZONE=Asia/Tokyo\n", encoding="utf-8")
+    monkeypatch.setenv("TIMEZONE", "")  # テスト後に monkeypatch が元へ戻せるよう先に登録しておく
+    monkeypatch.delenv("TIMEZONE")
+    assert loader.load_config("app.yaml").timezone == "Asia/Tokyo"
+
+
+def test_load_env_robust_simple_and_dotenv_fallback(tmp_path: Path, monkeypatch):
+    from bot.config.loader import load_env_robust
+
+    simple = tmp_path / "simple.env"
+    simple.write_text("# comment\nexport T_SIMPLE_A=1\nT_SIMPLE_B: 'x y'\nT_SIMPLE_C=\n", encoding="utf-8")
+    for k in ("T_SIMPLE_A", "T_SIMPLE_B", "T_SIMPLE_C", "T_FALLBACK"):
+        monkeypatch.setenv(k, "")  # テスト後に monkeypatch が消せるよう登録してから外す
+        monkeypatch.delenv(k)
+
+    assert load_env_robust(simple, override=False) == {"T_SIMPLE_A": "1", "T_SIMPLE_B": "x y", "T_SIMPLE_C": ""}
+    assert os.environ["T_SIMPLE_B"] == "x y"
+
+    # 補間や行内コメントを含む .env は python-dotenv に任せる
+    fancy = tmp_path / "fancy.env"
+    fancy.write_text('T_FALLBACK="${T_SIMPLE_A}-2" # note\n', encoding="utf-8")
+    assert dict(load_env_robust(fancy, override=False)) == {"T_FALLBACK": "1-2"}
+
+
+def test_merge_env_into_overrides_yaml_in_place():
+    from bot.config.loader import _merge_env_into
+
+    yaml_data = {"risk": {"max_net_delta": 0.1, "max_slippage_bps": 10}, "strategy": "scalar", "timezone": "UTC"}
+    items = [("RISK__MAX_NET_DELTA", "0.5"), ("STRATEGY__SYMBOLS", "BTCUSDT"), ("TIMEZONE", "Asia/Tokyo")]
+
+    merged = _merge_env_into(yaml_data, items)
+
+    # ENV の値で上書きしつつ、YAML 側の兄弟キーは残る。途中が dict でなければ dict に置き換わる
+    assert merged is yaml_data
+    assert merged == {
+        "risk": {"max_net_delta": "0.5", "max_slippage_bps": 10},
+        "strategy": {"symbols": "BTCUSDT"},
+        "timezone": "Asia/Tokyo",
+    }
+
+
+def test_redact_secrets_masks_and_follows_config_changes():
+    from bot.config import loader
+    from bot.config.models import AppConfig
+
+    cfg = AppConfig.from_dict(
+        {
+            "keys": {"api_key": "K", "api_secret": "S"},
+            "risk": {
+                "max_total_notional": 1,
+                "max_symbol_notional": 1,
+                "max_net_delta": 0.1,
+                "max_slippage_bps": 1,
+                "loss_cut_daily_jpy": 1,
+            },
+        }
+    )
+    safe = loader.redact_secrets(cfg)
+
+    assert type(safe) is dict  # json.dumps にそのまま渡せる
+    assert safe["keys"]["api_key"] == "***" and safe["keys"]["api_secret"] == "***"
+    assert cfg.keys.api_key == "K"  # 元の設定は書き換えない
+
+    cfg.risk.max_total_notional = 999
+    assert loader.redact_secrets(cfg)["risk"]["max_total_notional"] == 999  # 書き換え後の値を反映する